@@ -0,0 +1,93 @@
+"""
+Startup benchmark for the src package, based on `python -X importtime`.
+
+Each library module is imported in a fresh interpreter and its cumulative
+import time is compared with a bare `import pandas, numpy` (which every module
+needs anyway). The difference is our own startup overhead.
+
+Budget:
+  - at most IMPORT_BUDGET_MS of overhead per module (best of --repeat runs)
+  - none of HEAVY_MODULES may be imported (streamlit, openpyxl, plotly and the
+    process pool machinery are only loaded by the code paths that use them)
+
+Usage (from the project root):
+    python benchmarks/import_time.py [--repeat 5] [--json results.json]
+Exits with status 1 when the budget is exceeded.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+MODULES = ['data_loader', 'forecaster', 'simulation', 'forecast_cache', 'analyze_data']
+BASELINE = 'pandas, numpy'
+IMPORT_BUDGET_MS = 150
+HEAVY_MODULES = ['streamlit', 'openpyxl', 'plotly', 'concurrent.futures.process']
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def cumulative_ms(statement):
+    """
+    Total import time (ms) of one `import ...` statement in a fresh interpreter,
+    plus the set of modules it loaded.
+    """
+    code = f"import sys; sys.path.insert(0, {SRC!r}); import {statement}"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, check=True)
+    total = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        loaded.add(match.group(4))
+        # Top-level entries (no indentation) add up to the whole statement
+        if len(match.group(3)) == 1:
+            total += int(match.group(2))
+    return total / 1000.0, loaded
+
+
+def run(repeat=5):
+    baseline = min(cumulative_ms(BASELINE)[0] for _ in range(repeat))
+    results = {'baseline_ms': round(baseline, 1), 'budget_ms': IMPORT_BUDGET_MS, 'modules': {}}
+    for module in MODULES:
+        runs = [cumulative_ms(module) for _ in range(repeat)]
+        best = min(ms for ms, _ in runs)
+        heavy = sorted({name for _, loaded in runs for name in loaded if name in HEAVY_MODULES})
+        overhead = max(best - baseline, 0.0)
+        results['modules'][module] = {
+            'total_ms': round(best, 1),
+            'overhead_ms': round(overhead, 1),
+            'heavy_imports': heavy,
+            'ok': overhead <= IMPORT_BUDGET_MS and not heavy,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"pandas + numpy baseline: {results['baseline_ms']:.1f} ms (budget: +{IMPORT_BUDGET_MS} ms)")
+    for module, res in results['modules'].items():
+        status = 'ok' if res['ok'] else 'OVER BUDGET'
+        heavy = f" heavy: {', '.join(res['heavy_imports'])}" if res['heavy_imports'] else ''
+        print(f"  {module:<16} {res['total_ms']:8.1f} ms  (+{res['overhead_ms']:.1f} ms) {status}{heavy}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+    return 0 if all(res['ok'] for res in results['modules'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Timing suite for the data/forecast/analysis pipeline on synthetic datasets.
+
+Each scale generates a unified-schema dataset with synthetic.generate_unified_dataset,
+writes it to a temporary workbook and times the main entry points on it:
+load_data (cold workbook parse, streaming parse and warm cache hit),
+IndicatorStore construction, run_baseline_forecast / run_baseline_forecasts,
+apply_event_impacts and the analyze_data functions (one indicator and the
+all-indicator table). Timing follows timeit: each benchmark runs `number` calls
+per round for --repeat rounds and we keep the best and median per-call time.
+
+Results are written to benchmarks/results/<label>.json. With --compare, every
+benchmark is checked against an earlier results file and reported as a
+regression when it is more than --threshold times slower.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py [--scales small medium] [--repeat 5]
+        [--label latest] [--compare benchmarks/results/baseline.json] [--threshold 1.5]
+Exits with status 1 when --compare finds a regression.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+sys.path.insert(0, SRC)
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import analyze_data
+from data_cache import invalidate_cache
+from forecaster import run_baseline_forecast, run_baseline_forecasts, apply_event_impacts
+from indicator_store import IndicatorStore
+from synthetic import generate_unified_dataset, write_workbook
+
+# n_indicators, n_events; observations come to ~76 rows per indicator
+SCALES = {
+    'small': dict(n_indicators=100, n_events=50),
+    'medium': dict(n_indicators=1000, n_events=200),
+    'large': dict(n_indicators=5000, n_events=1000),
+}
+DEFAULT_SCALES = ['small', 'medium']
+REGRESSION_THRESHOLD = 1.5
+
+
+def time_call(func, repeat=5, number=1):
+    """
+    Best and median seconds per call over `repeat` rounds of `number` calls.
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return {'best_s': min(rounds), 'median_s': statistics.median(rounds),
+            'repeat': repeat, 'number': number}
+
+
+def _quiet(func):
+    """The loader reports progress with print(); keep it out of the timings output."""
+    def wrapped():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapped
+
+
+def bench_scale(name, repeat=5, workdir=None):
+    """
+    Runs every benchmark on one scale and returns {benchmark: timing}.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, df_impact = generate_unified_dataset(seed=0, **SCALES[name])
+    data_path = os.path.join(workdir, f"synthetic_{name}.xlsx")
+    enrichment_path = os.path.join(workdir, f"synthetic_{name}.jsonl")
+    open(enrichment_path, 'w').close()
+    write_workbook(df, df_impact, data_path)
+
+    def load_cold():
+        invalidate_cache(data_path)
+        return data_loader._load_data_logic(data_path, enrichment_path)
+
+    def load_streaming():
+        return data_loader._load_data_logic(data_path, enrichment_path, use_cache=False, streaming=True)
+
+    def load_warm():
+        return data_loader._load_data_logic(data_path, enrichment_path)
+
+    _quiet(load_warm)()
+    store = IndicatorStore(df, df_impact)
+    code = 'ACC_OWNERSHIP'
+    baseline = run_baseline_forecast(df, code)
+    impacts = store.impacts_for(code)
+    # the workbook parse dominates everything else; time it over fewer rounds
+    benchmarks = {
+        'load_data_cold': (load_cold, max(1, repeat // 2), 1),
+        'load_data_streaming': (load_streaming, max(1, repeat // 2), 1),
+        'load_data_warm': (load_warm, repeat, 1),
+        'indicator_store_build': (lambda: IndicatorStore(df, df_impact), repeat, 1),
+        'run_baseline_forecast': (lambda: run_baseline_forecast(df, code), repeat, 5),
+        'run_baseline_forecasts_all': (lambda: run_baseline_forecasts(store), repeat, 1),
+        'apply_event_impacts': (lambda: apply_event_impacts(baseline, impacts, 'base', code), repeat, 20),
+        'analyze_access_slowdown': (lambda: analyze_data.analyze_access_slowdown(df), repeat, 5),
+        'analyze_gender_gap': (lambda: analyze_data.analyze_gender_gap(df), repeat, 5),
+        'indicator_analytics_all': (lambda: analyze_data.indicator_analytics(df), repeat, 1),
+    }
+    results = {}
+    for bench, (func, rounds, number) in benchmarks.items():
+        results[bench] = time_call(_quiet(func), rounds, number)
+    results['_rows'] = {'unified': len(df), 'impact_links': len(df_impact)}
+    return results
+
+
+def compare(current, previous, threshold=REGRESSION_THRESHOLD):
+    """
+    Lists (scale, benchmark, previous_s, current_s, ratio) for every benchmark whose
+    best time grew by more than `threshold` times.
+    """
+    regressions = []
+    for scale, benches in current['scales'].items():
+        for bench, timing in benches.items():
+            before = previous.get('scales', {}).get(scale, {}).get(bench)
+            if bench.startswith('_') or not before:
+                continue
+            ratio = timing['best_s'] / before['best_s'] if before['best_s'] else np.inf
+            if ratio > threshold:
+                regressions.append((scale, bench, before['best_s'], timing['best_s'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, choices=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--label', default='latest', help="Results file name under benchmarks/results/")
+    parser.add_argument('--compare', help="Earlier results file to check for regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'scales': {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            print(f"{scale}: {SCALES[scale]}")
+            results['scales'][scale] = bench_scale(scale, args.repeat, workdir)
+            rows = results['scales'][scale]['_rows']
+            print(f"  {rows['unified']} rows, {rows['impact_links']} impact links")
+            for bench, timing in results['scales'][scale].items():
+                if not bench.startswith('_'):
+                    print(f"  {bench:<28} {timing['best_s'] * 1000:10.2f} ms  "
+                          f"(median {timing['median_s'] * 1000:.2f} ms)")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{args.label}.json")
+    with open(out_path, 'w', encoding='utf-8') as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Results written to {out_path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            previous = json.load(fh)
+        regressions = compare(results, previous, args.threshold)
+        for scale, bench, before, after, ratio in regressions:
+            print(f"REGRESSION {scale}/{bench}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.2f}x against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,70 +1,115 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
-import numpy as np
+import time
+
+# Plotting and array libraries are imported inside the page that needs them,
+# so a rerun only pays for the current page's imports.
 
 # Add src to path for data_loader and forecaster
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from data_loader import load_data
-from forecaster import run_baseline_forecast, apply_event_impacts
+from forecast_cache import ForecastCache
+from refresh import SnapshotRefresher, warm_forecasts
+import instrumentation
 
 st.set_page_config(page_title="Ethiopia FI Forecast Dashboard", layout="wide")
 
 # --- DATA LOADING ---
-@st.cache_data
-def get_processed_data():
-    df, df_impact = load_data()
-    
-    # Prepare impact model for forecasting
-    events_df = df[df['record_type'] == 'event'][['record_id', 'indicator', 'start_date', 'data_year']]
-    events_df.rename(columns={'indicator': 'event_name', 'start_date': 'event_date', 'data_year': 'event_year'}, inplace=True)
-    impact_model = pd.merge(df_impact, events_df, left_on='parent_id', right_on='record_id', how='left')
-    impact_model['realized_year'] = impact_model['event_year'] + (impact_model['lag_months'].fillna(0) / 12.0)
-    
-    return df, impact_model
+# Serve forecasts precomputed by `python src/analyze_data.py --precompute DIR`, via
+# FI_PRECOMPUTED_DIR=DIR or `streamlit run dashboard/app.py -- --precomputed DIR`
+PRECOMPUTED_DIR = os.environ.get('FI_PRECOMPUTED_DIR')
+if '--precomputed' in sys.argv[:-1]:
+    PRECOMPUTED_DIR = sys.argv[sys.argv.index('--precomputed') + 1]
+
+# The store (data, impact model and lookup indexes) and a warmed forecast cache form one
+# snapshot. A background thread rebuilds it when the workbook or enrichment log changes
+# and swaps it in; reruns keep using the previous snapshot until then.
+# With FI_SHARED_SNAPSHOT=DIR, replicas open the memory-mapped snapshot published by
+# `python src/shared_snapshot.py DIR --watch 5` instead of each parsing the workbook.
+# In serve-precomputed mode forecasts come from the artifacts, so snapshots are not warmed.
+@st.cache_resource
+def get_refresher():
+    return SnapshotRefresher(interval=float(os.environ.get('FI_REFRESH_INTERVAL', 5.0)),
+                             warm=None if PRECOMPUTED_DIR else warm_forecasts,
+                             shared_dir=os.environ.get('FI_SHARED_SNAPSHOT') or None).start()
+
+# Keyed on the manifest's mtime, so re-running --precompute into the same directory
+# is picked up on the next rerun (the directory is swapped in whole, manifest included)
+@st.cache_resource(max_entries=1)
+def get_precomputed_forecasts(manifest_mtime):
+    from precompute import PrecomputedForecasts
+    # Anything the artifacts do not cover (e.g. the sensitivity fan) is computed live
+    return PrecomputedForecasts(PRECOMPUTED_DIR, fallback=ForecastCache(maxsize=128))
 
-df, impact_model = get_processed_data()
+def precomputed_manifest_mtime():
+    try:
+        return os.stat(os.path.join(PRECOMPUTED_DIR, 'manifest.json')).st_mtime_ns
+    except OSError:
+        return None
+
+# Tidy growth/gap table for all indicators; the leading underscore keeps Streamlit
+# from hashing the store, so the snapshot version alone keys the cache
+@st.cache_resource(max_entries=2)
+def get_indicator_analytics(_store, version):
+    from analyze_data import indicator_analytics
+    return indicator_analytics(_store.df)
+
+refresher = get_refresher()
+snapshot = refresher.current()
+store = snapshot.store
+# Forecasts are memoized per (indicator, years, scenario, dataset fingerprint) across reruns
+forecasts = get_precomputed_forecasts(precomputed_manifest_mtime()) if PRECOMPUTED_DIR else snapshot.forecasts
 
 # --- SIDEBAR NAVIGATION ---
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["🚀 Overview", "📈 Trends Explorer", "🔮 Forecast Analysis", "🎯 Inclusion Targets"])
 
+# Opt-in stage timings for this session only: the checkboxes live in the session's
+# state and the recording covers this script run's thread (FI_PROFILE=1 records process-wide)
+debug = st.sidebar.checkbox("Debug: stage timings", value=instrumentation.is_enabled(), key="debug_timings")
+trace_memory = debug and st.sidebar.checkbox(
+    "Trace peak memory", key="debug_memory",
+    help="Runs tracemalloc while this page renders; it slows down every session meanwhile.")
+debug_run = instrumentation.recording(memory=trace_memory).start() if debug else None
+render_timer = instrumentation.stage("dashboard.render", page=page).start()
+
 # --- PAGE: OVERVIEW ---
 if page == "🚀 Overview":
+    import pandas as pd
+    import plotly.express as px
+    
     st.title("Ethiopia Financial Inclusion Overview")
     
     # Summary Cards
     col1, col2, col3, col4 = st.columns(4)
     
     # Get latest Access %
-    acc_latest = df[(df['indicator_code'] == 'ACC_OWNERSHIP') & (df['record_type'] == 'observation') & (df['gender'] == 'all')].sort_values('data_year').iloc[-1]['value_numeric']
+    acc_latest = store.latest('ACC_OWNERSHIP')
     col1.metric("Latest Access (%)", f"{acc_latest:.1f}%", "Historical (2024)")
     
     # P2P/ATM Ratio
-    p2p_val = df[(df['indicator_code'] == 'USG_P2P_VALUE') & (df['record_type'] == 'observation')].sort_values('data_year').iloc[-1]['value_numeric']
-    atm_val = df[(df['indicator_code'] == 'USG_ATM_VALUE') & (df['record_type'] == 'observation')].sort_values('data_year').iloc[-1]['value_numeric']
+    p2p_val = store.latest('USG_P2P_VALUE', gender=None)
+    atm_val = store.latest('USG_ATM_VALUE', gender=None)
     ratio = p2p_val / atm_val if atm_val > 0 else 0
     col2.metric("P2P/ATM Ratio", f"{ratio:.2f}x", "Usage Shift")
     
     # 4G Coverage
-    net_cov = df[(df['indicator_code'] == 'ACC_4G_COV') & (df['record_type'] == 'observation')].iloc[-1]['value_numeric']
+    net_cov = store.latest('ACC_4G_COV', gender=None)
     col3.metric("4G Coverage (%)", f"{net_cov:.1f}%")
     
     # Number of Events
-    event_count = len(df[df['record_type'] == 'event'])
+    event_count = store.count('event')
     col4.metric("Events Tracked", event_count)
     
     st.markdown("---")
     
     # High Level Trends Chart
     st.subheader("Key Indicator Trends")
-    indicators = st.multiselect("Select Indicators", df['indicator_code'].unique(), default=['ACC_OWNERSHIP', 'ACC_MOBILE_PEN'])
+    indicators = st.multiselect("Select Indicators", store.indicator_codes(), default=['ACC_OWNERSHIP', 'ACC_MOBILE_PEN'])
     
-    trend_df = df[(df['indicator_code'].isin(indicators)) & (df['record_type'] == 'observation') & (df['gender'] == 'all')]
+    trend_parts = [store.observations(code) for code in indicators]
+    trend_df = pd.concat(trend_parts) if trend_parts else store.observations(None)
     fig = px.line(trend_df, x='data_year', y='value_numeric', color='indicator_code', markers=True, 
                   labels={'value_numeric': 'Value', 'data_year': 'Year'},
                   title="Historical Growth")
@@ -72,34 +117,43 @@ if page == "🚀 Overview":
 
 # --- PAGE: TRENDS EXPLORER ---
 elif page == "📈 Trends Explorer":
+    import plotly.express as px
+    
     st.title("Detailed Trends Explorer")
     
     col1, col2 = st.columns([1, 3])
     
     with col1:
-        target_ind = st.selectbox("Select Indicator", df['indicator_code'].unique())
-        gender_filter = st.selectbox("Gender", df['gender'].unique() if 'gender' in df.columns else ['all'])
+        target_ind = st.selectbox("Select Indicator", store.indicator_codes())
+        gender_filter = st.selectbox("Gender", store.genders() or ['all'])
         
     with col2:
-        plot_df = df[(df['indicator_code'] == target_ind) & (df['record_type'] == 'observation')]
-        if 'gender' in plot_df.columns:
-            plot_df = plot_df[plot_df['gender'] == gender_filter]
+        plot_df = store.observations(target_ind, gender_filter)
             
         fig = px.bar(plot_df, x='data_year', y='value_numeric', title=f"Historical: {target_ind}",
                      color_discrete_sequence=['#3498db'])
         st.plotly_chart(fig, use_container_width=True)
         
     st.dataframe(plot_df[['data_year', 'indicator', 'value_numeric', 'source_name']])
+    
+    # Growth and gender gaps for every indicator, computed once per data snapshot
+    analytics = get_indicator_analytics(store, snapshot.version)
+    growth = analytics[(analytics['indicator_code'] == target_ind) & (analytics['gender'] == gender_filter)]
+    if not growth.empty:
+        st.subheader("Growth Between Observations")
+        st.dataframe(growth[['data_year', 'value_numeric', 'growth_pp', 'avg_annual_growth_pp', 'cagr', 'gap_pp']])
 
 # --- PAGE: FORECAST ANALYSIS ---
 elif page == "🔮 Forecast Analysis":
+    import numpy as np
+    import plotly.graph_objects as go
+    
     st.title("Scenario-Based Forecasts (2025-2027)")
     
     target = st.selectbox("Select Project Target", ['ACC_OWNERSHIP', 'USG_P2P_COUNT'])
     
     # Run Forecast
-    baseline = run_baseline_forecast(df, target)
-    target_impacts = impact_model[impact_model['related_indicator'] == target]
+    baseline = forecasts.baseline(store, target)
     
     scenarios = ['pessimistic', 'base', 'optimistic']
     colors = {'pessimistic': '#e74c3c', 'base': '#3498db', 'optimistic': '#2ecc71'}
@@ -107,12 +161,21 @@ elif page == "🔮 Forecast Analysis":
     fig = go.Figure()
     
     # Historical Data
-    hist = df[(df['indicator_code'] == target) & (df['record_type'] == 'observation') & (df['gender'] == 'all')].sort_values('data_year')
-    fig.add_trace(go.Scatter(x=hist['data_year'], y=hist['value_numeric'], name='Historical', mode='lines+markers', line=dict(color='black', width=3)))
+    hist_years, hist_values = store.series(target)
+    fig.add_trace(go.Scatter(x=hist_years, y=hist_values, name='Historical', mode='lines+markers', line=dict(color='black', width=3)))
+    
+    # Scenarios: one shared impact schedule evaluated for every modifier
+    show_fan = st.checkbox("Show sensitivity fan (impact modifier 0.0-2.0)")
+    fan_modifiers = np.round(np.arange(0.0, 2.01, 0.1), 1) if show_fan else None
+    grid = forecasts.scenarios(store, target, scenarios=scenarios, modifiers=fan_modifiers)
     
-    # Scenarios
-    for scn in scenarios:
-        res = apply_event_impacts(baseline, target_impacts, scenario=scn, indicator_code=target)
+    if show_fan:
+        for modifier, preds in zip(fan_modifiers, grid[len(scenarios):]):
+            fig.add_trace(go.Scatter(x=baseline['data_year'], y=preds, name=f"x{modifier:.1f}", mode='lines',
+                                     line=dict(color='rgba(127, 140, 141, 0.35)', width=1), showlegend=False))
+    
+    for scn, preds in zip(scenarios, grid):
+        res = baseline.assign(baseline_prediction=preds)
         fig.add_trace(go.Scatter(x=res['data_year'], y=res['baseline_prediction'], name=scn.capitalize(), line=dict(color=colors[scn], dash='dash')))
         
         if scn == 'base':
@@ -133,21 +196,29 @@ elif page == "🔮 Forecast Analysis":
     st.subheader("Data Table")
     st.dataframe(res) # Last scenario computed
     
+    # Impact graph lookup: only this indicator's links, in realised-year order
+    drivers = store.impacts_for(target)
+    if not drivers.empty:
+        st.subheader("Events Driving This Forecast")
+        st.dataframe(drivers[['event_name', 'realized_year', 'impact_direction', 'impact_magnitude', 'lag_months']])
+    
     csv = res.to_csv(index=False).encode('utf-8')
     st.download_button("Download Forecast CSV", csv, "forecast_export.csv", "text/csv")
 
 # --- PAGE: INCLUSION TARGETS ---
 elif page == "🎯 Inclusion Targets":
+    import plotly.graph_objects as go
+    
     st.title("Path to 60% Financial Inclusion")
     
     target_val = 60.0
     
     # Run base forecast for Access
-    baseline_acc = run_baseline_forecast(df, 'ACC_OWNERSHIP', start_year=2025, end_year=2030)
-    acc_impacts = impact_model[impact_model['related_indicator'] == 'ACC_OWNERSHIP']
-    base_proj = apply_event_impacts(baseline_acc, acc_impacts, scenario='base', indicator_code='ACC_OWNERSHIP')
+    baseline_acc = forecasts.baseline(store, 'ACC_OWNERSHIP', start_year=2025, end_year=2030)
+    base_proj = baseline_acc.assign(
+        baseline_prediction=forecasts.scenarios(store, 'ACC_OWNERSHIP', 2025, 2030, scenarios=['base'])[0])
     
-    latest_acc = df[(df['indicator_code'] == 'ACC_OWNERSHIP') & (df['record_type'] == 'observation')].iloc[-1]['value_numeric']
+    latest_acc = store.latest('ACC_OWNERSHIP')
     gap = target_val - latest_acc
     
     col1, col2 = st.columns(2)
@@ -160,6 +231,14 @@ elif page == "🎯 Inclusion Targets":
         col2.success(f"Projected Target Reached in: {int(year_val)}")
     else:
         col2.warning("Target not reached by 2030 in Base Scenario")
+    
+    # Monte Carlo: trend, impact size and lag uncertainty
+    sim = forecasts.simulation(store, 'ACC_OWNERSHIP', start_year=2025, end_year=2030,
+                               n_paths=20000, target=target_val, seed=42)
+    if not sim.empty:
+        prob_cols = st.columns(len(sim))
+        for col, (_, row) in zip(prob_cols, sim.iterrows()):
+            col.metric(f"P(60%) by {int(row['data_year'])}", f"{row['prob_target_reached']:.0%}")
         
     # Visual Target Tracker
     fig = go.Figure(go.Indicator(
@@ -186,3 +265,36 @@ elif page == "🎯 Inclusion Targets":
     2. **Which events matter most?** The Digital ID (Fayda) rollout is the single largest accelerator for access.
     3. **What about usage?** P2P payments are growing much faster than account ownership, suggesting deepening usage among existing users.
     """)
+
+render_timer.stop()
+if debug_run is not None:
+    debug_run.stop()
+    # Keep this session's records across reruns, bounded like the process-wide buffer
+    st.session_state["debug_records"] = (
+        st.session_state.get("debug_records", []) + debug_run.records)[-instrumentation.MAX_RECORDS:]
+
+# --- SIDEBAR: FORECAST CACHE ---
+cache_stats = forecasts.stats()
+refresh_status = refresher.status()
+st.sidebar.caption(
+    f"Data snapshot v{snapshot.version}, loaded {time.strftime('%H:%M:%S', time.localtime(snapshot.loaded_at))}"
+    + (" (refreshing...)" if refresh_status['refreshing'] else "")
+)
+if refresh_status['last_error']:
+    st.sidebar.warning("Last data refresh failed; showing the previous snapshot.")
+if PRECOMPUTED_DIR and not forecasts.is_current(store):
+    st.sidebar.warning("Precomputed forecasts were built from a different dataset; re-run the precompute step.")
+st.sidebar.caption(
+    f"Forecast cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['size']}/{cache_stats['maxsize']} entries)"
+)
+
+# --- SIDEBAR: DEBUG PANEL ---
+if debug:
+    with st.sidebar.expander("Stage timings", expanded=True):
+        session_records = st.session_state.get("debug_records", [])
+        st.dataframe(instrumentation.summary(session_records), hide_index=True)
+        st.download_button("Download timings JSON", instrumentation.to_json(session_records),
+                           "stage_timings.json", "application/json")
+        if st.button("Clear timings"):
+            st.session_state["debug_records"] = []
@@ -1,57 +1,193 @@
 import pandas as pd
 import numpy as np
-from data_loader import load_data
+import argparse
+
+from data_loader import load_store, DEFAULT_DATA_PATH
+
+ANALYTICS_COLUMNS = ['years_diff', 'growth_pp', 'avg_annual_growth_pp', 'cagr', 'gap_pp']
 
 def calculate_cagr(start_val, end_val, periods):
-    if start_val == 0 or periods == 0:
-        return np.nan
-    return (end_val / start_val) ** (1 / periods) - 1
+    """
+    Compound annual growth rate. Works element-wise on arrays; NaN where the
+    start value or the number of periods is zero.
+    """
+    start_val, end_val, periods = (np.asarray(a, dtype=float) for a in (start_val, end_val, periods))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where((start_val == 0) | (periods == 0), np.nan,
+                        (end_val / start_val) ** (1 / periods) - 1)
+    return cagr if cagr.ndim else float(cagr)
+
+def indicator_analytics(df, indicator_codes=None):
+    """
+    Growth and gender-gap analytics for every observed indicator at once.
+    Returns one tidy table, one row per observation sorted by (indicator_code,
+    [region,] gender, data_year) and keeping the input row labels, with:
+      years_diff, growth_pp, avg_annual_growth_pp and cagr against the previous
+      observation of the same series, and gap_pp (male - female, in the units of
+      the indicator) for that indicator and year.
+    """
+    if indicator_codes is None:
+        mask = df['indicator_code'].notna()
+    elif len(indicator_codes) == 1:
+        # Equality on a categorical is much cheaper than isin
+        mask = df['indicator_code'] == list(indicator_codes)[0]
+    else:
+        mask = df['indicator_code'].isin(list(indicator_codes))
+    mask &= df['record_type'] == 'observation'
+    # Sub-national rows (synthetic extracts) form their own series
+    series_cols = ['indicator_code'] + (['region'] if 'region' in df.columns else []) + ['gender']
+    columns = [c for c in series_cols + ['pillar', 'data_year', 'value_numeric'] if c in df.columns]
+    rows = np.flatnonzero(mask.to_numpy(dtype=bool, na_value=False))
+    # Column arrays are taken once and the table is assembled at the end, so a
+    # single indicator does not pay for several intermediate frames
+    obs = {col: df[col].array.take(rows) for col in columns}
+
+    # Integer codes per key column; one lexsort orders rows by series, then year
+    codes = [_sort_codes(obs[col]) for col in series_cols]
+    years = obs['data_year'].to_numpy(dtype=float, na_value=np.nan)
+    values = obs['value_numeric'].to_numpy(dtype=float, na_value=np.nan)
+    order = np.lexsort([years] + codes[::-1])
+    codes = [c[order] for c in codes]
+    years, values = years[order], values[order]
+
+    # A row continues a series when its key equals the previous row's
+    series = _combine(codes)
+    same = np.zeros(len(order), dtype=bool)
+    same[1:] = series[1:] == series[:-1]
+    prev_years = np.where(same, np.roll(years, 1), np.nan)
+    prev_values = np.where(same, np.roll(values, 1), np.nan)
+
+    years_diff = years - prev_years
+    growth = values - prev_values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual = growth / years_diff
+    gender = np.asarray(obs['gender'], dtype=object)[order]
+    gap = _gender_gaps(codes[:-1], years, values, gender)
+    # Rows usually arrive in series/year order already; skip the take then
+    if not (np.diff(order) > 0).all():
+        obs = {col: array.take(order) for col, array in obs.items()}
+        rows = rows[order]
+    metrics = dict(zip(ANALYTICS_COLUMNS, [
+        years_diff, growth, annual, calculate_cagr(prev_values, values, years_diff), gap]))
+    return pd.DataFrame({**obs, **metrics}, index=df.index[rows])
+
+def _sort_codes(column):
+    # Integer codes in sorted-value order, NaN last. Categorical codes already are
+    # (in category order, as factorize(sort=True) gives), so skip the rehash.
+    if isinstance(column, pd.Categorical):
+        codes = column.codes.astype(np.int64)
+        return np.where(codes < 0, len(column.categories), codes)
+    return pd.factorize(column, sort=True, use_na_sentinel=False)[0]
+
+def _combine(codes):
+    # Mixed-radix packing of several integer code arrays into one int64 key
+    key = np.zeros(len(codes[0]) if codes else 0, dtype=np.int64)
+    for c in codes:
+        key = key * (int(c.max()) + 1 if len(c) else 1) + c
+    return key
+
+def _gender_gaps(key_codes, years, values, gender):
+    # male - female per (indicator, [region,] year), broadcast to every row of that year
+    year_codes = pd.factorize(years, use_na_sentinel=False)[0]
+    _, point = np.unique(_combine(key_codes + [year_codes]), return_inverse=True)
+    n_points = int(point.max()) + 1 if len(point) else 0
+    known = ~np.isnan(values)
+    gaps = np.zeros(n_points)
+    for label, sign in (('male', 1.0), ('female', -1.0)):
+        rows = (gender == label) & known
+        total = np.bincount(point[rows], weights=values[rows], minlength=n_points)
+        count = np.bincount(point[rows], minlength=n_points)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gaps += sign * total / count
+    return gaps[point]
+
+def _series_rows(analytics, indicator_code, gender):
+    # One indicator's rows of an indicator_analytics table, already sorted by year
+    mask = analytics['indicator_code'] == indicator_code
+    mask &= analytics['gender'] == gender if isinstance(gender, str) else analytics['gender'].isin(gender)
+    return analytics[mask.to_numpy(dtype=bool, na_value=False)]
 
-def analyze_access_slowdown(df):
+def analyze_access_slowdown(df, indicator_code='ACC_OWNERSHIP', analytics=None):
     """
     Analyzes the slowdown in account ownership growth (2021-2024).
+    Pass `analytics` (from indicator_analytics) to slice a precomputed table instead.
     """
-    acc_df = df[
-        (df['record_type'] == 'observation') & 
-        (df['indicator_code'] == 'ACC_OWNERSHIP') & 
-        (df['gender'] == 'all')
-    ].sort_values('data_year')
+    if analytics is None:
+        analytics = indicator_analytics(df, [indicator_code])
+    acc_df = _series_rows(analytics, indicator_code, 'all')
     
     if len(acc_df) < 2:
         return "Insufficient data for access analysis."
-        
-    acc_df['growth_pp'] = acc_df['value_numeric'].diff()
-    acc_df['years_diff'] = acc_df['data_year'].diff()
-    acc_df['avg_annual_growth_pp'] = acc_df['growth_pp'] / acc_df['years_diff']
     
     return acc_df[['data_year', 'value_numeric', 'growth_pp', 'avg_annual_growth_pp']]
 
-def analyze_gender_gap(df):
+def analyze_gender_gap(df, indicator_code='ACC_OWNERSHIP', analytics=None):
     """
     Calculates gender gap over time.
+    Pass `analytics` (from indicator_analytics) to slice a precomputed table instead.
     """
-    gender_df = df[
-        (df['record_type'] == 'observation') & 
-        (df['indicator_code'] == 'ACC_OWNERSHIP') & 
-        (df['gender'].isin(['male', 'female']))
-    ].pivot(index='data_year', columns='gender', values='value_numeric')
+    if analytics is None:
+        analytics = indicator_analytics(df, [indicator_code])
+    rows = _series_rows(analytics, indicator_code, ['male', 'female'])
+    gender_df = rows.pivot(index='data_year', columns='gender', values='value_numeric')
     
     if gender_df.empty:
         return "No gender data available."
-        
-    gender_df['gap_pp'] = gender_df['male'] - gender_df['female']
+    
+    # gender may be categorical; plain labels let us add the gap column
+    gender_df.columns = gender_df.columns.astype(str)
+    
+    # Every row of a year carries that year's gap; pivot sorts the years the same way
+    _, first = np.unique(rows['data_year'].to_numpy(dtype=float, na_value=np.nan), return_index=True)
+    gender_df['gap_pp'] = rows['gap_pp'].to_numpy()[first]
     return gender_df
 
-def get_key_insights():
-    df = load_data()
-    
+def get_key_insights(data_path=DEFAULT_DATA_PATH, output_dir=None, formats=('parquet',),
+                     start_year=2025, end_year=2030):
+    """
+    Prints the key insights. With output_dir, also precomputes the baseline and
+    every scenario for all indicators plus the target-year analysis from the
+    same load, and writes them (and the insight tables) as partitioned
+    artifacts for the dashboard's precomputed mode.
+    """
+    store = load_store(data_path)
+    analytics = indicator_analytics(store.df)
+
+    access = analyze_access_slowdown(store.df, analytics=analytics)
+    gender = analyze_gender_gap(store.df, analytics=analytics)
+
     print("--- Access Trajectory ---")
-    print(analyze_access_slowdown(df))
+    print(access)
     
     print("\n--- Gender Gap ---")
-    print(analyze_gender_gap(df))
-    
+    print(gender)
+
+    if output_dir:
+        from precompute import precompute_artifacts
+
+        insights = {'indicator_analytics': analytics.reset_index(drop=True)}
+        if isinstance(access, pd.DataFrame):
+            insights['access_trajectory'] = access.reset_index(drop=True)
+        if isinstance(gender, pd.DataFrame):
+            insights['gender_gap'] = gender.reset_index()
+        print(f"\n--- Precomputing {start_year}-{end_year} forecasts to {output_dir} ---")
+        precompute_artifacts(store, output_dir, start_year=start_year, end_year=end_year,
+                             formats=formats, insights=insights)
+
     return "Analysis Complete"
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print key insights and optionally precompute all forecasts.")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help="Unified workbook or CSV export")
+    parser.add_argument('--precompute', metavar='DIR', help="Write forecast/scenario artifacts to DIR")
+    parser.add_argument('--format', choices=['parquet', 'csv', 'both'], default='parquet')
+    parser.add_argument('--start-year', type=int, default=2025)
+    parser.add_argument('--end-year', type=int, default=2030)
+    args = parser.parse_args(argv)
+
+    formats = ('parquet', 'csv') if args.format == 'both' else (args.format,)
+    return get_key_insights(args.data, output_dir=args.precompute, formats=formats,
+                            start_year=args.start_year, end_year=args.end_year)
+
 if __name__ == "__main__":
-    get_key_insights()
+    main()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# Bump whenever the layout of the cached frames changes so stale caches are
+# rebuilt instead of being read with the wrong shape.
+CACHE_FORMAT_VERSION = 4
+CACHE_DIRNAME = ".cache"
+
+
+def cache_paths(data_path):
+    """
+    Returns the manifest and Parquet file locations for a workbook.
+    The cache lives in a `.cache` folder next to the workbook itself.
+    """
+    directory = os.path.join(os.path.dirname(os.path.abspath(data_path)), CACHE_DIRNAME)
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    return {
+        'dir': directory,
+        'manifest': os.path.join(directory, f"{stem}.manifest.json"),
+        'unified': os.path.join(directory, f"{stem}.unified.parquet"),
+        'impact': os.path.join(directory, f"{stem}.impact.parquet"),
+    }
+
+
+def file_sha256(path, block_size=1 << 20):
+    """
+    Streams a file through sha256 so large workbooks are never held in memory.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(paths):
+    try:
+        with open(paths['manifest'], 'r', encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(paths, manifest):
+    tmp = paths['manifest'] + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, paths['manifest'])
+
+
+def _source_key(data_path, enrichment_state, sha256=None):
+    stat = os.stat(data_path)
+    return {
+        'format_version': CACHE_FORMAT_VERSION,
+        'enrichment': enrichment_state,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256 if sha256 is not None else file_sha256(data_path),
+    }
+
+
+def read_cache(data_path):
+    """
+    Returns the cached (df_unified, df_impact, manifest) for a workbook, or None on a miss.
+    manifest['enrichment'] records how much of the enrichment log is already merged.
+
+    A matching size + mtime is trusted as-is. If either changed, the file is
+    re-hashed so a touched-but-identical workbook still hits the cache.
+    """
+    paths = cache_paths(data_path)
+    manifest = _read_manifest(paths)
+    if not manifest:
+        return None
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    if not (os.path.exists(paths['unified']) and os.path.exists(paths['impact'])):
+        return None
+
+    stat = os.stat(data_path)
+    if stat.st_size != manifest.get('size') or stat.st_mtime_ns != manifest.get('mtime_ns'):
+        if stat.st_size != manifest.get('size'):
+            return None
+        if file_sha256(data_path) != manifest.get('sha256'):
+            return None
+        # Same content, new mtime: refresh the manifest so the next load is cheap.
+        manifest['mtime_ns'] = stat.st_mtime_ns
+        _write_manifest(paths, manifest)
+
+    try:
+        df_unified = pd.read_parquet(paths['unified'])
+        df_impact = pd.read_parquet(paths['impact'])
+    except Exception as e:
+        print(f"Warning: Could not read data cache, rebuilding. Error: {e}")
+        return None
+    return df_unified, df_impact, manifest
+
+
+def write_cache(data_path, enrichment_state, df_unified, df_impact):
+    """
+    Persists the loaded frames as Parquet next to the workbook.
+    Returns True on success; failures only print a warning since the cache is optional.
+    """
+    paths = cache_paths(data_path)
+    try:
+        os.makedirs(paths['dir'], exist_ok=True)
+        df_unified.to_parquet(paths['unified'], index=False)
+        df_impact.to_parquet(paths['impact'], index=False)
+        _write_manifest(paths, _source_key(data_path, enrichment_state))
+    except Exception as e:
+        print(f"Warning: Could not write data cache. Error: {e}")
+        invalidate_cache(data_path)
+        return False
+    return True
+
+
+def write_cache_manifest(data_path, enrichment_state):
+    """
+    Marks Parquet files written in place at cache_paths(data_path) (e.g.
+    streamed there chunk by chunk by ingest) as the cache for the workbook.
+    """
+    _write_manifest(cache_paths(data_path), _source_key(data_path, enrichment_state))
+
+
+def update_cached_unified(data_path, manifest, enrichment_state, df_unified):
+    """
+    Replaces only the unified frame after new enrichment rows were merged.
+    The workbook part of the key is unchanged, so it is not re-hashed.
+    """
+    paths = cache_paths(data_path)
+    try:
+        df_unified.to_parquet(paths['unified'], index=False)
+        _write_manifest(paths, dict(manifest, enrichment=enrichment_state))
+    except Exception as e:
+        print(f"Warning: Could not update data cache. Error: {e}")
+        invalidate_cache(data_path)
+        return False
+    return True
+
+
+def invalidate_cache(data_path):
+    """
+    Deletes the cached frames for a workbook. Returns True if anything was removed.
+    """
+    removed = False
+    paths = cache_paths(data_path)
+    for key in ('manifest', 'unified', 'impact'):
+        try:
+            os.remove(paths[key])
+            removed = True
+        except FileNotFoundError:
+            pass
+    return removed
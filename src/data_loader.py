@@ -1,29 +1,175 @@
 import pandas as pd
+import numpy as np
 import os
-try:
-    import streamlit as st
-except ImportError:
-    st = None
+import sys
+
+from data_cache import (cache_paths, read_cache, write_cache, write_cache_manifest,
+                        update_cached_unified, invalidate_cache)
+from dates import parse_dates
+from enrichment_store import DEFAULT_ENRICHMENT_PATH, read_enrichment, append_enrichment
+from indicator_store import IndicatorStore
+from instrumentation import stage
+
+DEFAULT_DATA_PATH = "data/raw/ethiopia_fi_unified_data.xlsx"
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = [
+    'record_type', 'indicator_code', 'gender', 'pillar', 'category',
+    'impact_direction', 'impact_magnitude', 'confidence', 'source_name', 'region'
+]
 
 
 def load_data(
-    data_path="data/raw/ethiopia_fi_unified_data.xlsx",
-    enrichment_path=None # Optional, derived from Task 1 logs
+    data_path=DEFAULT_DATA_PATH,
+    enrichment_path=None, # Optional, defaults to the Task 1 enrichment log
+    use_cache=True,
+    streaming=False # Read the source in chunks (always on for CSV exports)
 ):
+    st = _streamlit()
     if st:
-        return _load_data_cached(data_path, enrichment_path)
-    return _load_data_logic(data_path, enrichment_path)
+        return _load_data_cached(st, data_path, enrichment_path, use_cache, streaming)
+    return _load_data_logic(data_path, enrichment_path, use_cache, streaming)
+
+def _streamlit():
+    # Only use Streamlit's cache when running inside the dashboard, which has already
+    # imported it; CLI scripts, notebooks and tests never pay for importing streamlit.
+    return sys.modules.get('streamlit')
+
+def _load_data_cached(st, data_path, enrichment_path, use_cache, streaming):
+    return st.cache_data(_load_data_logic)(data_path, enrichment_path, use_cache, streaming)
+
+def load_store(
+    data_path=DEFAULT_DATA_PATH,
+    enrichment_path=None,
+    use_cache=True,
+    streaming=False
+):
+    """
+    Loads the unified data and indexes it once in an IndicatorStore
+    (observation series, events and joined impact links) for O(1) lookups.
+    """
+    df, df_impact = load_data(data_path, enrichment_path, use_cache, streaming)
+    with stage('load.build_store') as timer:
+        store = IndicatorStore(df, df_impact)
+        timer.rows = len(df)
+    return store
+
+def publish_snapshot(
+    directory,
+    data_path=DEFAULT_DATA_PATH,
+    enrichment_path=None,
+    streaming=False
+):
+    """
+    Loads and indexes the data once, then publishes it as a read-only,
+    memory-mapped snapshot under `directory` (see shared_snapshot) that other
+    processes open with load_shared_store. Returns the snapshot path.
+    """
+    from shared_snapshot import write_snapshot
+
+    df, df_impact = _load_data_logic(data_path, enrichment_path, streaming=streaming)
+    return write_snapshot(IndicatorStore(df, df_impact), directory)
+
+def load_shared_store(directory):
+    """
+    Opens the snapshot last published under `directory` as an IndicatorStore,
+    zero-copy: no workbook parse, and the arrays are shared between processes.
+    """
+    from shared_snapshot import open_snapshot
+
+    return open_snapshot(directory)
 
-def _load_data_cached(data_path, enrichment_path):
-    return st.cache_data(_load_data_logic)(data_path, enrichment_path)
+def invalidate_data_cache(data_path=DEFAULT_DATA_PATH):
+    """
+    Removes the on-disk Parquet cache for a workbook. Returns True if a cache existed.
+    """
+    return invalidate_cache(_resolve_data_path(data_path))
 
-def _load_data_logic(data_path, enrichment_path):
+def rebuild_data_cache(data_path=DEFAULT_DATA_PATH, enrichment_path=None, streaming=False):
+    """
+    Drops any existing cache, re-reads the workbook and writes a fresh cache.
+    """
+    invalidate_data_cache(data_path)
+    st = _streamlit()
+    if st:
+        st.cache_data.clear()
+    return _load_data_logic(data_path, enrichment_path, use_cache=True, streaming=streaming)
 
+def add_enrichment(records, enrichment_path=None):
     """
-    Loads the official XLSX dataset and appends the enrichment data found in Task 1.
+    Appends new enrichment records to the log. The next load merges just these
+    rows into the cached unified frame instead of re-reading the workbook.
     """
+    return append_enrichment(records, enrichment_path or DEFAULT_ENRICHMENT_PATH)
+
+def merge_enrichment(df_unified, records):
+    """
+    Upserts enrichment records into the unified frame.
+    Records are deduplicated on record_id through a hash lookup: the latest
+    version of a record replaces any earlier row with the same id.
+    Returns the merged (untyped) frame.
+    """
+    df_enrich = _enrichment_rows(records)
+    if df_enrich.empty:
+        return df_unified
     
-    # 1. Load Main XLSX Data
+    # Align columns
+    for col in df_unified.columns:
+        if col not in df_enrich.columns:
+            df_enrich[col] = None
+    df_enrich = parse_dates(df_enrich)
+    
+    replaced = df_unified['record_id'].isin(df_enrich['record_id'].dropna())
+    if replaced.any():
+        print(f"Replacing {int(replaced.sum())} records with newer enrichment versions.")
+    
+    return pd.concat([df_unified[~replaced], df_enrich], ignore_index=True)
+
+def _enrichment_rows(records):
+    # The latest version of each record_id (records without an id are all kept)
+    df_enrich = pd.DataFrame(records)
+    if df_enrich.empty or 'record_id' not in df_enrich.columns:
+        return df_enrich
+    ids = df_enrich['record_id']
+    return df_enrich[~ids.duplicated(keep='last') | ids.isna()]
+
+def apply_schema(df, label="data", verbose=True):
+    """
+    Casts a loaded frame to compact dtypes: categoricals for the low-cardinality
+    text columns, the smallest lossless numeric types and a nullable integer data_year.
+    Prints memory usage before and after unless `verbose` is False.
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+    before = df.memory_usage(deep=True).sum()
+    
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    
+    # data_year as a nullable integer (only if every year is a whole number)
+    if 'data_year' in df.columns:
+        years = pd.to_numeric(df['data_year'], errors='coerce')
+        if ((years % 1 == 0) | years.isna()).all():
+            df['data_year'] = years.astype('Int64')
+    
+    # Downcast numerics, but only where no value changes
+    for col in df.select_dtypes(include='number').columns:
+        if col == 'data_year':
+            continue
+        kind = 'integer' if pd.api.types.is_integer_dtype(df[col]) else 'float'
+        downcast = pd.to_numeric(df[col], downcast=kind)
+        if downcast.dtype != df[col].dtype and np.array_equal(
+                downcast.to_numpy(dtype=float), df[col].to_numpy(dtype=float), equal_nan=True):
+            df[col] = downcast
+    
+    if verbose:
+        after = df.memory_usage(deep=True).sum()
+        print(f"Schema applied to {label}: {before / 1024:.1f} KB -> {after / 1024:.1f} KB.")
+    return df
+
+def _resolve_data_path(data_path):
     # Determine the absolute path relative to the project root if needed, 
     # but here we assume the script is run from project root or notebooks folder handling.
     # Adjusting path handling to be robust.
@@ -33,92 +179,146 @@ def _load_data_logic(data_path, enrichment_path):
             data_path = os.path.join("..", data_path)
         else:
             raise FileNotFoundError(f"Main data file not found at: {data_path}")
+    return data_path
+
+def _load_data_logic(data_path, enrichment_path, use_cache=True, streaming=False):
+
+    """
+    Loads the official XLSX dataset and merges the enrichment log (Task 1 onwards).
+    With use_cache, the typed frames are served from (and saved to) a Parquet
+    cache next to the workbook so the xlsx is only parsed when it changes.
+    With streaming (and always for .csv exports), the source is read in
+    bounded-size chunks through ingest.ingest_file instead of whole sheets.
+    """
     
-    print(f"Loading data from {data_path}...")
-    
-    # Read the 'data' sheet - find sheet with 'record_id' column
-    xls = pd.ExcelFile(data_path)
-    target_sheet = None
-    for sheet in xls.sheet_names:
-        try:
-            df_preview = pd.read_excel(data_path, sheet_name=sheet, nrows=1)
-            if 'record_id' in df_preview.columns:
-                target_sheet = sheet
-                break
-        except:
-            continue
-            
-    if target_sheet:
-        df = pd.read_excel(data_path, sheet_name=target_sheet)
-    else:
-        # Fallback to first sheet
-        df = pd.read_excel(data_path, sheet_name=0)
-        
-    print(f"Loaded {len(df)} records from Excel.")
-
-    # 2. Define Enrichment Data (from Task 1)
-    # These are observations we found that were missing from the starter set
-    enrichment_records = [
-        # Event: Foreign Bank Entry Directive
-        {
-            'record_id': 'EVT_NEW_01', 'record_type': 'event', 'category': 'policy', 
-            'indicator': 'NBE Directive SBB/94/2025 (Foreign Banks)', 'start_date': '2025-06-25', 'data_year': 2025,
-            'source_name': 'NBE', 'source_url': 'https://nbe.gov.et', 'confidence': 'high',
-            'notes': 'Official directive opening sector to foreign banks'
-        },
-        # Impact Link: Foreign Bank -> Service Quality
-        {
-            'record_id': 'IMP_NEW_01', 'parent_id': 'EVT_NEW_01', 'record_type': 'impact_link', 
-            'pillar': 'QUALITY', 'impact_direction': 'increase', 'impact_magnitude': 'high', 'lag_months': 12,
-            'notes': 'Competition expected to improve service quality'
-        },
-         # Event: Telebirr 62.5M Target
-        {
-            'record_id': 'EVT_NEW_02', 'record_type': 'target', 'pillar': 'USAGE',
-            'indicator': 'Telebirr User Target 2026', 'indicator_code': 'USG_TELEBIRR_USERS',
-            'value_numeric': 62500000, 'unit': 'users', 'unit_type': 'count',
-            'observation_date': '2026-06-30', 'data_year': 2026,
-            'source_name': 'Ethio Telecom', 'source_url': 'https://ethiotelecom.et', 'confidence': 'medium'
-        }
-    ]
-    
-    # 3. Merge
-    print(f"Enriching with {len(enrichment_records)} new records...")
-    df_enrich = pd.DataFrame(enrichment_records)
+    # 1. Load Main XLSX Data
+    data_path = _resolve_data_path(data_path)
+    enrichment_path = enrichment_path or DEFAULT_ENRICHMENT_PATH
+
+    if use_cache:
+        with stage('load.cache_read') as timer:
+            cached = read_cache(data_path)
+            timer.rows = len(cached[0]) if cached is not None else 0
+        if cached is not None:
+            df_unified, df_impact, manifest = cached
+            records, state, appended = read_enrichment(enrichment_path, since=manifest.get('enrichment'))
+            if appended:
+                if records:
+                    # Only new enrichment lines: merge the delta into the cached frame
+                    print(f"Merging {len(records)} new enrichment records into cached data...")
+                    with stage('load.enrich_delta') as timer:
+                        df_unified = apply_schema(merge_enrichment(df_unified, records), "unified data")
+                        update_cached_unified(data_path, manifest, state, df_unified)
+                        timer.rows = len(records)
+                print(f"Loaded {len(df_unified)} records and {len(df_impact)} impact links from cache.")
+                return df_unified, df_impact
+            print("Enrichment log was rewritten; rebuilding from the workbook.")
     
-    # Align columns
-    for col in df.columns:
-        if col not in df_enrich.columns:
-            df_enrich[col] = None
-            
-    df_unified = pd.concat([df, df_enrich], ignore_index=True)
+    print(f"Loading data from {data_path}...")
+
+    if streaming or data_path.lower().endswith('.csv'):
+        return _load_streaming(data_path, enrichment_path, use_cache)
+
+    df, df_impact = _read_workbook(data_path)
     
-    # Ensure correct types for dates
-    date_cols = ['observation_date', 'start_date', 'end_date', 'collection_date']
-    for col in date_cols:
-        if col in df_unified.columns:
-            df_unified[col] = pd.to_datetime(df_unified[col], errors='coerce')
+    with stage('load.parse_dates') as timer:
+        df = parse_dates(df)
+        timer.rows = len(df)
     
-    # Derive data_year from observation_date if missing
-    if 'observation_date' in df_unified.columns and 'data_year' in df_unified.columns:
-        df_unified['data_year'] = df_unified['data_year'].fillna(df_unified['observation_date'].dt.year)
+    # 3. Merge the enrichment log
+    with stage('load.enrich') as timer:
+        records, state, _ = read_enrichment(enrichment_path)
+        print(f"Enriching with {len(records)} new records...")
+        df_unified = merge_enrichment(df, records)
+        timer.rows = len(records)
     
-    # 4. Load Impact Sheet
-    print("Loading Impact Sheet...")
-    try:
-        if target_sheet:
-             # If we identified a target sheet earlier, we assume impact sheet is in same file
-             df_impact = pd.read_excel(data_path, sheet_name='Impact_sheet')
-        else:
-             df_impact = pd.read_excel(data_path, sheet_name='Impact_sheet')
-             
-        print(f"Loaded {len(df_impact)} impact links.")
-    except Exception as e:
-        print(f"Warning: Could not load Impact_sheet. Error: {e}")
-        df_impact = pd.DataFrame() # Return empty if fail
+    # Compact dtypes (categoricals, downcast numerics, nullable integer years)
+    with stage('load.schema') as timer:
+        df_unified = apply_schema(df_unified, "unified data")
+        df_impact = apply_schema(df_impact, "impact links")
+        timer.rows = len(df_unified) + len(df_impact)
+
+    if use_cache:
+        with stage('load.cache_write'):
+            write_cache(data_path, state, df_unified, df_impact)
 
     return df_unified, df_impact
 
+def _load_streaming(data_path, enrichment_path, use_cache):
+    # Each chunk is parsed, merged with the enrichment log and typed on its own and
+    # written straight to the columnar cache (or a scratch file without the cache),
+    # so only one raw chunk and the finished typed frames are ever in memory
+    import tempfile
+    from ingest import ingest_file, DEFAULT_CHUNKSIZE
+
+    records, state, _ = read_enrichment(enrichment_path)
+    print(f"Enriching with {len(records)} new records...")
+
+    def typed(label):
+        return lambda chunk: apply_schema(chunk, label, verbose=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir, stage('load.read_streaming') as timer:
+        if use_cache:
+            paths = cache_paths(data_path)
+            try:
+                os.makedirs(paths['dir'], exist_ok=True)
+                # The old manifest must not vouch for half-replaced files
+                invalidate_cache(data_path)
+            except OSError as e:
+                print(f"Warning: Could not write data cache. Error: {e}")
+                use_cache = False
+        if not use_cache:
+            paths = {'unified': os.path.join(tmpdir, 'unified.parquet'),
+                     'impact': os.path.join(tmpdir, 'impact.parquet')}
+        rows, impact_rows = ingest_file(data_path, paths['unified'], paths['impact'], DEFAULT_CHUNKSIZE,
+                                        transform=typed("unified data"), impact_transform=typed("impact links"),
+                                        upserts=_enrichment_rows(records))
+        if use_cache:
+            write_cache_manifest(data_path, state)
+        df_unified = pd.read_parquet(paths['unified'])
+        df_impact = pd.read_parquet(paths['impact'])
+        timer.rows = rows + impact_rows
+    print(f"Streamed {rows} records and {impact_rows} impact links.")
+    return df_unified, df_impact
+
+def _read_workbook(data_path):
+    # Read the 'data' sheet - find sheet with 'record_id' column.
+    # All reads share one ExcelFile handle so the workbook is only opened once.
+    with pd.ExcelFile(data_path) as xls:
+        target_sheet = None
+        with stage('load.sheet_probe') as timer:
+            for sheet in xls.sheet_names:
+                try:
+                    df_preview = xls.parse(sheet_name=sheet, nrows=1)
+                    if 'record_id' in df_preview.columns:
+                        target_sheet = sheet
+                        break
+                except Exception:
+                    continue
+            timer.rows = len(xls.sheet_names)
+                
+        with stage('load.read_sheet') as timer:
+            if target_sheet:
+                df = xls.parse(sheet_name=target_sheet)
+            else:
+                # Fallback to first sheet
+                df = xls.parse(sheet_name=0)
+            timer.rows = len(df)
+            
+        print(f"Loaded {len(df)} records from Excel.")
+
+        # 2. Load Impact Sheet
+        print("Loading Impact Sheet...")
+        with stage('load.read_impact') as timer:
+            try:
+                df_impact = xls.parse(sheet_name='Impact_sheet')
+                print(f"Loaded {len(df_impact)} impact links.")
+            except Exception as e:
+                print(f"Warning: Could not load Impact_sheet. Error: {e}")
+                df_impact = pd.DataFrame() # Return empty if fail
+            timer.rows = len(df_impact)
+    return df, df_impact
+
 if __name__ == "__main__":
     # Test
     try:
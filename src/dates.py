@@ -0,0 +1,19 @@
+import pandas as pd
+
+# Shared by the whole-sheet loader (data_loader) and the chunked one (ingest)
+DATE_COLUMNS = ['observation_date', 'start_date', 'end_date', 'collection_date']
+
+
+def parse_dates(df):
+    """
+    Parses the date columns in place (unparseable values become NaT) and fills a
+    missing data_year from observation_date. Returns the frame.
+    """
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    
+    # Derive data_year from observation_date if missing
+    if 'observation_date' in df.columns and 'data_year' in df.columns:
+        df['data_year'] = pd.to_numeric(df['data_year'], errors='coerce').fillna(df['observation_date'].dt.year)
+    return df
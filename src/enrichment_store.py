@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+
+# Enrichment records (from Task 1 and later data collection) live in an
+# append-only JSON Lines log; one record per line, later lines win on record_id.
+DEFAULT_ENRICHMENT_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', 'data', 'enrichment', 'enrichment_records.jsonl'))
+
+
+def read_enrichment(path=DEFAULT_ENRICHMENT_PATH, since=None):
+    """
+    Reads enrichment records from the JSONL log.
+
+    `since` is the state returned by a previous call. If the log has only been
+    appended to since then, just the new records are returned and `appended`
+    is True; otherwise every record is returned with appended=False.
+    Returns (records, state, appended). A trailing line without a newline
+    (a write in progress) is left for the next read.
+    """
+    try:
+        with open(path, 'rb') as fh:
+            data = fh.read()
+    except FileNotFoundError:
+        print(f"Warning: Enrichment log not found at {path}; loading without enrichment.")
+        data = b''
+
+    # Only consume complete lines
+    end = data.rfind(b'\n') + 1
+    state = {'offset': end, 'sha256': hashlib.sha256(data[:end]).hexdigest()}
+
+    start = 0
+    appended = False
+    if since:
+        offset = since.get('offset', -1)
+        if 0 <= offset <= end and hashlib.sha256(data[:offset]).hexdigest() == since.get('sha256'):
+            start = offset
+            appended = True
+
+    records = [json.loads(line) for line in data[start:end].decode('utf-8').splitlines() if line.strip()]
+    return records, state, appended
+
+
+def append_enrichment(records, path=DEFAULT_ENRICHMENT_PATH):
+    """
+    Appends records to the enrichment log. Existing lines are never rewritten;
+    to correct a record, append a new version with the same record_id.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    needs_newline = False
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, 'rb') as fh:
+            fh.seek(-1, os.SEEK_END)
+            needs_newline = fh.read(1) != b'\n'
+    with open(path, 'a', encoding='utf-8') as fh:
+        if needs_newline:
+            fh.write('\n')
+        for record in records:
+            fh.write(json.dumps(record, default=str) + '\n')
+    return len(records)
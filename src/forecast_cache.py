@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from forecaster import run_baseline_forecast, evaluate_scenarios
+from incremental_forecaster import IncrementalForecaster
+from indicator_store import IndicatorStore, dataset_fingerprint
+from simulation import simulate_forecast
+
+
+class ForecastCache:
+    """
+    Bounded LRU memo around the forecaster APIs.
+
+    Entries are keyed on (call, indicator, year range, scenario inputs, dataset
+    fingerprint), so a reloaded or edited dataset never serves stale results.
+    Cached frames/arrays are shared between callers and must be treated as
+    read-only. Safe to share across threads (e.g. one instance per Streamlit server).
+
+    With an IncrementalForecaster (seeded from the same dataset), observations
+    can be appended without reloading: add_observations folds them into its
+    statistics and drops the changed indicators' entries, and baselines of
+    those indicators are then served from the updated trend. Scenarios and
+    simulations built on the baseline follow.
+    """
+
+    def __init__(self, maxsize=256, incremental=None):
+        self.maxsize = maxsize
+        self.incremental = incremental
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def baseline(self, data, indicator_code, start_year=2025, end_year=2027):
+        """
+        Memoized run_baseline_forecast. `data` is an IndicatorStore or the unified dataframe.
+        Indicators with appended observations come from the incremental forecaster.
+        """
+        fingerprint = _fingerprint(data)
+        key = ('baseline', indicator_code, start_year, end_year, fingerprint)
+        incremental = self.incremental
+        if incremental is not None and indicator_code in incremental.updated \
+                and incremental.fingerprint == fingerprint:
+            return self.get_or_compute(key, lambda: incremental.forecast(indicator_code, start_year, end_year))
+        return self.get_or_compute(
+            key, lambda: run_baseline_forecast(data, indicator_code, start_year, end_year))
+
+    def add_observations(self, df):
+        """
+        Appends observation rows (unified schema, e.g. a new survey point) to the
+        incremental forecaster and invalidates the indicators they change, so the
+        next baseline/scenarios call serves the updated forecast without a reload.
+        Returns the changed indicator codes.
+        """
+        if self.incremental is None:
+            raise ValueError("ForecastCache was built without an IncrementalForecaster")
+        changed = self.incremental.add_observations(df)
+        self.invalidate(changed)
+        return changed
+
+    def scenarios(self, store, indicator_code, start_year=2025, end_year=2027, scenarios=None, modifiers=None):
+        """
+        Memoized evaluate_scenarios over the store's precomputed impact schedule
+        for one indicator. Returns the (scenario x year) array.
+        """
+        scenario_key = tuple(scenarios) if scenarios is not None else None
+        modifier_key = tuple(np.atleast_1d(modifiers).tolist()) if modifiers is not None else None
+        # graph.version changes whenever a link is upserted into the impact graph
+        key = ('scenarios', indicator_code, start_year, end_year, scenario_key, modifier_key,
+               store.fingerprint, store.graph.version)
+
+        def compute():
+            baseline = self.baseline(store, indicator_code, start_year, end_year)
+            if baseline.empty:
+                return np.zeros((0, 0))
+            return evaluate_scenarios(baseline, store.schedule(indicator_code), scenarios=scenarios,
+                                      modifiers=modifiers, indicator_code=indicator_code)
+        return self.get_or_compute(key, compute)
+
+    def simulation(self, store, indicator_code, start_year=2025, end_year=2027, **kwargs):
+        """
+        Memoized simulate_forecast; extra keyword arguments (target, n_paths, seed, ...)
+        are part of the key.
+        """
+        key = ('simulation', indicator_code, start_year, end_year,
+               tuple(sorted(kwargs.items())), store.fingerprint, store.graph.version)
+        return self.get_or_compute(key, lambda: simulate_forecast(
+            store, store.impacts_for(indicator_code), indicator_code, start_year, end_year, **kwargs))
+
+    def invalidate(self, indicator_codes):
+        """
+        Drops the cached results of the given indicators only, e.g. the codes
+        returned by IncrementalForecaster.add_observations. Returns the number removed.
+        """
+        codes = {indicator_codes} if isinstance(indicator_codes, str) else set(indicator_codes)
+        with self._lock:
+            stale = [key for key in self._entries if key[1] in codes]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def _fingerprint(data):
+    if isinstance(data, IndicatorStore):
+        return data.fingerprint
+    return dataset_fingerprint(data)
@@ -1,86 +1,388 @@
+import signal
+
 import pandas as pd
 import numpy as np
 
+from indicator_store import IndicatorStore, observation_mask
+from impact_graph import ImpactSchedule, MAGNITUDE_CLASSES
+from instrumentation import timed
+
+# Magnitude modifiers for scenarios
+SCENARIO_MODIFIERS = {'optimistic': 1.5, 'base': 1.0, 'pessimistic': 0.5}
+
+# Mapping impacts to sizes: percentage points for rates,
+# growth factors (fraction of baseline) for counts
+RATE_MAGNITUDES = {'high': 5.0, 'medium': 2.5, 'low': 1.0}
+COUNT_MAGNITUDES = {'high': 0.20, 'medium': 0.10, 'low': 0.05}
+
+def observation_history(df, indicator_code, gender='all'):
+    """
+    Year-sorted (years, values) arrays for one indicator.
+    df may be the unified dataframe or an IndicatorStore (O(1) lookup).
+    """
+    if isinstance(df, IndicatorStore):
+        return df.series(indicator_code, gender)
+    hist = df[(df['indicator_code'] == indicator_code) & 
+              observation_mask(df, gender)].sort_values('data_year')
+    years = hist['data_year'].to_numpy(dtype=float, na_value=np.nan)
+    return years, hist['value_numeric'].to_numpy(dtype=float, na_value=np.nan)
+
+@timed()
 def run_baseline_forecast(df, indicator_code, start_year=2025, end_year=2027):
     """
     Runs a baseline trend forecast using numpy polyfit (linear) on historical data.
+    df may be the unified dataframe or an IndicatorStore.
     Returns a dataframe with forecasted years.
     """
-    hist = df[(df['indicator_code'] == indicator_code) & 
-              (df['record_type'] == 'observation') & 
-              (df['gender'] == 'all')].sort_values('data_year')
+    x_hist, y_hist = observation_history(df, indicator_code)
     
-    if len(hist) < 2:
+    if len(x_hist) < 2:
         return pd.DataFrame()
     
-    x_hist = hist['data_year'].values
-    y_hist = hist['value_numeric'].values
+    forecast_years = np.arange(start_year, end_year + 1)
+    preds, uncertainty = fit_linear_trend(x_hist, y_hist, forecast_years)
+    
+    forecast_df = pd.DataFrame({
+        'data_year': forecast_years,
+        'baseline_prediction': preds,
+        'ci_lower': preds - uncertainty,
+        'ci_upper': preds + uncertainty
+    })
+    
+    # Ensure non-negative
+    for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
+        forecast_df[col] = forecast_df[col].clip(lower=0)
     
+    return forecast_df
+
+def fit_linear_trend(x_hist, y_hist, forecast_years):
+    """
+    Linear polyfit trend. Returns (predictions, uncertainty) where uncertainty
+    is the half-width of the ~95% band (1.96 x std of residuals).
+    """
     # Linear fit: y = mx + c
     coefficients = np.polyfit(x_hist, y_hist, 1)
     polynomial = np.poly1d(coefficients)
-    
-    forecast_years = np.arange(start_year, end_year + 1)
     preds = polynomial(forecast_years)
     
     # Simple uncertainty: std of residuals
     resids = y_hist - polynomial(x_hist)
-    uncertainty = np.std(resids) * 1.96 # 95% CI roughly
+    return preds, np.std(resids) * 1.96 # 95% CI roughly
+
+def fit_holt_trend(x_hist, y_hist, forecast_years):
+    """
+    Holt's linear exponential smoothing (statsmodels) on the series averaged per
+    year and interpolated onto whole years. Series with fewer than 4 years fall
+    back to the linear trend. Returns (predictions, uncertainty) like fit_linear_trend.
+    """
+    # Imported lazily: statsmodels is slow to import and only this model needs it
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+    
+    years, inverse = np.unique(x_hist, return_inverse=True)
+    values = np.bincount(inverse, weights=y_hist) / np.bincount(inverse)
+    grid = np.arange(years[0], years[-1] + 1)
+    if len(grid) < 4:
+        return fit_linear_trend(x_hist, y_hist, forecast_years)
+    
+    fit = ExponentialSmoothing(np.interp(grid, years, values), trend='add',
+                               initialization_method='estimated').fit()
+    horizon = int(max(forecast_years.max() - grid[-1], 0))
+    path_years = np.concatenate((grid, grid[-1] + np.arange(1, horizon + 1)))
+    path = np.concatenate((fit.fittedvalues, fit.forecast(horizon) if horizon else []))
+    return np.interp(forecast_years, path_years, path), np.std(fit.resid) * 1.96
+
+# Models available to forecast_all; each maps (x_hist, y_hist, forecast_years)
+# to (predictions, uncertainty)
+FORECAST_MODELS = {
+    'linear': fit_linear_trend,
+    'holt': fit_holt_trend,
+}
+
+@timed()
+def forecast_all(df, model='linear', indicator_codes=None, start_year=2025, end_year=2027,
+                 n_jobs=1, timeout=None):
+    """
+    Fits `model` to every indicator ('all' gender) and forecasts start_year..end_year.
+    df may be the unified dataframe or an IndicatorStore; model is a name in
+    FORECAST_MODELS or a picklable module-level function with the same signature.
+    
+    With n_jobs > 1 the fits run on a process pool, and each task only carries
+    that indicator's (years, values) arrays. `timeout` (seconds, pool only) aborts
+    any single fit that runs longer, inside the worker so the worker is freed; where
+    SIGALRM is unavailable it instead bounds the wait on each result. Timed-out or
+    failed indicators are left out of the result and listed in
+    result.attrs['failed'] as {indicator_code: reason}.
+    Rows come back in indicator order (indicator_codes as given, else sorted),
+    whatever order the workers finish in.
+    Returns a long dataframe like run_baseline_forecasts.
+    """
+    columns = ['indicator_code', 'data_year', 'baseline_prediction', 'ci_lower', 'ci_upper']
+    if isinstance(model, str):
+        if model not in FORECAST_MODELS:
+            raise ValueError(f"Unknown model '{model}'. Choose from: {', '.join(FORECAST_MODELS)}")
+        fit = FORECAST_MODELS[model]
+    else:
+        fit = model
+    
+    store = df if isinstance(df, IndicatorStore) else IndicatorStore(df)
+    codes = sorted(store.indicator_codes()) if indicator_codes is None else list(indicator_codes)
+    forecast_years = np.arange(start_year, end_year + 1)
+    tasks = []
+    for code in codes:
+        x_hist, y_hist = store.series(code)
+        # Need at least 2 points for a trend
+        if len(x_hist) >= 2:
+            tasks.append((code, (fit, x_hist, y_hist, forecast_years)))
+    
+    results, failed = {}, {}
+    if n_jobs and n_jobs > 1 and len(tasks) > 1:
+        # Imported lazily: the process pool machinery is only needed for parallel runs
+        from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+        pool = ProcessPoolExecutor(max_workers=n_jobs)
+        try:
+            in_worker = timeout is not None and hasattr(signal, 'setitimer')
+            futures = [(code, pool.submit(_fit_task, task, timeout if in_worker else None))
+                       for code, task in tasks]
+            for code, future in futures:
+                try:
+                    results[code] = future.result(timeout=None if in_worker else timeout)
+                except (FutureTimeoutError, TimeoutError):
+                    # Before Python 3.11 these differ: the first comes from result(timeout=),
+                    # the builtin one from the worker's SIGALRM handler
+                    future.cancel()
+                    failed[code] = 'timeout'
+                except Exception as e:
+                    failed[code] = f"error: {e}"
+        finally:
+            # A fit that overran without SIGALRM may still be running; don't block on it
+            pool.shutdown(wait=not failed, cancel_futures=True)
+    else:
+        for code, task in tasks:
+            try:
+                results[code] = _fit_task(task)
+            except Exception as e:
+                failed[code] = f"error: {e}"
+    
+    if failed:
+        print(f"Warning: {len(failed)} indicator forecasts failed: {', '.join(failed)}")
+    
+    fitted = [code for code, _ in tasks if code in results]
+    if not fitted:
+        forecast_df = pd.DataFrame(columns=columns)
+        forecast_df.attrs['failed'] = failed
+        return forecast_df
+    preds = np.array([results[code][0] for code in fitted], dtype=float)
+    uncertainty = np.array([results[code][1] for code in fitted], dtype=float)
     
     forecast_df = pd.DataFrame({
-        'data_year': forecast_years,
-        'baseline_prediction': preds,
-        'ci_lower': preds - uncertainty,
-        'ci_upper': preds + uncertainty
+        'indicator_code': np.repeat(fitted, len(forecast_years)),
+        'data_year': np.tile(forecast_years, len(fitted)),
+        'baseline_prediction': preds.ravel(),
+        'ci_lower': (preds - uncertainty[:, None]).ravel(),
+        'ci_upper': (preds + uncertainty[:, None]).ravel()
     })
     
     # Ensure non-negative
     for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
         forecast_df[col] = forecast_df[col].clip(lower=0)
-    
+    forecast_df.attrs['failed'] = failed
     return forecast_df
 
-def apply_event_impacts(baseline_forecast, impact_model, scenario='base', indicator_code=None):
+def _fit_task(task, timeout=None):
+    # Module-level so it can be sent to a process pool
+    fit, x_hist, y_hist, forecast_years = task
+    if timeout is None:
+        preds, uncertainty = fit(x_hist, y_hist, forecast_years)
+        return np.asarray(preds, dtype=float), float(uncertainty)
+    # Pool workers run tasks on their main thread, so an interval timer can interrupt the fit
+    previous = signal.signal(signal.SIGALRM, _fit_timed_out)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _fit_task(task)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _fit_timed_out(signum, frame):
+    raise TimeoutError("forecast fit timed out")
+
+@timed()
+def run_baseline_forecasts(df, indicator_codes=None, start_year=2025, end_year=2027):
     """
-    Applies event impacts to a baseline forecast.
-    impact_model should be the joined impact/event dataframe from data_loader/Task 3.
-    scenario: 'base', 'optimistic', 'pessimistic'
+    Batched version of run_baseline_forecast for many indicators at once.
+    df may be the unified dataframe or an IndicatorStore.
+    Observations are grouped by indicator_code once and every linear fit is solved
+    together with closed-form least squares over padded arrays.
+    Returns a long dataframe with one row per (indicator_code, data_year).
     """
-    forecast = baseline_forecast.copy()
+    columns = ['indicator_code', 'data_year', 'baseline_prediction', 'ci_lower', 'ci_upper']
+    if isinstance(df, IndicatorStore):
+        # The store already keeps every series contiguous
+        codes, group, x, y = df.grouped_series('all', indicator_codes)
+    else:
+        obs = df[observation_mask(df, 'all')]
+        if indicator_codes is not None:
+            obs = obs[obs['indicator_code'].isin(list(indicator_codes))]
+        
+        # Group once: integer group ids and each row's slot inside its group
+        codes, group = np.unique(obs['indicator_code'].to_numpy(dtype=str), return_inverse=True)
+        order = np.argsort(group, kind='stable')
+        group = group[order]
+        x = obs['data_year'].to_numpy(dtype=float, na_value=np.nan)[order]
+        y = obs['value_numeric'].to_numpy(dtype=float, na_value=np.nan)[order]
+    
+    if len(group) == 0:
+        return pd.DataFrame(columns=columns)
+    
+    counts = np.bincount(group, minlength=len(codes))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    slot = np.arange(len(group)) - starts[group]
+    
+    # Padded (indicator x observation) arrays; the mask marks real observations
+    X = np.zeros((len(codes), counts.max()))
+    Y = np.zeros_like(X)
+    mask = np.zeros(X.shape, dtype=bool)
+    X[group, slot] = x
+    Y[group, slot] = y
+    mask[group, slot] = True
+    
+    # Linear fit: y = mx + c, on centred years for numerical stability
+    n = counts.astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = X.sum(axis=1) / n
+        y_mean = Y.sum(axis=1) / n
+        dx = np.where(mask, X - x_mean[:, None], 0.0)
+        dy = np.where(mask, Y - y_mean[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        sxy = (dx * dy).sum(axis=1)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+    intercept = y_mean - slope * x_mean
+    
+    # Simple uncertainty: std of residuals (same as the single-indicator version)
+    resids = np.where(mask, Y - (slope[:, None] * X + intercept[:, None]), 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        uncertainty = np.sqrt((resids * resids).sum(axis=1) / n) * 1.96
+    
+    # Need at least 2 points for a trend
+    keep = counts >= 2
+    codes, slope, intercept, uncertainty = codes[keep], slope[keep], intercept[keep], uncertainty[keep]
+    
+    forecast_years = np.arange(start_year, end_year + 1)
+    preds = slope[:, None] * forecast_years[None, :] + intercept[:, None]
+    
+    forecast_df = pd.DataFrame({
+        'indicator_code': np.repeat(codes, len(forecast_years)),
+        'data_year': np.tile(forecast_years, len(codes)),
+        'baseline_prediction': preds.ravel(),
+        'ci_lower': (preds - uncertainty[:, None]).ravel(),
+        'ci_upper': (preds + uncertainty[:, None]).ravel()
+    })
     
-    # Magnitude modifiers for scenarios
-    mod_map = {'optimistic': 1.5, 'base': 1.0, 'pessimistic': 0.5}
-    modifier = mod_map.get(scenario, 1.0)
+    # Ensure non-negative
+    for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
+        forecast_df[col] = forecast_df[col].clip(lower=0)
     
-    # Is it a rate (%) or a count?
-    is_rate = True
+    return forecast_df
+
+def is_rate_indicator(indicator_code):
+    """
+    Is it a rate (%) or a count? Usage indicators are counts unless they are *_RATE.
+    """
     if indicator_code and (indicator_code.startswith('USG_') and '_RATE' not in indicator_code):
-        is_rate = False
+        return False
+    return True
 
-    # Mapping impacts to years
-    if is_rate:
-        mag_map = {'high': 5.0, 'medium': 2.5, 'low': 1.0}
+def _impact_schedule(years, impact_model, is_rate):
+    """
+    Buckets impact links into the forecast window.
+    Returns (year_pos, signed_magnitude): for every link realised in one of `years`,
+    the position of that year in `years` and its direction-signed base magnitude.
+    Links realised outside the window are dropped, as are links without a realised year.
+    """
+    if impact_model is None or len(impact_model) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    
+    mag_map = RATE_MAGNITUDES if is_rate else COUNT_MAGNITUDES
+    if isinstance(impact_model, ImpactSchedule):
+        # Precomputed by ImpactGraph: plain arrays, magnitudes as class codes (-1 = unknown)
+        realized = impact_model.realized_year
+        lookup = np.array([mag_map[name] for name in MAGNITUDE_CLASSES] + [0.0])
+        magnitude = lookup[impact_model.magnitude]
+        direction = impact_model.direction
     else:
-        # Growth factors for counts (fraction of baseline)
-        mag_map = {'high': 0.20, 'medium': 0.10, 'low': 0.05}
-    
-    for _, row in impact_model.iterrows():
-        impact_year = int(row['realized_year'])
-        if impact_year in forecast['data_year'].values:
-            base_mag = mag_map.get(str(row['impact_magnitude']).lower(), 0.0)
-            direction = 1 if row['impact_direction'] == 'increase' else -1
-            
-            net_impact_val = base_mag * direction * modifier
-            
-            if is_rate:
-                # Additive for rates (pp)
-                forecast.loc[forecast['data_year'] >= impact_year, 'baseline_prediction'] += net_impact_val
-            else:
-                # Multiplicative for counts (growth)
-                forecast.loc[forecast['data_year'] >= impact_year, 'baseline_prediction'] *= (1 + net_impact_val)
-
-            
-    # Ensure non-negative
-    forecast['baseline_prediction'] = forecast['baseline_prediction'].clip(lower=0)
+        realized = pd.to_numeric(impact_model['realized_year'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        magnitude = impact_model['impact_magnitude'].astype(str).str.lower().map(mag_map).fillna(0.0).to_numpy(dtype=float)
+        direction = np.where(impact_model['impact_direction'] == 'increase', 1.0, -1.0)
+    known = ~np.isnan(realized)
+    impact_year = np.trunc(realized[known])
+    
+    pos = np.searchsorted(years, impact_year)
+    in_window = (pos < len(years)) & (years[np.minimum(pos, len(years) - 1)] == impact_year)
+    signed = (magnitude * direction)[known]
+    
+    return pos[in_window], signed[in_window]
+
+def _cumulative_effect(year_pos, signed_magnitude, n_years, modifiers, is_rate):
+    """
+    Turns an impact schedule into the cumulative effect per (modifier, year).
+    Rates get an additive pp shift, counts a multiplicative growth factor;
+    an impact realised in year t applies to t and every later year.
+    """
+    modifiers = np.atleast_1d(np.asarray(modifiers, dtype=float))
+    if is_rate:
+        # Additive for rates (pp): the modifier factors out of the sum
+        per_year = np.bincount(year_pos, weights=signed_magnitude, minlength=n_years)
+        return modifiers[:, None] * np.cumsum(per_year)[None, :]
+    
+    # Multiplicative for counts (growth)
+    factors = 1.0 + modifiers[:, None] * signed_magnitude[None, :]
+    per_year = np.ones((len(modifiers), n_years))
+    np.multiply.at(per_year, (slice(None), year_pos), factors)
+    return np.cumprod(per_year, axis=1)
+
+@timed(rows=lambda grid: grid.size)
+def evaluate_scenarios(baseline_forecast, impact_model, scenarios=None, modifiers=None, indicator_code=None):
+    """
+    Evaluates many scenarios against one shared impact schedule.
+    Pass named `scenarios` (keys of SCENARIO_MODIFIERS) and/or raw `modifiers`,
+    e.g. np.arange(0.0, 2.01, 0.1) for a sensitivity fan.
+    Returns a (scenario x year) array of predictions aligned with the baseline rows;
+    named scenarios come first, followed by the raw modifiers.
+    """
+    if scenarios is None and modifiers is None:
+        scenarios = list(SCENARIO_MODIFIERS)
+    values = [SCENARIO_MODIFIERS.get(scn, 1.0) for scn in (scenarios or [])]
+    if modifiers is not None:
+        values.extend(np.atleast_1d(np.asarray(modifiers, dtype=float)).tolist())
+    values = np.asarray(values, dtype=float)
     
+    preds = baseline_forecast['baseline_prediction'].to_numpy(dtype=float)
+    if len(preds) == 0:
+        return np.zeros((len(values), 0))
+    
+    is_rate = is_rate_indicator(indicator_code)
+    row_years = baseline_forecast['data_year'].to_numpy(dtype=float, na_value=np.nan)
+    years = np.unique(row_years)
+    year_pos, signed = _impact_schedule(years, impact_model, is_rate)
+    effect = _cumulative_effect(year_pos, signed, len(years), values, is_rate)
+    row_effect = effect[:, np.searchsorted(years, row_years)]
+    
+    result = preds[None, :] + row_effect if is_rate else preds[None, :] * row_effect
+    
+    # Ensure non-negative
+    return np.clip(result, 0, None)
+
+@timed()
+def apply_event_impacts(baseline_forecast, impact_model, scenario='base', indicator_code=None):
+    """
+    Applies event impacts to a baseline forecast.
+    impact_model should be the joined impact/event dataframe from data_loader/Task 3.
+    scenario: 'base', 'optimistic', 'pessimistic'
+    """
+    forecast = baseline_forecast.copy()
+    if forecast.empty:
+        return forecast
+    forecast['baseline_prediction'] = evaluate_scenarios(
+        baseline_forecast, impact_model, scenarios=[scenario], indicator_code=indicator_code
+    )[0]
     return forecast
@@ -0,0 +1,226 @@
+from collections import namedtuple
+
+import pandas as pd
+import numpy as np
+
+# Magnitude classes in the order used by the magnitude codes below; unknown -> -1
+MAGNITUDE_CLASSES = ('high', 'medium', 'low')
+
+# An indicator's impacts sorted by realised year: direction is +1/-1 and
+# magnitude indexes MAGNITUDE_CLASSES (-1 when unknown). forecaster accepts this
+# in place of a joined impact model.
+ImpactSchedule = namedtuple('ImpactSchedule', ['realized_year', 'direction', 'magnitude', 'edges'])
+
+
+class ImpactGraph:
+    """
+    Events and indicators as nodes, impact links as edges.
+
+    Edge attributes (event, indicator, realised year, direction, magnitude) live
+    in parallel NumPy arrays. Each node keeps an adjacency array of its edge ids;
+    an indicator's edges are kept sorted by realised year and its ImpactSchedule
+    is precomputed, so "which events affect X" and "what does event E touch" are
+    O(degree). upsert_link touches only the adjacency of the nodes involved.
+    """
+
+    def __init__(self, events=None, links=None):
+        """
+        events: frame with record_id and data_year (event rows of the unified data).
+        links: impact links with record_id, parent_id, related_indicator,
+        impact_direction, impact_magnitude and lag_months.
+        """
+        self._event_year = {}
+        self._edge_ids = {}
+        self._by_event = {}
+        self._by_indicator = {}
+        self._schedules = {}
+        self.version = 0
+
+        if events is not None and len(events):
+            years = pd.to_numeric(events['data_year'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            self._event_year = dict(zip(events['record_id'], years))
+
+        links = links if links is not None else pd.DataFrame()
+        n = len(links)
+        self._size = n
+        self.link_ids = np.empty(max(n, 8), dtype=object)
+        self.events = np.empty(max(n, 8), dtype=object)
+        self.indicators = np.empty(max(n, 8), dtype=object)
+        self.realized_year = np.full(max(n, 8), np.nan)
+        self.direction = np.zeros(max(n, 8))
+        self.magnitude = np.full(max(n, 8), -1, dtype=np.int8)
+        if n == 0 or 'parent_id' not in links.columns:
+            self._size = 0
+            return
+
+        # After the join with events the link's own id is suffixed
+        id_column = next((col for col in ('record_id', 'record_id_x') if col in links.columns), None)
+        record_ids = links[id_column] if id_column else pd.Series(np.arange(n))
+        self.link_ids[:n] = record_ids.to_numpy(dtype=object)
+        self.events[:n] = links['parent_id'].to_numpy(dtype=object)
+        self.indicators[:n] = links['related_indicator'].to_numpy(dtype=object)
+        if 'realized_year' in links.columns:
+            # Already joined (IndicatorStore.impact_model): edge ids match its rows
+            self.realized_year[:n] = pd.to_numeric(links['realized_year'], errors='coerce').to_numpy(
+                dtype=float, na_value=np.nan)
+        else:
+            self.realized_year[:n] = self._realized_years(links['parent_id'], links.get('lag_months'))
+        self.direction[:n] = np.where(links['impact_direction'] == 'increase', 1.0, -1.0)
+        self.magnitude[:n] = self._magnitude_codes(links['impact_magnitude'])
+        self._edge_ids = {rid: pos for pos, rid in enumerate(self.link_ids[:n])}
+
+        # Adjacency arrays: one grouping pass per side
+        for node, idx in pd.Series(self.events[:n]).groupby(self.events[:n], sort=False).indices.items():
+            self._by_event[node] = idx
+        for node, idx in pd.Series(self.indicators[:n]).groupby(self.indicators[:n], sort=False).indices.items():
+            self._by_indicator[node] = idx[np.argsort(self.realized_year[idx], kind='stable')]
+
+    @classmethod
+    def from_data(cls, df, df_impact):
+        """
+        Builds the graph from the unified frame (events) and the impact links.
+        """
+        events = df[df['record_type'] == 'event'] if 'record_type' in df.columns else None
+        return cls(events, df_impact)
+
+    def _realized_years(self, parent_ids, lag_months):
+        event_year = np.array([self._event_year.get(pid, np.nan) for pid in parent_ids], dtype=float)
+        if lag_months is None:
+            return event_year
+        lag = pd.to_numeric(pd.Series(lag_months), errors='coerce').fillna(0).to_numpy(dtype=float)
+        return event_year + lag / 12.0
+
+    @staticmethod
+    def _magnitude_codes(magnitudes):
+        lookup = {name: code for code, name in enumerate(MAGNITUDE_CLASSES)}
+        return pd.Series(magnitudes).astype(str).str.lower().map(lookup).fillna(-1).to_numpy(dtype=np.int8)
+
+    def __len__(self):
+        return self._size
+
+    def edges_to(self, indicator_code):
+        """
+        Edge ids of the links affecting an indicator, sorted by realised year.
+        """
+        return self._by_indicator.get(indicator_code, np.zeros(0, dtype=int))
+
+    def edges_from(self, event_id):
+        """
+        Edge ids of the links originating from an event.
+        """
+        return self._by_event.get(event_id, np.zeros(0, dtype=int))
+
+    def events_affecting(self, indicator_code):
+        """
+        Distinct events with at least one link to the indicator, in realised-year order.
+        """
+        return list(dict.fromkeys(self.events[self.edges_to(indicator_code)]))
+
+    def indicators_touched(self, event_id):
+        """
+        Distinct indicators an event links to.
+        """
+        return list(dict.fromkeys(self.indicators[self.edges_from(event_id)]))
+
+    def schedule(self, indicator_code):
+        """
+        The indicator's ImpactSchedule, computed on first use and kept until one
+        of its links changes.
+        """
+        schedule = self._schedules.get(indicator_code)
+        if schedule is None:
+            edges = self.edges_to(indicator_code)
+            schedule = ImpactSchedule(self.realized_year[edges], self.direction[edges],
+                                      self.magnitude[edges], edges)
+            self._schedules[indicator_code] = schedule
+        return schedule
+
+    def precompute_schedules(self):
+        """
+        Fills the schedule cache for every indicator with links.
+        """
+        for code in self._by_indicator:
+            self.schedule(code)
+        return self
+
+    def upsert_link(self, link):
+        """
+        Adds an impact link, or replaces the one with the same record_id.
+        `link` is a mapping with the impact link columns. Only the adjacency
+        arrays and schedules of the affected event and indicator(s) change.
+        Returns the edge id. For a store's graph use IndicatorStore.upsert_link,
+        which keeps the joined impact_model rows in step with the edge ids.
+        """
+        rid = link['record_id']
+        edge = self._edge_ids.get(rid)
+        if edge is None:
+            edge = self._size
+            if edge == len(self.link_ids):
+                self._grow()
+            self._size += 1
+            self._edge_ids[rid] = edge
+        else:
+            self._detach(edge)
+
+        self.link_ids[edge] = rid
+        self.events[edge] = link.get('parent_id')
+        self.indicators[edge] = link.get('related_indicator')
+        self.realized_year[edge] = self._realized_years([link.get('parent_id')], [link.get('lag_months')])[0]
+        self.direction[edge] = 1.0 if link.get('impact_direction') == 'increase' else -1.0
+        self.magnitude[edge] = self._magnitude_codes([link.get('impact_magnitude')])[0]
+
+        # Insert keeping the indicator's edges in realised-year order
+        code = self.indicators[edge]
+        edges = self.edges_to(code)
+        pos = np.searchsorted(self.realized_year[edges], self.realized_year[edge], side='right')
+        self._by_indicator[code] = np.insert(edges, pos, edge)
+        self._by_event[self.events[edge]] = np.append(self.edges_from(self.events[edge]), edge)
+        self._schedules.pop(code, None)
+        self.version += 1
+        return edge
+
+    def event_year(self, event_id):
+        return self._event_year.get(event_id, np.nan)
+
+    def set_event_year(self, event_id, year):
+        """
+        Moves an event, updating the realised year of each of its links.
+        """
+        links = [self.link(edge) for edge in self.edges_from(event_id)]
+        self._event_year[event_id] = float(year)
+        for link in links:
+            self.upsert_link(link)
+
+    def link(self, edge):
+        """
+        Edge attributes as a dict in the impact link column names.
+        """
+        event_year = self._event_year.get(self.events[edge], np.nan)
+        lag = (self.realized_year[edge] - event_year) * 12.0
+        magnitude = self.magnitude[edge]
+        return {
+            'record_id': self.link_ids[edge],
+            'parent_id': self.events[edge],
+            'related_indicator': self.indicators[edge],
+            'impact_direction': 'increase' if self.direction[edge] > 0 else 'decrease',
+            'impact_magnitude': MAGNITUDE_CLASSES[magnitude] if magnitude >= 0 else None,
+            'lag_months': None if np.isnan(lag) else round(float(lag), 6),
+        }
+
+    def _detach(self, edge):
+        code, event = self.indicators[edge], self.events[edge]
+        edges = self._by_indicator.get(code)
+        if edges is not None:
+            self._by_indicator[code] = edges[edges != edge]
+        edges = self._by_event.get(event)
+        if edges is not None:
+            self._by_event[event] = edges[edges != edge]
+        self._schedules.pop(code, None)
+
+    def _grow(self):
+        capacity = 2 * len(self.link_ids)
+        for name in ('link_ids', 'events', 'indicators', 'realized_year', 'direction', 'magnitude'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
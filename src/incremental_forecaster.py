@@ -0,0 +1,153 @@
+import pandas as pd
+import numpy as np
+
+from indicator_store import IndicatorStore, observation_mask
+
+# Years are shifted by this reference before summing, so the sums stay small
+REFERENCE_YEAR = 2000.0
+
+
+class IncrementalForecaster:
+    """
+    Baseline linear trend per indicator ('all' gender), kept as sufficient
+    statistics instead of raw observations: n, sum(x), sum(y), sum(xy), sum(x^2)
+    and sum(y^2), with x = year - REFERENCE_YEAR and y shifted by the indicator's
+    first value. Appending an observation updates its indicator in O(1), and
+    slope, intercept and the residual band follow from the sums, giving the same
+    forecast as run_baseline_forecast.
+
+    Forecasts are memoized per indicator. An update only drops the memo of the
+    indicators it touched; `updated` holds the indicators that changed since seeding.
+    """
+
+    def __init__(self, data=None):
+        """
+        data: an IndicatorStore or the unified dataframe to seed the statistics with.
+        """
+        self._stats = {}
+        self._y_ref = {}
+        self._forecasts = {}
+        self.updates = 0
+        self.updated = set()
+        # Fingerprint of the dataset the statistics were seeded from
+        self.fingerprint = None
+        if data is None:
+            return
+        store = data if isinstance(data, IndicatorStore) else IndicatorStore(data)
+        codes, group, x, y = store.grouped_series('all')
+        self._add_arrays(codes[group] if len(group) else np.zeros(0, dtype=object), x, y)
+        self.updated.clear()
+        self.fingerprint = store.fingerprint
+
+    def add_observation(self, indicator_code, year, value, gender='all'):
+        """
+        Folds one observation into its indicator's statistics in O(1).
+        Only 'all'-gender points feed the baseline; others are ignored.
+        Returns True if the indicator was updated.
+        """
+        if gender != 'all' or pd.isna(year) or pd.isna(value):
+            return False
+        return bool(self._add_arrays(np.array([indicator_code], dtype=object),
+                                     np.array([year], dtype=float), np.array([value], dtype=float)))
+
+    def add_observations(self, df):
+        """
+        Folds a batch of rows in the unified schema (e.g. one feed delivery) into
+        the statistics. Returns the set of indicator codes that changed.
+        """
+        obs = df[observation_mask(df, 'all')]
+        return self._add_arrays(obs['indicator_code'].to_numpy(dtype=object),
+                                obs['data_year'].to_numpy(dtype=float, na_value=np.nan),
+                                obs['value_numeric'].to_numpy(dtype=float, na_value=np.nan))
+
+    def _add_arrays(self, codes, years, values):
+        known = ~(np.isnan(years) | np.isnan(values))
+        codes, years, values = codes[known], years[known], values[known]
+        if len(codes) == 0:
+            return set()
+        unique, group = np.unique(codes.astype(str), return_inverse=True)
+        # The first value seen per indicator is its y reference (reversed
+        # assignment leaves each group's earliest position in place)
+        first_pos = np.zeros(len(unique), dtype=int)
+        first_pos[group[::-1]] = np.arange(len(codes))[::-1]
+        y_ref = np.array([self._y_ref.setdefault(code, values[pos]) for code, pos in zip(unique, first_pos)])
+
+        x = years - REFERENCE_YEAR
+        y = values - y_ref[group]
+        sums = np.vstack([
+            np.bincount(group, minlength=len(unique)).astype(float),
+            np.bincount(group, weights=x, minlength=len(unique)),
+            np.bincount(group, weights=y, minlength=len(unique)),
+            np.bincount(group, weights=x * y, minlength=len(unique)),
+            np.bincount(group, weights=x * x, minlength=len(unique)),
+            np.bincount(group, weights=y * y, minlength=len(unique)),
+        ])
+        for i, code in enumerate(unique):
+            stats = self._stats.get(code)
+            self._stats[code] = sums[:, i] if stats is None else stats + sums[:, i]
+            self._forecasts.pop(code, None)
+        self.updated.update(unique)
+        self.updates += len(codes)
+        return set(unique)
+
+    def fit(self, indicator_code):
+        """
+        (slope, intercept, uncertainty) of the indicator's linear trend in calendar
+        years, or None with fewer than 2 observations. uncertainty is 1.96 x the
+        population std of the residuals, as in run_baseline_forecast.
+        """
+        stats = self._stats.get(indicator_code)
+        if stats is None or stats[0] < 2:
+            return None
+        n, sx, sy, sxy, sxx, syy = stats # order as stacked in _add_arrays
+        # Centred sums; a single repeated year gives a flat trend
+        cxx = sxx - sx * sx / n
+        cxy = sxy - sx * sy / n
+        cyy = syy - sy * sy / n
+        slope = cxy / cxx if cxx > 1e-12 else 0.0
+        x_mean, y_mean = sx / n, sy / n
+        sse = cyy - slope * cxy
+        # Below the rounding noise of the subtraction the fit is exact (e.g. n == 2)
+        if sse <= 1e-10 * cyy:
+            sse = 0.0
+        intercept = y_mean - slope * x_mean + self._y_ref[indicator_code] - slope * REFERENCE_YEAR
+        return slope, intercept, np.sqrt(sse / n) * 1.96
+
+    def forecast(self, indicator_code, start_year=2025, end_year=2027):
+        """
+        Baseline forecast frame for one indicator, same columns as
+        run_baseline_forecast. Memoized until the indicator gets new observations.
+        """
+        memo = self._forecasts.setdefault(indicator_code, {})
+        key = (start_year, end_year)
+        if key not in memo:
+            memo[key] = self._forecast_frame(indicator_code, start_year, end_year)
+        return memo[key]
+
+    def _forecast_frame(self, indicator_code, start_year, end_year):
+        fit = self.fit(indicator_code)
+        if fit is None:
+            return pd.DataFrame()
+        slope, intercept, uncertainty = fit
+        forecast_years = np.arange(start_year, end_year + 1)
+        preds = slope * forecast_years + intercept
+        forecast_df = pd.DataFrame({
+            'data_year': forecast_years,
+            'baseline_prediction': preds,
+            'ci_lower': preds - uncertainty,
+            'ci_upper': preds + uncertainty
+        })
+
+        # Ensure non-negative
+        for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
+            forecast_df[col] = forecast_df[col].clip(lower=0)
+        return forecast_df
+
+    def indicator_codes(self):
+        return sorted(self._stats)
+
+    def cached_indicators(self):
+        """
+        Indicators with at least one memoized forecast.
+        """
+        return sorted(code for code, memo in self._forecasts.items() if memo)
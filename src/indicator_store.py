@@ -0,0 +1,349 @@
+import hashlib
+
+import pandas as pd
+import numpy as np
+
+from impact_graph import ImpactGraph
+
+
+def dataset_fingerprint(df, df_impact=None):
+    """
+    Content hash of the unified (and optionally impact) frame, used to key
+    memoized forecasts so they are dropped when the data changes.
+    """
+    digest = hashlib.sha256()
+    for frame in (df, df_impact):
+        if frame is None:
+            continue
+        digest.update(','.join(map(str, frame.columns)).encode('utf-8'))
+        if len(frame):
+            digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def build_impact_model(df, df_impact):
+    """
+    Joins impact links to their parent events (same join logic as Task 3)
+    and derives the year each impact is realised: event_year + lag_months / 12.
+    """
+    if df_impact is None or df_impact.empty or 'parent_id' not in df_impact.columns:
+        return pd.DataFrame(columns=list(getattr(df_impact, 'columns', [])) + ['realized_year'])
+
+    events_df = df[df['record_type'] == 'event'][['record_id', 'indicator', 'start_date', 'data_year']]
+    events_df = events_df.rename(columns={'indicator': 'event_name', 'start_date': 'event_date', 'data_year': 'event_year'})
+    # Plain floats so realised years never become a nullable extension dtype
+    events_df['event_year'] = pd.to_numeric(events_df['event_year'], errors='coerce').astype(float)
+    impact_model = pd.merge(df_impact, events_df, left_on='parent_id', right_on='record_id', how='left')
+    lag_months = pd.to_numeric(impact_model['lag_months'], errors='coerce').astype(float)
+    impact_model['realized_year'] = impact_model['event_year'] + (lag_months.fillna(0) / 12.0)
+    return impact_model
+
+
+def observation_mask(df, gender=None):
+    """
+    Rows of the indicators' national series: observations with an indicator_code
+    whose region, if the frame has one, is missing or 'national'. Sub-national
+    rows (e.g. the synthetic regional extracts) would otherwise be interleaved
+    with the national points of the same year.
+    """
+    mask = (df['record_type'] == 'observation') & df['indicator_code'].notna()
+    if 'region' in df.columns:
+        mask &= df['region'].isna() | (df['region'] == 'national')
+    if gender is not None:
+        mask &= df['gender'] == gender
+    return mask
+
+
+class IndicatorStore:
+    """
+    Read-only index over the unified dataset, built once after loading.
+
+    Observations are grouped by (indicator_code, gender) into contiguous,
+    year-sorted NumPy arrays, so a series lookup is a dict hit plus two slices
+    instead of a full boolean mask over the frame. Events are indexed by
+    record_id, and impact links (joined to their events) form an ImpactGraph
+    whose per-indicator impact schedules are precomputed.
+    """
+
+    def __init__(self, df, df_impact=None):
+        self.df = df
+        self.df_impact = df_impact if df_impact is not None else pd.DataFrame()
+        self.impact_model = build_impact_model(df, self.df_impact)
+
+        obs = df[observation_mask(df)]
+        self._obs = obs
+        years = obs['data_year'].to_numpy(dtype=float, na_value=np.nan)
+        values = obs['value_numeric'].to_numpy(dtype=float, na_value=np.nan)
+
+        # (indicator_code, gender) -> slice into the contiguous arrays
+        self._years, self._values, self._rows, self._slices = self._pack(
+            obs.groupby(['indicator_code', 'gender'], sort=True, dropna=False, observed=True).indices, years, values)
+        # indicator_code -> slice over every gender, for indicators without a gender split
+        self._any_years, self._any_values, self._any_rows, self._any_slices = self._pack(
+            obs.groupby('indicator_code', sort=True, observed=True).indices, years, values)
+
+        self._index_events()
+        self._record_type_counts = df['record_type'].value_counts().to_dict()
+        self._fingerprint = None
+
+    @property
+    def impact_model(self):
+        """
+        Impact links joined to their events; row i is edge i of self.graph.
+        """
+        rows = self._impact_rows
+        return rows if len(rows) == self._impact_size else rows.iloc[:self._impact_size]
+
+    @impact_model.setter
+    def impact_model(self, frame):
+        # Rows past _impact_size are spare capacity for upsert_link, like ImpactGraph._grow
+        self._impact_rows = frame
+        self._impact_size = len(frame)
+
+    def _index_events(self):
+        events = self.df[self.df['record_type'] == 'event']
+        self.events = events
+        self._event_rows = {rid: pos for pos, rid in enumerate(events['record_id'])}
+
+        # Edge ids of the graph are row positions in impact_model
+        self.graph = ImpactGraph(events, self.impact_model).precompute_schedules()
+
+    def index_arrays(self):
+        """
+        The packed series arrays and their slice tables, with row numbers given
+        as positions in self.df. from_index rebuilds an equivalent store from them.
+        """
+        if self._obs is self.df:
+            positions = None
+        else:
+            positions = np.flatnonzero(observation_mask(self.df).to_numpy(dtype=bool, na_value=False))
+        arrays = {
+            'years': self._years, 'values': self._values,
+            'rows': self._rows if positions is None else positions[self._rows],
+            'any_years': self._any_years, 'any_values': self._any_values,
+            'any_rows': self._any_rows if positions is None else positions[self._any_rows],
+        }
+        return arrays, self._slices, self._any_slices
+
+    @classmethod
+    def from_index(cls, df, df_impact, impact_model, arrays, slices, any_slices,
+                   record_type_counts=None, fingerprint=None):
+        """
+        Rebuilds a store around already-packed series arrays (see index_arrays),
+        e.g. memory-mapped from a published snapshot, without regrouping the
+        frame. Only the events and the impact graph are re-indexed.
+        """
+        store = cls.__new__(cls)
+        store.df = df
+        store.df_impact = df_impact
+        store.impact_model = impact_model
+        # Row numbers already point into df
+        store._obs = df
+        store._years, store._values, store._rows = arrays['years'], arrays['values'], arrays['rows']
+        store._any_years, store._any_values, store._any_rows = (
+            arrays['any_years'], arrays['any_values'], arrays['any_rows'])
+        store._slices, store._any_slices = slices, any_slices
+        store._index_events()
+        if record_type_counts is None:
+            record_type_counts = df['record_type'].value_counts().to_dict()
+        store._record_type_counts = record_type_counts
+        store._fingerprint = fingerprint
+        return store
+
+    @staticmethod
+    def _pack(groups, years, values):
+        slices = {}
+        parts = []
+        start = 0
+        for key, idx in groups.items():
+            idx = idx[np.argsort(years[idx], kind='stable')]
+            parts.append(idx)
+            slices[key] = (start, start + len(idx))
+            start += len(idx)
+        order = np.concatenate(parts) if parts else np.zeros(0, dtype=int)
+        return years[order], values[order], order, slices
+
+    @property
+    def fingerprint(self):
+        """
+        Dataset fingerprint, computed on first use.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = dataset_fingerprint(self.df, self.df_impact)
+        return self._fingerprint
+
+    def _lookup(self, indicator_code, gender):
+        if gender is None:
+            return self._any_slices.get(indicator_code), self._any_years, self._any_values, self._any_rows
+        return self._slices.get((indicator_code, gender)), self._years, self._values, self._rows
+
+    def series(self, indicator_code, gender='all'):
+        """
+        Returns (years, values) arrays sorted by year. gender=None spans every gender.
+        """
+        bounds, years, values, _ = self._lookup(indicator_code, gender)
+        if bounds is None:
+            return np.zeros(0), np.zeros(0)
+        start, stop = bounds
+        return years[start:stop], values[start:stop]
+
+    def latest(self, indicator_code, gender='all', default=np.nan):
+        """
+        Most recent observed value for an indicator, or `default` if it has none.
+        """
+        _, values = self.series(indicator_code, gender)
+        return values[-1] if len(values) else default
+
+    def observations(self, indicator_code, gender='all'):
+        """
+        Observation rows for an indicator as a dataframe sorted by data_year.
+        """
+        bounds, _, _, rows = self._lookup(indicator_code, gender)
+        if bounds is None:
+            return self._obs.iloc[0:0]
+        start, stop = bounds
+        return self._obs.iloc[rows[start:stop]]
+
+    def grouped_series(self, gender='all', indicator_codes=None):
+        """
+        All series for one gender at once, for batched fitting.
+        Returns (codes, group, years, values) where group[i] indexes codes.
+        """
+        keys = [key for key in self._slices if key[1] == gender]
+        if indicator_codes is not None:
+            wanted = set(indicator_codes)
+            keys = [key for key in keys if key[0] in wanted]
+        codes = np.array([key[0] for key in keys], dtype=object)
+        if not keys:
+            return codes, np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)
+        spans = [self._slices[key] for key in keys]
+        idx = np.concatenate([np.arange(start, stop) for start, stop in spans])
+        group = np.repeat(np.arange(len(keys)), [stop - start for start, stop in spans])
+        return codes, group, self._years[idx], self._values[idx]
+
+    def indicator_codes(self):
+        return list(self._any_slices)
+
+    def genders(self, indicator_code=None):
+        return sorted({g for code, g in self._slices
+                       if (indicator_code is None or code == indicator_code) and isinstance(g, str)})
+
+    def event(self, event_id):
+        """
+        Event row by record_id, or None.
+        """
+        pos = self._event_rows.get(event_id)
+        return None if pos is None else self.events.iloc[pos]
+
+    def impacts_for(self, indicator_code):
+        """
+        Impact links (joined to their events) that affect an indicator.
+        """
+        return self.impact_model.iloc[self.graph.edges_to(indicator_code)]
+
+    def impacts_from(self, event_id):
+        """
+        Impact links originating from one event.
+        """
+        return self.impact_model.iloc[self.graph.edges_from(event_id)]
+
+    def schedule(self, indicator_code):
+        """
+        Precomputed ImpactSchedule for an indicator, accepted by the forecaster
+        wherever a joined impact model is.
+        """
+        return self.graph.schedule(indicator_code)
+
+    def upsert_link(self, link):
+        """
+        Adds an impact link, or replaces the one with the same record_id, in
+        both the impact graph and impact_model (whose rows are the graph's edge
+        ids). `link` is a mapping with the impact link columns. Returns the edge id.
+        The row is written in place, keeping the column dtypes.
+        """
+        edge = self.graph.upsert_link(link)
+        row = dict(link)
+        parent_id = link.get('parent_id')
+        event = self.event(parent_id)
+        if 'record_id_x' in self._impact_rows.columns:
+            # Joined column names: the link's own id and its event's id
+            row['record_id_x'] = row.pop('record_id')
+            row['record_id_y'] = parent_id if event is not None else None
+        row['event_name'] = event['indicator'] if event is not None else None
+        row['event_date'] = event['start_date'] if event is not None else pd.NaT
+        row['event_year'] = self.graph.event_year(parent_id)
+        row['realized_year'] = self.graph.realized_year[edge]
+
+        if edge == len(self._impact_rows):
+            self._grow_impact_rows()
+        for col in self._impact_rows.columns.union(list(row), sort=False):
+            self._set_impact_value(edge, col, row.get(col))
+        self._impact_size = max(self._impact_size, edge + 1)
+        self._record_edit('link', sorted(link.items()))
+        return edge
+
+    def _grow_impact_rows(self):
+        rows = self._impact_rows
+        capacity = max(2 * len(rows), 8)
+        if len(rows):
+            # Spare rows repeat row 0 so every column keeps its dtype; upsert_link
+            # overwrites the whole row before it becomes visible
+            padding = np.zeros(capacity - len(rows), dtype=int)
+            rows = rows.take(np.concatenate([np.arange(len(rows)), padding])).reset_index(drop=True)
+        else:
+            rows = rows.reindex(range(capacity))
+        self._impact_rows = rows
+
+    def _set_impact_value(self, edge, col, value):
+        rows = self._impact_rows
+        if col not in rows.columns:
+            rows[col] = pd.Series(None, index=rows.index, dtype=object)
+        elif isinstance(rows[col].dtype, pd.CategoricalDtype) and not pd.isna(value) \
+                and value not in rows[col].cat.categories:
+            rows[col] = rows[col].cat.add_categories([value])
+        pos = rows.columns.get_loc(col)
+        try:
+            rows.iloc[edge, pos] = value
+        except TypeError:
+            # e.g. a fractional lag in a downcast integer column
+            rows[col] = rows[col].astype(float if pd.api.types.is_numeric_dtype(rows[col]) else object)
+            rows.iloc[edge, pos] = value
+
+    def set_event_year(self, event_id, year):
+        """
+        Moves an event: its row in df and self.events (data_year, and start_date
+        shifted to that year) and its links' realised years in the graph and impact_model.
+        """
+        self.graph.set_event_year(event_id, year)
+        pos = self._event_rows.get(event_id)
+        date = pd.NaT
+        if pos is not None:
+            label = self.events.index[pos]
+            date = self.events['start_date'].iloc[pos] if 'start_date' in self.events.columns else pd.NaT
+            if not pd.isna(date):
+                date = date + pd.DateOffset(years=int(year) - date.year)
+            for frame in (self.df, self.events):
+                frame.loc[label, 'data_year'] = year
+                if 'start_date' in frame.columns:
+                    frame.loc[label, 'start_date'] = date
+        edges = self.graph.edges_from(event_id)
+        if len(edges):
+            rows = self._impact_rows
+            rows.iloc[edges, rows.columns.get_loc('event_year')] = float(year)
+            rows.iloc[edges, rows.columns.get_loc('realized_year')] = self.graph.realized_year[edges]
+            if 'event_date' in rows.columns:
+                rows.iloc[edges, rows.columns.get_loc('event_date')] = date
+        self._record_edit('event_year', event_id, year)
+
+    def _record_edit(self, *edit):
+        # Chain the edit onto the dataset fingerprint, so results memoized under the
+        # old one (ForecastCache, PrecomputedForecasts.is_current) are not reused
+        digest = hashlib.sha256(self.fingerprint.encode('utf-8'))
+        digest.update(repr(edit).encode('utf-8'))
+        self._fingerprint = digest.hexdigest()[:16]
+
+    def count(self, record_type):
+        return self._record_type_counts.get(record_type, 0)
+
+    def record_type_counts(self):
+        return dict(self._record_type_counts)
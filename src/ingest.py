@@ -0,0 +1,333 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dates import DATE_COLUMNS, parse_dates
+
+DEFAULT_CHUNKSIZE = 50_000
+IMPACT_SHEET = 'Impact_sheet'
+
+# Columns whose type is fixed up front; everything else is inferred from the first
+# chunk and widened to string if a later chunk has values that do not fit
+FLOAT_COLUMNS = ['value_numeric', 'data_year', 'impact_estimate', 'lag_months']
+
+
+def iter_xlsx_chunks(path, sheet=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yields a sheet of an xlsx as DataFrames of at most `chunksize` rows, using
+    openpyxl's read-only mode so only one chunk of cells is in memory at a time.
+
+    `sheet` is a sheet name; None picks the first sheet with a `record_id`
+    header (only each sheet's header row is read to find it), falling back to
+    the first sheet. Yields nothing if the sheet does not exist.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows, header = None, None
+        if sheet is not None:
+            if sheet in workbook.sheetnames:
+                rows = workbook[sheet].iter_rows(values_only=True)
+                header = next(rows, None)
+        else:
+            for worksheet in workbook.worksheets:
+                candidate = worksheet.iter_rows(values_only=True)
+                first = next(candidate, None)
+                if first and 'record_id' in first:
+                    rows, header = candidate, first
+                    break
+            if rows is None and workbook.worksheets:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = next(rows, None)
+        if not header:
+            return
+
+        columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        batch = []
+        for row in rows:
+            # read-only sheets can report formatted-but-empty trailing rows
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) == chunksize:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def iter_csv_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yields a CSV export as DataFrames of at most `chunksize` rows.
+    """
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def infer_schema(chunk):
+    """
+    Builds the Arrow schema chunks are written with. Date and known numeric
+    columns have fixed types; other columns are float64/timestamp when the
+    chunk is entirely numeric/datetime, and strings otherwise.
+    """
+    fields = []
+    for col in chunk.columns:
+        if col in DATE_COLUMNS:
+            arrow_type = pa.timestamp('ns')
+        elif col in FLOAT_COLUMNS:
+            arrow_type = pa.float64()
+        else:
+            arrow_type = _infer_type(chunk[col].dropna())
+        fields.append(pa.field(str(col), arrow_type))
+    return pa.schema(fields)
+
+
+def _infer_type(values):
+    if values.empty:
+        return pa.string()
+    if pd.to_numeric(values, errors='coerce').notna().all():
+        return pa.float64()
+    if pd.api.types.is_datetime64_any_dtype(values) or \
+            values.map(lambda v: isinstance(v, pd.Timestamp) or hasattr(v, 'isoformat')).all():
+        return pa.timestamp('ns')
+    return pa.string()
+
+
+def widen_schema(chunk, schema):
+    """
+    Returns `schema` with every inferred numeric/datetime column that `chunk`
+    has values of another type for changed to string, so a later chunk never
+    turns text into NaN. Unchanged (the same object) when everything fits.
+    """
+    fields = list(schema)
+    for i, field in enumerate(fields):
+        if field.name in DATE_COLUMNS or field.name in FLOAT_COLUMNS or pa.types.is_string(field.type) \
+                or field.name not in chunk.columns:
+            continue
+        values = chunk[field.name].dropna()
+        if not values.empty and _infer_type(values) != field.type:
+            print(f"Column {field.name!r} no longer fits {field.type} in a later chunk; storing it as text.")
+            fields[i] = pa.field(field.name, pa.string())
+    return schema if fields == list(schema) else pa.schema(fields)
+
+
+def coerce_chunk(chunk, schema):
+    """
+    Casts one chunk to `schema`: dates parsed (and data_year derived from
+    observation_date), numerics coerced with unparseable values as NaN, and
+    everything else as strings. Missing columns are added empty, extra ones dropped.
+    """
+    chunk = parse_dates(chunk.copy())
+    out = {}
+    for field in schema:
+        values = chunk[field.name] if field.name in chunk.columns else pd.Series(None, index=chunk.index, dtype=object)
+        if pa.types.is_timestamp(field.type):
+            out[field.name] = pd.to_datetime(values, errors='coerce').astype('datetime64[ns]')
+        elif pa.types.is_floating(field.type):
+            out[field.name] = pd.to_numeric(values, errors='coerce').astype(float)
+        else:
+            out[field.name] = values.astype(object).where(values.notna(), None).map(
+                lambda v: v if v is None else str(v))
+    return pd.DataFrame(out, index=chunk.index)
+
+
+class _ParquetSink:
+    """
+    One Parquet output, written to a tmp file and moved into place by close(),
+    so readers never see a partial file. write_frame() takes typed pandas
+    chunks: the file's schema follows their dtypes (categoricals as dictionary
+    columns, nullable Int64, float32, ...), and when a chunk's dtype does not fit
+    the column is widened (numeric to float64, anything else to string) and the
+    rows already written are copied over batch by batch, cast to the new schema.
+    """
+
+    def __init__(self, dest):
+        self.dest = dest
+        self.path = None
+        self.schema = None
+        self.kinds = None
+        self.writer = None
+        self._opened = 0
+
+    def open(self, schema):
+        self._opened += 1
+        path = f"{self.dest}.{self._opened}.tmp"
+        writer = pq.ParquetWriter(path, schema)
+        if self.writer is not None:
+            self.writer.close()
+            for batch in pq.ParquetFile(self.path).iter_batches():
+                writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+            os.remove(self.path)
+        self.path, self.schema, self.writer = path, schema, writer
+
+    def write_frame(self, frame):
+        kinds = {col: _dtype_kind(frame[col].dtype) for col in frame.columns}
+        if self.kinds is not None:
+            kinds = {col: _merge_kinds(self.kinds.get(col, kind), kind) for col, kind in kinds.items()}
+        if kinds != self.kinds:
+            self.open(_arrow_schema(kinds))
+            self.kinds = kinds
+        self.writer.write_table(pa.Table.from_pandas(_conform(frame, kinds), schema=self.schema,
+                                                     preserve_index=False))
+
+    def close(self):
+        if self.writer is None:
+            # empty input: still leave a readable (empty) file behind
+            self.path = f"{self.dest}.tmp"
+            pd.DataFrame().to_parquet(self.path, index=False)
+        else:
+            self.writer.close()
+        os.replace(self.path, self.dest)
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self.path)
+
+
+def _dtype_kind(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime64[ns]'
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        return str(dtype)
+    return 'str'
+
+
+def _merge_kinds(a, b):
+    if a == b:
+        return a
+    if a not in ('category', 'datetime64[ns]', 'str') and b not in ('category', 'datetime64[ns]', 'str'):
+        return 'float64'
+    return 'str'
+
+
+def _arrow_schema(kinds):
+    # Explicit Arrow types plus the pandas metadata of an empty frame with these
+    # dtypes, so reading the file back restores categoricals and Int64 columns
+    template = pd.DataFrame({col: pd.Series(dtype=object if kind == 'str' else kind) for col, kind in kinds.items()})
+    fields = []
+    for col, kind in kinds.items():
+        if kind == 'category':
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif kind == 'str':
+            arrow_type = pa.string()
+        elif kind == 'datetime64[ns]':
+            arrow_type = pa.timestamp('ns')
+        else:
+            # nullable (Int64) dtypes carry their numpy type separately
+            dtype = template[col].dtype
+            arrow_type = pa.from_numpy_dtype(getattr(dtype, 'numpy_dtype', dtype))
+        fields.append(pa.field(str(col), arrow_type))
+    return pa.schema(fields, metadata=pa.Schema.from_pandas(template, preserve_index=False).metadata)
+
+
+def _conform(frame, kinds):
+    # Casts the columns of a chunk whose dtype is narrower than the file's
+    changed = {}
+    for col, kind in kinds.items():
+        if _dtype_kind(frame[col].dtype) == kind:
+            continue
+        values = frame[col]
+        if kind == 'str':
+            changed[col] = values.astype(object).where(values.notna(), None).map(
+                lambda v: v if v is None else str(v))
+        else:
+            changed[col] = values.astype(kind)
+    return frame.assign(**changed) if changed else frame
+
+
+def _with_upserts(chunks, upserts):
+    # Yields (chunk, is_source): source chunks without the rows an upsert
+    # replaces (same record_id), then the upserts themselves
+    ids = upserts['record_id'].dropna() if upserts is not None and 'record_id' in upserts.columns else ()
+    replaced = 0
+    for chunk in chunks:
+        if len(ids) and 'record_id' in chunk.columns:
+            keep = ~chunk['record_id'].isin(ids)
+            replaced += int((~keep).sum())
+            chunk = chunk[keep.to_numpy()]
+        yield chunk, True
+    if replaced:
+        print(f"Replacing {replaced} records with newer upserted versions.")
+    if upserts is not None and not upserts.empty:
+        yield upserts, False
+
+
+def stream_to_parquet(chunks, dest, schema=None, transform=None, upserts=None):
+    """
+    Writes an iterable of DataFrame chunks to one Parquet file with a
+    pyarrow ParquetWriter, so only the current chunk is held in memory.
+
+    Each chunk is coerced to `schema` (taken from the first chunk unless given,
+    and widened when a later chunk does not fit, see widen_schema), then passed
+    through `transform` (e.g. a dtype schema) before it is written. `upserts`
+    are rows that replace any source row with the same record_id; they are
+    written after the source rows. Returns the number of rows written.
+    """
+    sink = _ParquetSink(dest)
+    rows = 0
+    try:
+        for chunk, _ in _with_upserts(chunks, upserts):
+            schema = infer_schema(chunk) if schema is None else widen_schema(chunk, schema)
+            frame = coerce_chunk(chunk, schema)
+            sink.write_frame(transform(frame) if transform is not None else frame)
+            rows += len(frame)
+    except BaseException:
+        sink.discard()
+        raise
+    sink.close()
+    return rows
+
+
+def _split_csv(path, unified_dest, impact_dest, chunksize, transform=None, upserts=None):
+    # A CSV export holds every record type in one table; its impact links are
+    # also written to their own file, like the workbook's Impact_sheet.
+    unified, impact = _ParquetSink(unified_dest), _ParquetSink(impact_dest)
+    schema = None
+    rows = impact_rows = 0
+    try:
+        for chunk, is_source in _with_upserts(iter_csv_chunks(path, chunksize), upserts):
+            schema = infer_schema(chunk) if schema is None else widen_schema(chunk, schema)
+            frame = coerce_chunk(chunk, schema)
+            frame = transform(frame) if transform is not None else frame
+            unified.write_frame(frame)
+            rows += len(frame)
+            if is_source and 'record_type' in frame.columns:
+                is_link = (frame['record_type'] == 'impact_link').to_numpy(dtype=bool, na_value=False)
+                if is_link.any():
+                    impact.write_frame(frame[is_link])
+                    impact_rows += int(is_link.sum())
+    except BaseException:
+        unified.discard()
+        impact.discard()
+        raise
+    unified.close()
+    impact.close()
+    return rows, impact_rows
+
+
+def ingest_file(path, unified_dest, impact_dest, chunksize=DEFAULT_CHUNKSIZE,
+                transform=None, impact_transform=None, upserts=None):
+    """
+    Streams an xlsx workbook (data sheet + Impact_sheet) or a CSV export into
+    two Parquet files with bounded memory. `transform` is applied to every
+    coerced chunk of the data sheet and `impact_transform` to those of the
+    Impact_sheet (a CSV's impact links come from the transformed data chunks).
+    `upserts` replace data rows by record_id (see stream_to_parquet).
+    Returns (unified_rows, impact_rows).
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return _split_csv(path, unified_dest, impact_dest, chunksize, transform, upserts)
+    rows = stream_to_parquet(iter_xlsx_chunks(path, chunksize=chunksize), unified_dest,
+                             transform=transform, upserts=upserts)
+    impact_rows = stream_to_parquet(iter_xlsx_chunks(path, sheet=IMPACT_SHEET, chunksize=chunksize), impact_dest,
+                                    transform=impact_transform)
+    return rows, impact_rows
@@ -0,0 +1,295 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+logger = logging.getLogger('ethiopia_fi.instrumentation')
+
+# Set FI_PROFILE=1 to record timings from startup, FI_PROFILE=memory to add peak memory
+PROFILE_ENV = 'FI_PROFILE'
+MAX_RECORDS = 10_000
+
+
+class _State:
+    enabled = False
+    memory = False
+    # recording() blocks currently tracing memory, on any thread
+    memory_recordings = 0
+    records = deque(maxlen=MAX_RECORDS)
+    lock = threading.Lock()
+    local = threading.local()
+
+
+def enable(memory=False):
+    """
+    Starts recording stages. With memory=True, tracemalloc also reports each
+    stage's peak allocation (this slows the traced code down noticeably).
+    """
+    _State.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _State.enabled = True
+
+
+def disable():
+    with _State.lock:
+        if _State.memory and not _State.memory_recordings and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    _State.enabled = False
+    _State.memory = False
+
+
+def is_enabled():
+    return _State.enabled
+
+
+class recording:
+    """
+    Records the stages run on the current thread only, without turning
+    recording on for the rest of the process. Each dashboard session uses one
+    around its script run:
+
+        with recording(memory=True) as run:
+            ...
+        run.records   # the stages recorded inside the block, oldest first
+
+    These records go to `run.records`, not the process-wide buffer. With
+    memory=True, tracemalloc runs while any such block is open, and it slows
+    every thread down while it does.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []
+
+    def start(self):
+        left_over = _recording()
+        if left_over is not None:
+            # A run that raised before stop(): close it so its memory tracing ends
+            left_over.stop()
+        if self.memory:
+            with _State.lock:
+                _State.memory_recordings += 1
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+        _State.local.recording = self
+        return self
+
+    def stop(self):
+        if getattr(_State.local, 'recording', None) is self:
+            _State.local.recording = None
+        if self.memory:
+            with _State.lock:
+                _State.memory_recordings -= 1
+                if not _State.memory_recordings and not _State.memory and tracemalloc.is_tracing():
+                    tracemalloc.stop()
+        return self.records
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def _recording():
+    return getattr(_State.local, 'recording', None)
+
+
+def _tracing_memory():
+    run = _recording()
+    return _State.memory or (run is not None and run.memory)
+
+
+class Stage:
+    """
+    One timed stage: wall time, rows processed (set `stage.rows` inside the
+    block) and, with memory tracing on, peak allocation above the level at entry.
+    Use as a context manager, or call start()/stop() around code that cannot be indented.
+    """
+
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self.rows = None
+        self._base = None
+
+    def start(self):
+        if _tracing_memory():
+            stack = _stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._max = max(stack[-1]._max, peak)
+            tracemalloc.reset_peak()
+            self._base = self._max = current
+            stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        wall = time.perf_counter() - self._start
+        record = {'stage': self.name, 'wall_ms': round(wall * 1000, 3), 'rows': self.rows,
+                  'thread': threading.current_thread().name, 'at': time.time()}
+        if self.fields:
+            record.update(self.fields)
+        if self._base is not None and tracemalloc.is_tracing():
+            stack = _stack()
+            self._max = max(self._max, tracemalloc.get_traced_memory()[1])
+            record['peak_kb'] = round((self._max - self._base) / 1024, 1)
+            if stack and stack[-1] is self:
+                stack.pop()
+            if stack:
+                stack[-1]._max = max(stack[-1]._max, self._max)
+            tracemalloc.reset_peak()
+        run = _recording()
+        if run is not None:
+            run.records.append(record)
+        if _State.enabled:
+            with _State.lock:
+                _State.records.append(record)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record, default=str))
+        return record
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class _NullStage:
+    # Shared no-op stand-in handed out while recording is off
+    rows = None
+
+    def start(self):
+        return self
+
+    def stop(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _stack():
+    stack = getattr(_State.local, 'stack', None)
+    if stack is None:
+        stack = _State.local.stack = []
+    return stack
+
+
+def stage(name, **fields):
+    """
+    Context manager timing a block:
+
+        with stage('load.read_sheet') as s:
+            df = ...
+            s.rows = len(df)
+
+    Returns a shared no-op object while recording is disabled.
+    """
+    if not _State.enabled and _recording() is None:
+        return _NULL_STAGE
+    return Stage(name, **fields)
+
+
+def timed(name=None, rows=len):
+    """
+    Decorator recording a stage per call. `rows` maps the return value to a
+    row count (len by default; None to skip). Disabled cost: a flag check
+    and a thread-local lookup.
+    """
+    def decorator(func):
+        stage_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled and _recording() is None:
+                return func(*args, **kwargs)
+            timer = Stage(stage_name).start()
+            try:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    try:
+                        timer.rows = rows(result)
+                    except TypeError:
+                        pass
+                return result
+            finally:
+                timer.stop()
+        return wrapper
+    return decorator
+
+
+def records():
+    """
+    Copy of the recorded stages, oldest first.
+    """
+    with _State.lock:
+        return list(_State.records)
+
+
+def clear():
+    with _State.lock:
+        _State.records.clear()
+
+
+def summary(recorded=None):
+    """
+    Per-stage aggregates as a dataframe: calls, total/mean/max wall time, rows
+    and the largest peak memory seen. Sorted by total time. Summarises
+    `recorded` (e.g. a recording's records) instead of the process-wide buffer if given.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame(records() if recorded is None else list(recorded))
+    if frame.empty:
+        return pd.DataFrame(columns=['stage', 'calls', 'total_ms', 'mean_ms', 'max_ms', 'rows', 'peak_kb'])
+    if 'peak_kb' not in frame.columns:
+        frame['peak_kb'] = float('nan')
+    frame['rows'] = pd.to_numeric(frame['rows'], errors='coerce')
+    out = frame.groupby('stage').agg(
+        calls=('wall_ms', 'size'), total_ms=('wall_ms', 'sum'), mean_ms=('wall_ms', 'mean'),
+        max_ms=('wall_ms', 'max'), rows=('rows', 'sum'), peak_kb=('peak_kb', 'max'))
+    return out.sort_values('total_ms', ascending=False).reset_index()
+
+
+def to_json(recorded=None):
+    """
+    The recorded stages (and their summary) as a JSON document.
+    """
+    recorded = records() if recorded is None else list(recorded)
+    table = summary(recorded)
+    table = table.astype(object).where(table.notna(), None)
+    return json.dumps({'records': recorded, 'summary': table.to_dict('records')},
+                      indent=2, default=str)
+
+
+def dump_json(path):
+    """
+    Writes to_json() to `path` for offline analysis.
+    """
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(to_json())
+    return path
+
+
+_env = os.environ.get(PROFILE_ENV, '').strip().lower()
+if _env and _env not in ('0', 'false', 'no'):
+    enable(memory=(_env == 'memory'))
@@ -0,0 +1,266 @@
+import glob
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+import numpy as np
+
+from forecaster import SCENARIO_MODIFIERS, run_baseline_forecasts, evaluate_scenarios
+from forecast_cache import ForecastCache, _fingerprint
+from simulation import simulate_forecast
+
+MANIFEST_NAME = 'manifest.json'
+FORMATS = ('parquet', 'csv')
+
+# Target-year analysis, matching the dashboard's Inclusion Targets page
+TARGETS = {'ACC_OWNERSHIP': 60.0}
+SIMULATION_PARAMS = {'n_paths': 20000, 'seed': 42}
+
+
+def precompute_artifacts(store, output_dir, start_year=2025, end_year=2030, formats=('parquet',),
+                         targets=None, simulation_params=None, insights=None):
+    """
+    Computes the baseline and every named scenario for all indicators, plus the
+    target-year analysis, from one loaded IndicatorStore, and writes them under
+    output_dir as partitioned tables:
+
+      forecasts/scenario=<name>/   indicator_code, pillar, data_year, prediction, ci_lower, ci_upper
+      targets/                     first year each scenario reaches each target
+      simulation/indicator_code=<code>/  Monte Carlo bands and P(target reached) per year
+      <insight name>/              extra tables passed in `insights` (name -> dataframe)
+
+    plus a manifest.json describing the run. Returns the manifest.
+    """
+    targets = TARGETS if targets is None else targets
+    simulation_params = dict(SIMULATION_PARAMS if simulation_params is None else simulation_params)
+    os.makedirs(output_dir, exist_ok=True)
+
+    forecasts = scenario_forecasts(store, start_year, end_year)
+    tables = {
+        'forecasts': (forecasts, ['scenario']),
+        'targets': (target_years(forecasts, targets), []),
+        'simulation': (target_simulations(store, targets, start_year, end_year, simulation_params),
+                       ['indicator_code']),
+    }
+    for name, frame in (insights or {}).items():
+        tables[name] = (frame, [])
+
+    manifest = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'fingerprint': store.fingerprint,
+        'start_year': start_year,
+        'end_year': end_year,
+        'scenarios': ['baseline'] + list(SCENARIO_MODIFIERS),
+        'targets': targets,
+        'simulation': dict(simulation_params, start_year=start_year, end_year=end_year),
+        'tables': {},
+    }
+    for name, (frame, partition_cols) in tables.items():
+        write_table(frame, output_dir, name, partition_cols, formats)
+        manifest['tables'][name] = {'rows': len(frame), 'partition_cols': partition_cols, 'formats': list(formats)}
+        print(f"Wrote {name}: {len(frame)} rows.")
+
+    tmp = os.path.join(output_dir, MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, os.path.join(output_dir, MANIFEST_NAME))
+    return manifest
+
+
+def scenario_forecasts(store, start_year=2025, end_year=2030):
+    """
+    Long table of the baseline plus every named scenario for all indicators.
+    """
+    baseline = run_baseline_forecasts(store, start_year=start_year, end_year=end_year)
+    if baseline.empty:
+        return pd.DataFrame(columns=['scenario', 'indicator_code', 'pillar', 'data_year',
+                                     'prediction', 'ci_lower', 'ci_upper'])
+    scenarios = list(SCENARIO_MODIFIERS)
+    n_years = end_year - start_year + 1
+    codes = baseline['indicator_code'].to_numpy()[::n_years]
+
+    # One shared impact schedule per indicator, evaluated for every scenario at once
+    grids = [evaluate_scenarios(baseline.iloc[i * n_years:(i + 1) * n_years], store.schedule(code),
+                                scenarios=scenarios, indicator_code=code)
+             for i, code in enumerate(codes)]
+    grid = np.stack(grids, axis=1) if grids else np.zeros((len(scenarios), 0, n_years))
+
+    pillars = store.df.dropna(subset=['indicator_code']).drop_duplicates('indicator_code')
+    pillars = pillars.set_index(pillars['indicator_code'].astype(str))['pillar']
+    parts = [baseline.assign(scenario='baseline', prediction=baseline['baseline_prediction'])]
+    for pos, scenario in enumerate(scenarios):
+        parts.append(baseline.assign(scenario=scenario, prediction=grid[pos].ravel()))
+    forecasts = pd.concat(parts, ignore_index=True)
+    forecasts['pillar'] = forecasts['indicator_code'].map(pillars).astype(object)
+    return forecasts[['scenario', 'indicator_code', 'pillar', 'data_year', 'prediction', 'ci_lower', 'ci_upper']]
+
+
+def target_years(forecasts, targets):
+    """
+    First forecast year in which each scenario reaches each target (NaN if never).
+    """
+    rows = []
+    for code, target in targets.items():
+        sub = forecasts[forecasts['indicator_code'] == code]
+        for scenario, group in sub.groupby('scenario', sort=False):
+            reached = group.loc[group['prediction'] >= target, 'data_year']
+            rows.append({'indicator_code': code, 'target': target, 'scenario': scenario,
+                         'year_reached': reached.min() if len(reached) else np.nan,
+                         'final_prediction': group['prediction'].iloc[-1]})
+    return pd.DataFrame(rows, columns=['indicator_code', 'target', 'scenario', 'year_reached', 'final_prediction'])
+
+
+def target_simulations(store, targets, start_year, end_year, simulation_params):
+    parts = []
+    for code, target in targets.items():
+        sim = simulate_forecast(store, store.impacts_for(code), code, start_year, end_year,
+                                target=target, **simulation_params)
+        if not sim.empty:
+            parts.append(sim.assign(indicator_code=code))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['indicator_code', 'data_year'])
+
+
+def write_table(frame, output_dir, name, partition_cols=(), formats=('parquet',)):
+    """
+    Writes one table as <output_dir>/<name>/ in each format, Hive-style
+    partitioned (<col>=<value>/) on partition_cols. The directory is built
+    beside the old one and swapped in, so readers never see a half-written table.
+    """
+    final = os.path.join(output_dir, name)
+    tmp = os.path.join(output_dir, f".{name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    partition_cols = list(partition_cols)
+    groups = frame.groupby(partition_cols, sort=True, observed=True) if partition_cols else [((), frame)]
+    for key, part in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        subdir = os.path.join(tmp, *[f"{col}={value}" for col, value in zip(partition_cols, key)])
+        os.makedirs(subdir, exist_ok=True)
+        part = part.drop(columns=partition_cols)
+        if 'parquet' in formats:
+            part.to_parquet(os.path.join(subdir, 'part-0.parquet'), index=False)
+        if 'csv' in formats:
+            part.to_csv(os.path.join(subdir, 'part-0.csv'), index=False)
+
+    old = os.path.join(output_dir, f".{name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(final):
+        os.replace(final, old)
+    os.replace(tmp, final)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def read_table(output_dir, name):
+    """
+    Reads a table written by write_table (Parquet if present, else CSV), with
+    the partition columns restored from the directory names.
+    """
+    root = os.path.join(output_dir, name)
+    for ext, reader in (('parquet', pd.read_parquet), ('csv', pd.read_csv)):
+        files = sorted(glob.glob(os.path.join(root, '**', f"part-*.{ext}"), recursive=True))
+        if not files:
+            continue
+        parts = []
+        for path in files:
+            part = reader(path)
+            rel = os.path.relpath(os.path.dirname(path), root)
+            for segment in ([] if rel == '.' else rel.split(os.sep)):
+                col, _, value = segment.partition('=')
+                part[col] = value
+            parts.append(part)
+        return pd.concat(parts, ignore_index=True)
+    raise FileNotFoundError(f"No precomputed table '{name}' under {output_dir}")
+
+
+def read_manifest(output_dir):
+    with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+class PrecomputedForecasts:
+    """
+    Serves forecasts from precomputed artifacts with the same interface as
+    ForecastCache (baseline / scenarios / simulation / stats), so the dashboard
+    can swap one for the other. Requests the artifacts do not cover (another
+    start year, a longer horizon, sensitivity-fan modifiers, other simulation
+    settings) fall back to a live ForecastCache and are counted as misses.
+    """
+
+    def __init__(self, output_dir, fallback=None):
+        self.output_dir = output_dir
+        self.manifest = read_manifest(output_dir)
+        forecasts = read_table(output_dir, 'forecasts')
+        self._forecasts = {key: group.sort_values('data_year').reset_index(drop=True)
+                           for key, group in forecasts.groupby(['indicator_code', 'scenario'])}
+        try:
+            simulation = read_table(output_dir, 'simulation')
+            self._simulations = {code: group.drop(columns='indicator_code').sort_values('data_year')
+                                 .reset_index(drop=True) for code, group in simulation.groupby('indicator_code')}
+        except FileNotFoundError:
+            self._simulations = {}
+        self.fallback = fallback if fallback is not None else ForecastCache()
+        self.hits = 0
+        self.misses = 0
+
+    def _covers(self, start_year, end_year):
+        return start_year == self.manifest['start_year'] and end_year <= self.manifest['end_year']
+
+    def _rows(self, indicator_code, scenario, end_year):
+        frame = self._forecasts.get((indicator_code, scenario))
+        if frame is None:
+            return None
+        return frame[frame['data_year'] <= end_year]
+
+    def baseline(self, data, indicator_code, start_year=2025, end_year=2027):
+        rows = self._rows(indicator_code, 'baseline', end_year) if self._covers(start_year, end_year) else None
+        if rows is None:
+            if self._covers(start_year, end_year) and self._matches(_fingerprint(data)):
+                # Precomputed runs skip indicators with too little history
+                self.hits += 1
+                return pd.DataFrame()
+            self.misses += 1
+            return self.fallback.baseline(data, indicator_code, start_year, end_year)
+        self.hits += 1
+        return (rows.rename(columns={'prediction': 'baseline_prediction'})
+                [['data_year', 'baseline_prediction', 'ci_lower', 'ci_upper']].reset_index(drop=True))
+
+    def scenarios(self, store, indicator_code, start_year=2025, end_year=2027, scenarios=None, modifiers=None):
+        names = list(SCENARIO_MODIFIERS) if scenarios is None and modifiers is None else list(scenarios or [])
+        parts = [self._rows(indicator_code, name, end_year) for name in names]
+        if modifiers is not None or not self._covers(start_year, end_year) or any(p is None for p in parts):
+            self.misses += 1
+            return self.fallback.scenarios(store, indicator_code, start_year, end_year, scenarios, modifiers)
+        self.hits += 1
+        return np.array([part['prediction'].to_numpy(dtype=float) for part in parts])
+
+    def simulation(self, store, indicator_code, start_year=2025, end_year=2027, **kwargs):
+        # Simulated paths depend on every setting, so only an exact match is served
+        precomputed = dict(self.manifest.get('simulation', {}),
+                           target=self.manifest.get('targets', {}).get(indicator_code))
+        if indicator_code in self._simulations and \
+                dict(kwargs, start_year=start_year, end_year=end_year) == precomputed:
+            self.hits += 1
+            return self._simulations[indicator_code]
+        self.misses += 1
+        return self.fallback.simulation(store, indicator_code, start_year, end_year, **kwargs)
+
+    def is_current(self, store):
+        """
+        True if the artifacts were computed from the same dataset as `store`.
+        """
+        return self._matches(store.fingerprint)
+
+    def _matches(self, fingerprint):
+        return self.manifest.get('fingerprint') == fingerprint
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': 0,
+            'size': len(self._forecasts),
+            'maxsize': len(self._forecasts),
+        }
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+from data_loader import DEFAULT_DATA_PATH, _load_data_logic, _resolve_data_path
+from enrichment_store import DEFAULT_ENRICHMENT_PATH
+from forecast_cache import ForecastCache
+from incremental_forecaster import IncrementalForecaster
+from indicator_store import IndicatorStore
+from instrumentation import stage
+from shared_snapshot import CURRENT_NAME, open_snapshot
+
+# One consistent view of the data: readers hold on to the tuple they got, so a
+# swap never changes a store or cache out from under a running page
+Snapshot = namedtuple('Snapshot', ['store', 'forecasts', 'version', 'loaded_at', 'mtimes'])
+
+# What the dashboard asks for first: (indicator, start_year, end_year)
+DEFAULT_WARM = (('ACC_OWNERSHIP', 2025, 2027), ('USG_P2P_COUNT', 2025, 2027), ('ACC_OWNERSHIP', 2025, 2030))
+
+
+def warm_forecasts(store, forecasts, requests=DEFAULT_WARM):
+    """
+    Fills a fresh ForecastCache with the baseline and scenario grids for
+    `requests`, so the first page view after a swap is a cache hit.
+    """
+    for code, start_year, end_year in requests:
+        forecasts.baseline(store, code, start_year, end_year)
+        forecasts.scenarios(store, code, start_year, end_year)
+
+
+class SnapshotRefresher:
+    """
+    Keeps the current (store, forecasts) snapshot and rebuilds it in a
+    background thread when the data file or enrichment log changes on disk.
+
+    current() never blocks on a rebuild: callers keep getting the previous
+    snapshot until the new frame, index and warmed forecast cache are ready,
+    then the reference is swapped in one assignment. A failed rebuild keeps the
+    old snapshot and is reported in status(); it is not retried until the
+    watched files change again (or refresh(force=True)).
+
+    With shared_dir, the store is opened from the memory-mapped snapshot another
+    process publishes there (shared_snapshot) instead of loading the workbook,
+    and the watched file is the snapshot's CURRENT pointer.
+    """
+
+    def __init__(self, data_path=DEFAULT_DATA_PATH, enrichment_path=None, interval=5.0,
+                 warm=warm_forecasts, cache_size=128, streaming=False, shared_dir=None):
+        self.data_path = data_path
+        self.shared_dir = shared_dir
+        self.enrichment_path = enrichment_path or DEFAULT_ENRICHMENT_PATH
+        self.interval = interval
+        self.warm = warm
+        self.cache_size = cache_size
+        self.streaming = streaming
+        self.last_error = None
+        self._snapshot = None
+        self._failed_mtimes = None
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _mtimes(self):
+        if self.shared_dir:
+            paths = (os.path.join(self.shared_dir, CURRENT_NAME),)
+        else:
+            paths = (_resolve_data_path(self.data_path), self.enrichment_path)
+        mtimes = []
+        for path in paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _build(self, mtimes):
+        with stage('refresh.build') as timer:
+            if self.shared_dir:
+                store = open_snapshot(self.shared_dir)
+            else:
+                # Straight to the loader: st.cache_data would hand back the stale frame
+                df, df_impact = _load_data_logic(self.data_path, self.enrichment_path, streaming=self.streaming)
+                store = IndicatorStore(df, df_impact)
+            forecasts = ForecastCache(maxsize=self.cache_size, incremental=IncrementalForecaster(store))
+            if self.warm is not None:
+                self.warm(store, forecasts)
+            timer.rows = len(store.df)
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        return Snapshot(store, forecasts, version, time.time(), mtimes)
+
+    def refresh(self, force=False):
+        """
+        Rebuilds the snapshot if the watched files changed (or `force`) and
+        swaps it in. Runs on the calling thread; returns True if it swapped.
+        A rebuild already in progress makes this a no-op.
+        """
+        if not self._rebuilding.acquire(blocking=False):
+            return False
+        try:
+            mtimes = self._mtimes()
+            if not force and self._snapshot is not None and mtimes in (self._snapshot.mtimes, self._failed_mtimes):
+                return False
+            try:
+                snapshot = self._build(mtimes)
+            except Exception:
+                # Keep serving the last good snapshot
+                self.last_error = traceback.format_exc()
+                # Don't re-parse the same broken files on every poll
+                self._failed_mtimes = mtimes
+                print(f"Data refresh failed; keeping snapshot v{self.version} until the data changes.")
+                return False
+            with self._lock:
+                self._snapshot = snapshot
+            self.last_error = None
+            self._failed_mtimes = None
+            print(f"Swapped in data snapshot v{snapshot.version}.")
+            return True
+        finally:
+            self._rebuilding.release()
+
+    def current(self):
+        """
+        The latest complete snapshot. Builds the first one on the calling thread.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh(force=True)
+            snapshot = self._snapshot
+            if snapshot is None:
+                # Lost the race to another thread's first build: wait for it
+                with self._rebuilding:
+                    snapshot = self._snapshot
+            if snapshot is None:
+                raise RuntimeError(f"Could not load data snapshot:\n{self.last_error}")
+        return snapshot
+
+    def add_observations(self, df):
+        """
+        Serves forecasts that include new observation rows without a reload: they
+        are folded into the current snapshot's incremental forecaster and only the
+        changed indicators are refitted. The next rebuild reads the data file again.
+        Returns the changed indicator codes.
+        """
+        return self.current().forecasts.add_observations(df)
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def start(self):
+        """
+        Starts the background watcher (a daemon thread polling every `interval` seconds).
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='data-refresh', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def status(self):
+        snapshot = self._snapshot
+        return {
+            'version': self.version,
+            'loaded_at': snapshot.loaded_at if snapshot is not None else None,
+            'refreshing': self._rebuilding.locked(),
+            'watching': self._thread is not None and self._thread.is_alive(),
+            'last_error': self.last_error,
+        }
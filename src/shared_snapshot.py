@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicator_store import IndicatorStore
+from instrumentation import stage
+
+# Bump whenever the snapshot layout changes; older snapshots are then refused
+SNAPSHOT_FORMAT_VERSION = 1
+CURRENT_NAME = 'CURRENT'
+INDEX_NAME = 'index.json'
+ARRAY_NAMES = ['years', 'values', 'rows', 'any_years', 'any_values', 'any_rows']
+# Published snapshots kept on disk: the current one plus those workers may still map
+KEEP_SNAPSHOTS = 2
+
+
+def write_snapshot(store, directory):
+    """
+    Publishes a read-only snapshot of an IndicatorStore under
+    directory/<fingerprint>/ and then points directory/CURRENT at it:
+
+      unified.arrow        the unified frame as an uncompressed Arrow IPC file
+      impact.arrow         impact links, and impact_model.arrow joined to events
+      <array>.npy          the store's packed series arrays (years, values, rows, ...)
+      index.json           slice tables, record counts and the dataset fingerprint
+
+    Other processes open it with open_snapshot, memory-mapped. Returns the snapshot path.
+    """
+    import pyarrow as pa
+
+    fingerprint = store.fingerprint
+    path = os.path.join(directory, fingerprint)
+    with stage('snapshot.write') as timer:
+        if not os.path.exists(os.path.join(path, INDEX_NAME)):
+            tmp = os.path.join(directory, f".{fingerprint}.tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            for name, frame in (('unified', store.df), ('impact', store.df_impact),
+                                ('impact_model', store.impact_model)):
+                table = pa.Table.from_pandas(frame)
+                with pa.OSFile(os.path.join(tmp, f"{name}.arrow"), 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+
+            arrays, slices, any_slices = store.index_arrays()
+            for name in ARRAY_NAMES:
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+            index = {
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'fingerprint': fingerprint,
+                'created': time.time(),
+                'rows': len(store.df),
+                'slices': [[code, _json_key(gender), start, stop] for (code, gender), (start, stop) in slices.items()],
+                'any_slices': [[code, start, stop] for code, (start, stop) in any_slices.items()],
+                'record_type_counts': {str(k): int(v) for k, v in store.record_type_counts().items()},
+            }
+            with open(os.path.join(tmp, INDEX_NAME), 'w', encoding='utf-8') as fh:
+                json.dump(index, fh)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+        timer.rows = len(store.df)
+
+    # Swap the pointer last, so readers only ever see complete snapshots
+    pointer = os.path.join(directory, CURRENT_NAME)
+    with open(pointer + '.tmp', 'w', encoding='utf-8') as fh:
+        fh.write(fingerprint)
+    os.replace(pointer + '.tmp', pointer)
+    _prune(directory, fingerprint)
+    print(f"Published snapshot {fingerprint} ({len(store.df)} records) to {directory}.")
+    return path
+
+
+def _json_key(gender):
+    return gender if isinstance(gender, str) else None
+
+
+def _prune(directory, current):
+    snapshots = [entry for entry in os.scandir(directory)
+                 if entry.is_dir() and not entry.name.startswith('.') and entry.name != current]
+    snapshots.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    # Linux keeps pages of deleted files valid for processes that still map them
+    for entry in snapshots[KEEP_SNAPSHOTS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def current_snapshot(directory):
+    """
+    Path of the snapshot CURRENT points at, or None if nothing was published.
+    """
+    try:
+        with open(os.path.join(directory, CURRENT_NAME), encoding='utf-8') as fh:
+            return os.path.join(directory, fh.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def open_snapshot(directory):
+    """
+    Opens the current published snapshot as an IndicatorStore without copying
+    the data: the unified frame is Arrow-backed (pd.ArrowDtype columns) over the
+    memory-mapped IPC file and the series arrays are read-only np.memmaps, so
+    every process opening the same snapshot shares one copy in the page cache.
+    The small impact tables are read normally and the impact graph rebuilt.
+    """
+    import pyarrow as pa
+
+    path = current_snapshot(directory)
+    if path is None:
+        raise FileNotFoundError(f"No snapshot published under {directory}")
+    with stage('snapshot.open') as timer:
+        with open(os.path.join(path, INDEX_NAME), encoding='utf-8') as fh:
+            index = json.load(fh)
+        if index.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Snapshot {path} has format {index.get('format_version')}, "
+                             f"expected {SNAPSHOT_FORMAT_VERSION}; publish it again.")
+
+        def read_table(name, zero_copy):
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(path, f"{name}.arrow"), 'r')).read_all()
+            return table.to_pandas(types_mapper=pd.ArrowDtype) if zero_copy else table.to_pandas()
+
+        df = read_table('unified', zero_copy=True)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in ARRAY_NAMES}
+        slices = {(code, gender): (start, stop) for code, gender, start, stop in index['slices']}
+        any_slices = {code: (start, stop) for code, start, stop in index['any_slices']}
+        store = IndicatorStore.from_index(
+            df, read_table('impact', zero_copy=False), read_table('impact_model', zero_copy=False),
+            arrays, slices, any_slices, index['record_type_counts'], index['fingerprint'])
+        timer.rows = len(df)
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish a shared, memory-mapped data snapshot.")
+    parser.add_argument('directory', help="Snapshot directory shared by the dashboard workers")
+    parser.add_argument('--data', default=None, help="Unified workbook or CSV export")
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help="Keep running and republish whenever the data changes")
+    args = parser.parse_args(argv)
+
+    from data_loader import DEFAULT_DATA_PATH
+    from refresh import SnapshotRefresher
+
+    refresher = SnapshotRefresher(args.data or DEFAULT_DATA_PATH, warm=None)
+    write_snapshot(refresher.current().store, args.directory)
+    while args.watch:
+        time.sleep(args.watch)
+        if refresher.refresh():
+            write_snapshot(refresher.current().store, args.directory)
+
+
+if __name__ == '__main__':
+    main()
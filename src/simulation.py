@@ -0,0 +1,159 @@
+import pandas as pd
+import numpy as np
+
+from forecaster import (SCENARIO_MODIFIERS, RATE_MAGNITUDES, COUNT_MAGNITUDES,
+                        is_rate_indicator, observation_history)
+from instrumentation import timed
+
+
+@timed()
+def simulate_forecast(df, impact_model, indicator_code, start_year=2025, end_year=2027,
+                      n_paths=20000, target=None, scenario='base', percentiles=(5, 25, 50, 75, 95),
+                      magnitude_spread=0.5, lag_spread_months=6.0, seed=None,
+                      chunk_size=5000, n_jobs=1):
+    """
+    Monte Carlo version of run_baseline_forecast + apply_event_impacts.
+    df may be the unified dataframe or an IndicatorStore.
+    Every path samples the trend (level, slope and residual noise from the linear fit),
+    each impact's size (relative spread around its magnitude class) and each lag
+    (normal jitter in months around lag_months). Paths are simulated in chunks of
+    batched NumPy arrays; n_jobs > 1 spreads the chunks over a process pool.
+    Results only depend on `seed` and `chunk_size`, not on n_jobs.
+    Returns a dataframe per forecast year with the mean, percentile bands
+    (columns p5, p50, ...) and, if `target` is given, the probability that the
+    target has been reached by that year.
+    """
+    x_hist, y_hist = observation_history(df, indicator_code)
+
+    if len(x_hist) < 2:
+        return pd.DataFrame()
+
+    years = np.arange(start_year, end_year + 1)
+    trend = _trend_posterior(x_hist, y_hist)
+    is_rate = is_rate_indicator(indicator_code)
+    impacts = _impact_inputs(impact_model, is_rate, SCENARIO_MODIFIERS.get(scenario, 1.0))
+
+    # Fixed chunking + spawned seeds keeps results identical for any n_jobs
+    n_chunks = max(1, int(np.ceil(n_paths / chunk_size)))
+    sizes = np.full(n_chunks, n_paths // n_chunks)
+    sizes[:n_paths % n_chunks] += 1
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(int(size), child, years, trend, impacts, is_rate, magnitude_spread, lag_spread_months)
+             for size, child in zip(sizes, seeds)]
+
+    if n_jobs and n_jobs > 1 and n_chunks > 1:
+        # Imported lazily: the process pool machinery is only needed for parallel runs
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    paths = np.concatenate(chunks, axis=0)
+
+    result = pd.DataFrame({'data_year': years, 'mean': paths.mean(axis=0)})
+    bands = np.percentile(paths, percentiles, axis=0)
+    for q, band in zip(percentiles, bands):
+        result[f"p{q:g}"] = band
+
+    if target is not None:
+        # Reached by year t means any year up to t hit the target
+        reached = np.maximum.accumulate(paths, axis=1) >= target
+        result['prob_target_reached'] = reached.mean(axis=0)
+
+    return result
+
+
+def _trend_posterior(x, y):
+    """
+    Linear fit summary used for sampling: centred level and slope with their
+    standard errors, plus the residual standard deviation.
+    """
+    n = len(x)
+    x_mean, y_mean = x.mean(), y.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    slope = ((x - x_mean) * (y - y_mean)).sum() / sxx if sxx > 0 else 0.0
+    resids = y - (y_mean + slope * (x - x_mean))
+    # Unbiased residual variance when there are spare degrees of freedom
+    dof = n - 2 if n > 2 else n
+    sigma = np.sqrt((resids ** 2).sum() / dof)
+    return {
+        'x_mean': x_mean,
+        'level': y_mean,
+        'level_se': sigma / np.sqrt(n),
+        'slope': slope,
+        'slope_se': sigma / np.sqrt(sxx) if sxx > 0 else 0.0,
+        'sigma': sigma,
+    }
+
+
+def _impact_inputs(impact_model, is_rate, modifier):
+    """
+    Compact per-link arrays: signed scenario magnitude, the event year and the lag in months.
+    Falls back to realized_year (with zero lag) when the event columns are missing.
+    """
+    if impact_model is None or len(impact_model) == 0:
+        empty = np.zeros(0)
+        return {'signed': empty, 'event_year': empty, 'lag_months': empty}
+
+    mag_map = RATE_MAGNITUDES if is_rate else COUNT_MAGNITUDES
+    magnitude = impact_model['impact_magnitude'].astype(str).str.lower().map(mag_map).fillna(0.0)
+    direction = np.where(impact_model['impact_direction'] == 'increase', 1.0, -1.0)
+
+    if 'event_year' in impact_model.columns and 'lag_months' in impact_model.columns:
+        event_year = pd.to_numeric(impact_model['event_year'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        lag = pd.to_numeric(impact_model['lag_months'], errors='coerce').fillna(0).to_numpy(dtype=float, na_value=np.nan)
+    else:
+        event_year = pd.to_numeric(impact_model['realized_year'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        lag = np.zeros(len(impact_model))
+
+    known = ~np.isnan(event_year)
+    return {
+        'signed': (magnitude.to_numpy(dtype=float) * direction * modifier)[known],
+        'event_year': event_year[known],
+        'lag_months': lag[known],
+    }
+
+
+def _simulate_chunk(task):
+    """
+    Simulates one chunk of paths. Returns an (n_paths x n_years) array.
+    Module-level so it can be shipped to a process pool.
+    """
+    n_paths, seed, years, trend, impacts, is_rate, magnitude_spread, lag_spread_months = task
+    rng = np.random.default_rng(seed)
+    n_years = len(years)
+
+    # 1. Trend: sample level and slope, then add residual noise per year
+    level = rng.normal(trend['level'], trend['level_se'], size=n_paths)
+    slope = rng.normal(trend['slope'], trend['slope_se'], size=n_paths)
+    noise = rng.normal(0.0, trend['sigma'], size=(n_paths, n_years))
+    paths = level[:, None] + slope[:, None] * (years - trend['x_mean'])[None, :] + noise
+
+    # 2. Impacts: sample size and lag for every (path, link)
+    n_links = len(impacts['signed'])
+    if n_links:
+        scale = np.clip(rng.normal(1.0, magnitude_spread, size=(n_paths, n_links)), 0.0, None)
+        size = impacts['signed'][None, :] * scale
+        lag = np.clip(impacts['lag_months'][None, :] + rng.normal(0.0, lag_spread_months, size=(n_paths, n_links)), 0.0, None)
+        impact_year = np.trunc(impacts['event_year'][None, :] + lag / 12.0)
+
+        # Bucket by realised year; links outside the window go to a discarded extra slot
+        offset = impact_year - years[0]
+        in_window = (offset >= 0) & (offset < n_years)
+        slot = np.where(in_window, offset, n_years).astype(int)
+        flat = (np.arange(n_paths)[:, None] * (n_years + 1) + slot).ravel()
+
+        if is_rate:
+            # Additive for rates (pp)
+            per_year = np.bincount(flat, weights=size.ravel(), minlength=n_paths * (n_years + 1))
+            effect = np.cumsum(per_year.reshape(n_paths, n_years + 1)[:, :n_years], axis=1)
+            paths = paths + effect
+        else:
+            # Multiplicative for counts (growth), summed in log space
+            log_growth = np.log1p(np.clip(size, -0.999999, None))
+            per_year = np.bincount(flat, weights=log_growth.ravel(), minlength=n_paths * (n_years + 1))
+            effect = np.exp(np.cumsum(per_year.reshape(n_paths, n_years + 1)[:, :n_years], axis=1))
+            paths = paths * effect
+
+    # Ensure non-negative
+    return np.clip(paths, 0, None)
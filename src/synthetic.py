@@ -0,0 +1,133 @@
+import pandas as pd
+import numpy as np
+
+from data_loader import apply_schema
+from dates import parse_dates
+
+PILLAR_PREFIXES = {'ACCESS': 'ACC', 'USAGE': 'USG', 'GENDER': 'GEN', 'QUALITY': 'QLT',
+                   'TRUST': 'TRS', 'AFFORDABILITY': 'AFF', 'DEPTH': 'DPT'}
+EVENT_CATEGORIES = ['product_launch', 'market_entry', 'policy', 'regulation', 'infrastructure',
+                    'partnership', 'milestone', 'economic', 'pricing']
+MAGNITUDES = ['high', 'medium', 'low']
+
+
+def generate_unified_dataset(n_indicators=1000, n_events=200, links_per_event=5,
+                             years=range(2011, 2025), regions=('national', 'addis_ababa', 'oromia'),
+                             genders=('all', 'male', 'female'), observation_density=0.6, seed=0):
+    """
+    Generates a synthetic dataset in the unified schema, shaped like the output of
+    data_loader._load_data_logic: (df_unified, df_impact) with parsed dates and the
+    compact dtype schema applied. Used for benchmarks and large-scale tests.
+
+    The first two indicators are ACC_OWNERSHIP (a rate) and USG_P2P_COUNT (a count),
+    so the analysis functions that hardcode them have data to work with.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.asarray(list(years))
+    pillars = np.array(list(PILLAR_PREFIXES))
+
+    # 1. Indicator catalogue
+    ind_pillar = pillars[rng.integers(0, len(pillars), n_indicators)]
+    ind_is_count = rng.random(n_indicators) < 0.3
+    codes = np.array([f"{PILLAR_PREFIXES[p]}_SYN_{i:05d}" + ('' if count else '_RATE')
+                      for i, (p, count) in enumerate(zip(ind_pillar, ind_is_count))], dtype=object)
+    for pos, (code, pillar, is_count) in enumerate([('ACC_OWNERSHIP', 'ACCESS', False),
+                                                    ('USG_P2P_COUNT', 'USAGE', True)][:n_indicators]):
+        codes[pos], ind_pillar[pos], ind_is_count[pos] = code, pillar, is_count
+
+    # 2. Observations: every (indicator, region, gender, year) kept with observation_density
+    grid = np.array(np.meshgrid(np.arange(n_indicators), np.arange(len(regions)),
+                                np.arange(len(genders)), np.arange(len(years)), indexing='ij')).reshape(4, -1)
+    keep = rng.random(grid.shape[1]) < observation_density
+    # the anchor indicators stay national-only: analyze_data pivots them on (year, gender)
+    keep &= (grid[0] >= 2) | (grid[1] == 0)
+    grid = grid[:, keep]
+    ind, reg, gen, yr = grid
+    n_obs = len(ind)
+
+    level = np.where(ind_is_count, rng.uniform(1e5, 1e8, n_indicators), rng.uniform(5, 60, n_indicators))
+    growth = np.where(ind_is_count, rng.uniform(0.05, 0.4, n_indicators), rng.uniform(0.5, 3.0, n_indicators))
+    t = years[yr] - years[0]
+    trend = np.where(ind_is_count[ind], level[ind] * (1 + growth[ind]) ** t, level[ind] + growth[ind] * t)
+    gender_shift = np.where(np.asarray(genders)[gen] == 'female', 0.85,
+                            np.where(np.asarray(genders)[gen] == 'male', 1.1, 1.0))
+    values = trend * gender_shift * rng.normal(1.0, 0.03, n_obs)
+    values = np.where(ind_is_count[ind], values, np.clip(values, 0, 100))
+
+    obs_dates = pd.to_datetime(pd.Series(years[yr]).astype(str) + '-12-31')
+    observations = pd.DataFrame({
+        'record_id': [f"REC_{i:07d}" for i in range(n_obs)],
+        'parent_id': None,
+        'record_type': 'observation',
+        'category': None,
+        'pillar': ind_pillar[ind],
+        'indicator': [f"Synthetic indicator {c}" for c in codes[ind]],
+        'indicator_code': codes[ind],
+        'value_numeric': values,
+        'unit': np.where(ind_is_count[ind], 'count', '%'),
+        'unit_type': np.where(ind_is_count[ind], 'count', 'percentage'),
+        'observation_date': obs_dates,
+        'start_date': pd.NaT,
+        'data_year': years[yr].astype(float),
+        'gender': np.asarray(genders)[gen],
+        'region': np.asarray(regions)[reg],
+        'source_name': rng.choice(['Findex', 'NBE', 'Ethio Telecom', 'GSMA', 'EthSwitch'], n_obs),
+        'source_url': None,
+        'confidence': rng.choice(['high', 'medium', 'low'], n_obs),
+        'notes': None,
+    })
+
+    # 3. Events
+    event_years = rng.integers(years[0], years[-1] + 3, n_events)
+    event_dates = pd.to_datetime(pd.Series(event_years).astype(str) + '-01-01') + \
+        pd.to_timedelta(rng.integers(0, 365, n_events), unit='D')
+    events = pd.DataFrame({
+        'record_id': [f"EVT_{i:05d}" for i in range(n_events)],
+        'parent_id': None,
+        'record_type': 'event',
+        'category': rng.choice(EVENT_CATEGORIES, n_events),
+        'pillar': None,
+        'indicator': [f"Synthetic event {i}" for i in range(n_events)],
+        'indicator_code': None,
+        'value_numeric': np.nan,
+        'observation_date': pd.NaT,
+        'start_date': event_dates,
+        'data_year': event_years.astype(float),
+        'gender': None,
+        'region': rng.choice(np.asarray(regions), n_events),
+        'source_name': rng.choice(['NBE', 'Ethio Telecom', 'Safaricom'], n_events),
+        'confidence': rng.choice(['high', 'medium'], n_events),
+    })
+
+    # 4. Impact links: each event fans out to several indicators
+    n_links = n_events * links_per_event
+    link_event = np.repeat(np.arange(n_events), links_per_event)
+    link_ind = rng.integers(0, n_indicators, n_links)
+    df_impact = pd.DataFrame({
+        'record_id': [f"IMP_{i:06d}" for i in range(n_links)],
+        'parent_id': events['record_id'].to_numpy()[link_event],
+        'record_type': 'impact_link',
+        'pillar': ind_pillar[link_ind],
+        'related_indicator': codes[link_ind],
+        'relationship_type': 'direct',
+        'impact_direction': rng.choice(['increase', 'decrease'], n_links, p=[0.8, 0.2]),
+        'impact_magnitude': rng.choice(MAGNITUDES, n_links),
+        'impact_estimate': rng.uniform(1, 30, n_links).round(1),
+        'lag_months': rng.choice([0, 3, 6, 12, 18, 24, 36], n_links),
+    })
+
+    df_unified = pd.concat([observations, events], ignore_index=True)
+    df_unified = parse_dates(df_unified)
+    return apply_schema(df_unified, "synthetic data"), apply_schema(df_impact, "synthetic impact links")
+
+
+def write_workbook(df_unified, df_impact, path):
+    """
+    Writes a dataset to an xlsx laid out like the official workbook
+    (a cover sheet, the data sheet and Impact_sheet), so load_data can read it.
+    """
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({'title': ['Synthetic unified data']}).to_excel(writer, sheet_name='Cover', index=False)
+        df_unified.to_excel(writer, sheet_name='data', index=False)
+        df_impact.to_excel(writer, sheet_name='Impact_sheet', index=False)
+    return path
@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from analyze_data import calculate_cagr, indicator_analytics, analyze_access_slowdown, analyze_gender_gap
+from synthetic import generate_unified_dataset
+
+
+def make_frame():
+    return pd.DataFrame({
+        'record_id': [f"REC_{i}" for i in range(9)] + ['EVT_1'],
+        'record_type': ['observation'] * 9 + ['event'],
+        'indicator_code': ['ACC_OWNERSHIP'] * 7 + ['USG_P2P_COUNT'] * 2 + [None],
+        'pillar': ['ACCESS'] * 7 + ['USAGE'] * 2 + [None],
+        'gender': ['all', 'all', 'all', 'male', 'female', 'male', 'female', 'all', 'all', None],
+        'data_year': [2017.0, 2021.0, 2014.0, 2021.0, 2021.0, 2024.0, 2024.0, 2023.0, 2024.0, 2021.0],
+        'value_numeric': [35.0, 46.0, 22.0, 50.0, 40.0, 56.0, 36.0, 1e6, 1.5e6, None],
+    })
+
+
+class TestIndicatorAnalytics(unittest.TestCase):
+    def test_growth_and_gaps(self):
+        table = indicator_analytics(make_frame())
+        acc = table[(table['indicator_code'] == 'ACC_OWNERSHIP') & (table['gender'] == 'all')]
+        self.assertEqual(acc['data_year'].tolist(), [2014.0, 2017.0, 2021.0])
+        np.testing.assert_allclose(acc['growth_pp'], [np.nan, 13.0, 11.0])
+        np.testing.assert_allclose(acc['avg_annual_growth_pp'], [np.nan, 13.0 / 3, 11.0 / 4])
+        np.testing.assert_allclose(acc['cagr'], [np.nan, (35 / 22) ** (1 / 3) - 1, (46 / 35) ** 0.25 - 1])
+        # series never run into each other
+        p2p = table[table['indicator_code'] == 'USG_P2P_COUNT']
+        np.testing.assert_allclose(p2p['cagr'], [np.nan, 0.5])
+        # the gap is broadcast to every row of its (indicator, year)
+        acc_2024 = table[(table['indicator_code'] == 'ACC_OWNERSHIP') & (table['data_year'] == 2024)]
+        self.assertEqual(acc_2024['gap_pp'].tolist(), [20.0, 20.0])
+        self.assertEqual(acc['gap_pp'].tolist()[-1], 10.0)
+        self.assertTrue(p2p['gap_pp'].isna().all())
+
+    def test_single_indicator_views(self):
+        df = make_frame()
+        table = indicator_analytics(df)
+        access = analyze_access_slowdown(df)
+        self.assertEqual(access.index.tolist(), [2, 0, 1])
+        self.assertEqual(access['value_numeric'].tolist(), [22.0, 35.0, 46.0])
+        np.testing.assert_allclose(access['avg_annual_growth_pp'], [np.nan, 13.0 / 3, 11.0 / 4])
+        pd.testing.assert_frame_equal(access, analyze_access_slowdown(df, analytics=table))
+        gap = analyze_gender_gap(df)
+        self.assertEqual(gap.columns.tolist(), ['female', 'male', 'gap_pp'])
+        self.assertEqual(gap['gap_pp'].tolist(), [10.0, 20.0])
+        pd.testing.assert_frame_equal(gap, analyze_gender_gap(df, analytics=table))
+        self.assertEqual(analyze_access_slowdown(df, 'USG_P2P_COUNT')['growth_pp'].iloc[-1], 5e5)
+
+    def test_regions_are_separate_series(self):
+        df, _ = generate_unified_dataset(n_indicators=20, n_events=5, seed=4)
+        table = indicator_analytics(df)
+        obs = df[df['record_type'] == 'observation']
+        self.assertEqual(len(table), len(obs))
+        # every series restarts: first rows have no growth
+        first = ~table.duplicated(['indicator_code', 'region', 'gender'])
+        self.assertTrue(table.loc[first, 'growth_pp'].isna().all())
+        self.assertEqual(int(table['growth_pp'].notna().sum()), int((~first).sum()))
+
+    def test_cagr_arrays(self):
+        self.assertAlmostEqual(calculate_cagr(100, 121, 2), 0.1)
+        self.assertTrue(np.isnan(calculate_cagr(0, 5, 2)))
+        np.testing.assert_allclose(calculate_cagr([100, 0, 50], [121, 1, 50], [2, 1, 0]), [0.1, np.nan, np.nan])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import data_loader
+from data_cache import cache_paths
+from enrichment_store import DEFAULT_ENRICHMENT_PATH
+
+
+def write_sample_workbook(path):
+    """Writes a small workbook with the same sheet layout as the official file."""
+    cover = pd.DataFrame({'title': ['Ethiopia FI unified data']})
+    data = pd.DataFrame({
+        'record_id': ['REC_0001', 'REC_0002', 'EVT_0001'],
+        'record_type': ['observation', 'observation', 'event'],
+        'pillar': ['ACCESS', 'ACCESS', None],
+        'indicator': ['Account Ownership', 'Account Ownership', 'Telebirr Launch'],
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP', None],
+        'gender': ['all', 'all', None],
+        'value_numeric': [35.0, 46.0, None],
+        'observation_date': ['2021-12-31', '2024-12-31', None],
+        'start_date': [None, None, '2021-05-11'],
+        'data_year': [None, 2024, 2021],
+    })
+    impact = pd.DataFrame({
+        'record_id': ['IMP_0001'],
+        'parent_id': ['EVT_0001'],
+        'related_indicator': ['ACC_OWNERSHIP'],
+        'impact_direction': ['increase'],
+        'impact_magnitude': ['high'],
+        'lag_months': [12],
+    })
+    with pd.ExcelWriter(path) as writer:
+        cover.to_excel(writer, sheet_name='Cover', index=False)
+        data.to_excel(writer, sheet_name='data', index=False)
+        impact.to_excel(writer, sheet_name='Impact_sheet', index=False)
+
+
+def _normalize(frame):
+    # Parquet stores None and NaN alike, so compare values with a single missing marker
+    return frame.astype(object).where(frame.notna(), None)
+
+
+class TestDataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.tmpdir, 'ethiopia_fi_unified_data.xlsx')
+        write_sample_workbook(self.data_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_second_load_skips_workbook(self):
+        """A warm load is served from Parquet without opening the xlsx."""
+        df, df_impact = data_loader._load_data_logic(self.data_path, None)
+        self.assertTrue(os.path.exists(cache_paths(self.data_path)['manifest']))
+
+        with mock.patch.object(data_loader.pd, 'ExcelFile', side_effect=AssertionError("workbook re-read")):
+            df_cached, impact_cached = data_loader._load_data_logic(self.data_path, None)
+
+        pd.testing.assert_frame_equal(_normalize(df), _normalize(df_cached))
+        pd.testing.assert_frame_equal(_normalize(df_impact), _normalize(impact_cached))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_cached['observation_date']))
+        # data_year derived from observation_date survives the round trip
+        self.assertEqual(df_cached.loc[0, 'data_year'], 2021)
+
+    def test_modified_workbook_rebuilds(self):
+        data_loader._load_data_logic(self.data_path, None)
+        write_sample_workbook(self.data_path)
+        extra = pd.read_excel(self.data_path, sheet_name='data')
+        extra = pd.concat([extra, extra.iloc[[0]].assign(record_id='REC_0003')], ignore_index=True)
+        with pd.ExcelWriter(self.data_path, mode='a', if_sheet_exists='replace') as writer:
+            extra.to_excel(writer, sheet_name='data', index=False)
+
+        df, _ = data_loader._load_data_logic(self.data_path, None)
+        self.assertIn('REC_0003', set(df['record_id']))
+
+    def test_appended_enrichment_is_merged_without_workbook(self):
+        enrichment_path = os.path.join(self.tmpdir, 'enrichment.jsonl')
+        shutil.copy(DEFAULT_ENRICHMENT_PATH, enrichment_path)
+        df, _ = data_loader._load_data_logic(self.data_path, enrichment_path)
+
+        data_loader.add_enrichment([
+            {'record_id': 'REC_0099', 'record_type': 'observation', 'indicator_code': 'ACC_OWNERSHIP',
+             'gender': 'all', 'value_numeric': 50.0, 'observation_date': '2025-06-30'},
+            # A newer version of an existing record replaces it
+            {'record_id': 'EVT_NEW_01', 'record_type': 'event', 'category': 'regulation',
+             'indicator': 'NBE Directive SBB/94/2025 (Foreign Banks)', 'start_date': '2025-06-25'},
+        ], enrichment_path)
+
+        with mock.patch.object(data_loader.pd, 'ExcelFile', side_effect=AssertionError("workbook re-read")):
+            merged, _ = data_loader._load_data_logic(self.data_path, enrichment_path)
+            # The cache now includes the delta, so a further load is a plain hit
+            again, _ = data_loader._load_data_logic(self.data_path, enrichment_path)
+
+        self.assertEqual(len(merged), len(df) + 1)
+        self.assertEqual(merged['record_id'].value_counts()['EVT_NEW_01'], 1)
+        self.assertEqual(merged.set_index('record_id').loc['EVT_NEW_01', 'category'], 'regulation')
+        new_row = merged.set_index('record_id').loc['REC_0099']
+        self.assertEqual(new_row['data_year'], 2025)
+        self.assertIsInstance(merged['indicator_code'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(_normalize(merged), _normalize(again))
+
+    def test_rewritten_enrichment_rebuilds(self):
+        enrichment_path = os.path.join(self.tmpdir, 'enrichment.jsonl')
+        shutil.copy(DEFAULT_ENRICHMENT_PATH, enrichment_path)
+        data_loader._load_data_logic(self.data_path, enrichment_path)
+
+        with open(enrichment_path, 'w') as fh:
+            fh.write('{"record_id": "EVT_ONLY", "record_type": "event"}\n')
+        with mock.patch.object(data_loader.pd, 'ExcelFile', wraps=pd.ExcelFile) as excel:
+            df, _ = data_loader._load_data_logic(self.data_path, enrichment_path)
+            self.assertTrue(excel.called)
+        self.assertIn('EVT_ONLY', set(df['record_id']))
+        self.assertNotIn('EVT_NEW_01', set(df['record_id']))
+
+    def test_invalidate_and_rebuild(self):
+        data_loader._load_data_logic(self.data_path, None)
+        self.assertTrue(data_loader.invalidate_data_cache(self.data_path))
+        self.assertFalse(os.path.exists(cache_paths(self.data_path)['manifest']))
+        self.assertFalse(data_loader.invalidate_data_cache(self.data_path))
+
+        df, _ = data_loader.rebuild_data_cache(self.data_path)
+        self.assertTrue(any(df['record_id'] == 'EVT_NEW_01'))
+        self.assertTrue(os.path.exists(cache_paths(self.data_path)['unified']))
+
+
+if __name__ == '__main__':
+    unittest.main()
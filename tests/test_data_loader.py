@@ -5,7 +5,10 @@ import pandas as pd
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-from data_loader import load_data
+from data_loader import load_data, apply_schema, CATEGORICAL_COLUMNS
+from analyze_data import analyze_access_slowdown, analyze_gender_gap
+from indicator_store import IndicatorStore
+from forecaster import run_baseline_forecast
 
 class TestDataLoader(unittest.TestCase):
     def test_load_data_structure(self):
@@ -40,5 +43,42 @@ class TestDataLoader(unittest.TestCase):
         except FileNotFoundError:
             self.skipTest("Data file not found.")
 
+class TestSchema(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'record_id': ['REC_1', 'REC_2', 'REC_3', 'REC_4', 'EVT_1'],
+            'record_type': ['observation'] * 4 + ['event'],
+            'indicator': ['Account Ownership'] * 4 + ['Telebirr Launch'],
+            'indicator_code': ['ACC_OWNERSHIP'] * 4 + [None],
+            'gender': ['all', 'all', 'male', 'female', None],
+            'source_name': ['Findex'] * 4 + ['Ethio Telecom'],
+            'value_numeric': [35.2, 46.5, 56.0, 36.0, None],
+            'lag_months': [None, None, None, None, 12.0],
+            'data_year': [2021.0, 2024.0, 2024.0, 2024.0, 2021.0],
+            'start_date': pd.to_datetime([None] * 4 + ['2021-05-11']),
+        })
+
+    def test_dtypes(self):
+        typed = apply_schema(self.df)
+        for col in CATEGORICAL_COLUMNS:
+            if col in typed.columns:
+                self.assertIsInstance(typed[col].dtype, pd.CategoricalDtype, col)
+        self.assertEqual(str(typed['data_year'].dtype), 'Int64')
+        # value_numeric can't be stored in float32 without loss; lag_months can
+        self.assertEqual(typed['value_numeric'].dtype, 'float64')
+        self.assertEqual(typed['lag_months'].dtype, 'float32')
+        self.assertLess(typed.memory_usage(deep=True).sum(), self.df.memory_usage(deep=True).sum())
+
+    def test_downstream_results_unchanged(self):
+        typed = apply_schema(self.df)
+        pd.testing.assert_frame_equal(run_baseline_forecast(typed, 'ACC_OWNERSHIP'),
+                                      run_baseline_forecast(self.df, 'ACC_OWNERSHIP'))
+        self.assertEqual(list(analyze_access_slowdown(typed)['growth_pp'].round(6).dropna()),
+                         list(analyze_access_slowdown(self.df)['growth_pp'].round(6).dropna()))
+        gap = analyze_gender_gap(typed)
+        self.assertEqual(gap.loc[2024, 'gap_pp'], 20.0)
+        self.assertEqual(IndicatorStore(typed).latest('ACC_OWNERSHIP'), 46.5)
+
+
 if __name__ == '__main__':
     unittest.main()
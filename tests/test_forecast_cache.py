@@ -0,0 +1,113 @@
+import sys
+import os
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import forecast_cache
+from forecast_cache import ForecastCache
+from forecaster import run_baseline_forecast, evaluate_scenarios
+from incremental_forecaster import IncrementalForecaster
+from indicator_store import IndicatorStore
+from test_indicator_store import make_unified
+
+
+class TestForecastCache(unittest.TestCase):
+    def setUp(self):
+        df, df_impact = make_unified()
+        self.store = IndicatorStore(df, df_impact)
+        self.cache = ForecastCache(maxsize=4)
+
+    def test_repeat_calls_hit(self):
+        first = self.cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        with mock.patch.object(forecast_cache, 'run_baseline_forecast', side_effect=AssertionError("recomputed")):
+            second = self.cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        self.assertIs(first, second)
+        pd.testing.assert_frame_equal(first, run_baseline_forecast(self.store, 'ACC_OWNERSHIP', 2025, 2030))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_scenarios_match_direct_call(self):
+        grid = self.cache.scenarios(self.store, 'ACC_OWNERSHIP', scenarios=['base', 'optimistic'])
+        baseline = run_baseline_forecast(self.store, 'ACC_OWNERSHIP')
+        expected = evaluate_scenarios(baseline, self.store.impacts_for('ACC_OWNERSHIP'),
+                                      scenarios=['base', 'optimistic'], indicator_code='ACC_OWNERSHIP')
+        np.testing.assert_array_equal(grid, expected)
+        self.cache.scenarios(self.store, 'ACC_OWNERSHIP', scenarios=['base', 'optimistic'])
+        # scenario miss + nested baseline miss, then one hit
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_lru_eviction(self):
+        for end_year in range(2026, 2031):
+            self.cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, end_year)
+        stats = self.cache.stats()
+        self.assertEqual(stats['size'], 4)
+        self.assertEqual(stats['evictions'], 1)
+        # the oldest entry was evicted, the newest is still there
+        self.cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2026)
+        self.assertEqual(self.cache.stats()['misses'], 6)
+
+    def test_changed_dataset_misses(self):
+        self.cache.baseline(self.store, 'ACC_OWNERSHIP')
+        df, df_impact = make_unified()
+        df.loc[0, 'value_numeric'] = 55.0
+        edited = IndicatorStore(df, df_impact)
+        self.assertNotEqual(edited.fingerprint, self.store.fingerprint)
+        result = self.cache.baseline(edited, 'ACC_OWNERSHIP')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        pd.testing.assert_frame_equal(result, run_baseline_forecast(edited, 'ACC_OWNERSHIP'))
+
+    def test_invalidate_only_named_indicators(self):
+        self.cache.baseline(self.store, 'ACC_OWNERSHIP')
+        kept = self.cache.baseline(self.store, 'ACC_4G_COV')
+        self.assertEqual(self.cache.invalidate(['ACC_OWNERSHIP']), 1)
+        self.assertIs(self.cache.baseline(self.store, 'ACC_4G_COV'), kept)
+        self.cache.baseline(self.store, 'ACC_OWNERSHIP')
+        self.assertEqual(self.cache.stats()['misses'], 3)
+
+    def test_upsert_invalidates_simulation(self):
+        first = self.cache.simulation(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        self.assertIs(self.cache.simulation(self.store, 'ACC_OWNERSHIP', 2025, 2030), first)
+        self.store.upsert_link({'record_id': 'IMP_4', 'parent_id': 'EVT_2', 'related_indicator': 'ACC_OWNERSHIP',
+                                'impact_direction': 'decrease', 'impact_magnitude': 'high', 'lag_months': 0})
+        second = self.cache.simulation(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        self.assertIsNot(second, first)
+
+    def test_appended_observations_are_served_after_invalidate(self):
+        cache = ForecastCache(incremental=IncrementalForecaster(self.store))
+        before = cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        kept = cache.baseline(self.store, 'ACC_4G_COV', 2025, 2030)
+        pd.testing.assert_frame_equal(before, run_baseline_forecast(self.store, 'ACC_OWNERSHIP', 2025, 2030))
+
+        self.assertTrue(cache.incremental.add_observation('ACC_OWNERSHIP', 2025, 99.0))
+        cache.invalidate({'ACC_OWNERSHIP'})
+        after = cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        self.assertGreater(after['baseline_prediction'].iloc[0], before['baseline_prediction'].iloc[0])
+        # same as refitting on the data with the new point
+        df = pd.concat([self.store.df, pd.DataFrame({
+            'record_type': ['observation'], 'indicator_code': ['ACC_OWNERSHIP'], 'gender': ['all'],
+            'data_year': [2025.0], 'value_numeric': [99.0]})], ignore_index=True)
+        pd.testing.assert_frame_equal(after, run_baseline_forecast(df, 'ACC_OWNERSHIP', 2025, 2030),
+                                      check_dtype=False, rtol=1e-8, atol=1e-6)
+        # scenarios follow the new baseline; other indicators are untouched
+        grid = cache.scenarios(self.store, 'ACC_OWNERSHIP', 2025, 2030)
+        np.testing.assert_allclose(grid, evaluate_scenarios(after, self.store.schedule('ACC_OWNERSHIP'),
+                                                            indicator_code='ACC_OWNERSHIP'))
+        self.assertIs(cache.baseline(self.store, 'ACC_4G_COV', 2025, 2030), kept)
+
+        changed = cache.add_observations(pd.DataFrame({
+            'record_type': ['observation'], 'indicator_code': ['ACC_OWNERSHIP'], 'gender': ['all'],
+            'data_year': [2026.0], 'value_numeric': [120.0]}))
+        self.assertEqual(changed, {'ACC_OWNERSHIP'})
+        self.assertGreater(cache.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2030)['baseline_prediction'].iloc[0],
+                           after['baseline_prediction'].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+import sys
+import os
+import time
+import importlib.util
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from forecaster import (run_baseline_forecast, run_baseline_forecasts, apply_event_impacts, evaluate_scenarios,
+                        forecast_all, fit_linear_trend)
+
+
+def make_observations(n_indicators=25, seed=0):
+    """Random observation rows in the unified schema, with uneven history lengths."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_indicators):
+        code = f"ACC_IND_{i:03d}"
+        years = np.sort(rng.choice(np.arange(2011, 2025), size=rng.integers(1, 8), replace=False))
+        values = 10 + rng.normal(2.0, 1.5) * (years - 2011) + rng.normal(0, 2, len(years))
+        for year, value in zip(years, values):
+            rows.append({'record_type': 'observation', 'indicator_code': code,
+                         'gender': 'all', 'data_year': float(year), 'value_numeric': value})
+            rows.append({'record_type': 'observation', 'indicator_code': code,
+                         'gender': 'female', 'data_year': float(year), 'value_numeric': value - 5})
+    rows.append({'record_type': 'event', 'indicator_code': None, 'gender': None,
+                 'data_year': 2021.0, 'value_numeric': None})
+    df = pd.DataFrame(rows)
+    df.insert(0, 'record_id', [f"REC_{i:04d}" for i in range(len(df))])
+    return df
+
+
+def make_impacts(n_links=40, seed=1):
+    """Random joined impact model rows, including links outside the forecast window."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'related_indicator': 'ACC_OWNERSHIP',
+        'impact_direction': rng.choice(['increase', 'decrease', None], size=n_links),
+        'impact_magnitude': rng.choice(['high', 'Medium', 'low', 'unknown', None], size=n_links),
+        'realized_year': rng.uniform(2020, 2033, size=n_links),
+    })
+
+
+def apply_event_impacts_legacy(baseline_forecast, impact_model, scenario='base', indicator_code=None):
+    """Row-by-row implementation apply_event_impacts replaced; kept as the golden reference."""
+    forecast = baseline_forecast.copy()
+    modifier = {'optimistic': 1.5, 'base': 1.0, 'pessimistic': 0.5}.get(scenario, 1.0)
+    is_rate = True
+    if indicator_code and (indicator_code.startswith('USG_') and '_RATE' not in indicator_code):
+        is_rate = False
+    if is_rate:
+        mag_map = {'high': 5.0, 'medium': 2.5, 'low': 1.0}
+    else:
+        mag_map = {'high': 0.20, 'medium': 0.10, 'low': 0.05}
+    for _, row in impact_model.iterrows():
+        impact_year = int(row['realized_year'])
+        if impact_year in forecast['data_year'].values:
+            base_mag = mag_map.get(str(row['impact_magnitude']).lower(), 0.0)
+            direction = 1 if row['impact_direction'] == 'increase' else -1
+            net_impact_val = base_mag * direction * modifier
+            if is_rate:
+                forecast.loc[forecast['data_year'] >= impact_year, 'baseline_prediction'] += net_impact_val
+            else:
+                forecast.loc[forecast['data_year'] >= impact_year, 'baseline_prediction'] *= (1 + net_impact_val)
+    forecast['baseline_prediction'] = forecast['baseline_prediction'].clip(lower=0)
+    return forecast
+
+
+class TestBatchForecasts(unittest.TestCase):
+    def test_matches_single_indicator_forecasts(self):
+        df = make_observations()
+        batch = run_baseline_forecasts(df, start_year=2025, end_year=2030)
+
+        for code in df['indicator_code'].dropna().unique():
+            single = run_baseline_forecast(df, code, start_year=2025, end_year=2030)
+            got = batch[batch['indicator_code'] == code].reset_index(drop=True)
+            if single.empty:
+                self.assertTrue(got.empty, code)
+                continue
+            np.testing.assert_array_equal(got['data_year'], single['data_year'])
+            for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
+                np.testing.assert_allclose(got[col], single[col], rtol=1e-9, atol=1e-8, err_msg=code)
+
+    def test_indicator_subset_and_empty(self):
+        df = make_observations()
+        codes = sorted(set(run_baseline_forecasts(df)['indicator_code']))[:3]
+        subset = run_baseline_forecasts(df, indicator_codes=codes)
+        self.assertEqual(sorted(subset['indicator_code'].unique()), codes)
+        self.assertEqual(len(subset), 3 * len(codes))
+
+        empty = run_baseline_forecasts(df, indicator_codes=['MISSING'])
+        self.assertTrue(empty.empty)
+        self.assertIn('baseline_prediction', empty.columns)
+
+
+def slow_fit(x_hist, y_hist, forecast_years):
+    """Linear fit that stalls on one indicator, for the timeout test."""
+    if len(x_hist) == 7:
+        time.sleep(3)
+    return fit_linear_trend(x_hist, y_hist, forecast_years)
+
+
+def failing_fit(x_hist, y_hist, forecast_years):
+    raise RuntimeError("no fit")
+
+
+class TestForecastAll(unittest.TestCase):
+    def setUp(self):
+        self.df = make_observations()
+        self.expected = run_baseline_forecasts(self.df, start_year=2025, end_year=2030)
+
+    def test_linear_matches_baseline(self):
+        result = forecast_all(self.df, start_year=2025, end_year=2030)
+        self.assertEqual(list(result['indicator_code'].unique()), sorted(self.expected['indicator_code'].unique()))
+        for col in ['baseline_prediction', 'ci_lower', 'ci_upper']:
+            np.testing.assert_allclose(result[col], self.expected[col], rtol=1e-9, atol=1e-8)
+        self.assertEqual(result.attrs['failed'], {})
+
+    def test_process_pool_keeps_order(self):
+        codes = sorted(self.expected['indicator_code'].unique(), reverse=True)
+        serial = forecast_all(self.df, indicator_codes=codes)
+        parallel = forecast_all(self.df, indicator_codes=codes, n_jobs=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+        self.assertEqual(list(parallel['indicator_code'].unique()), codes)
+
+    def test_timeout_and_errors_are_reported(self):
+        lengths = self.df[self.df['gender'] == 'all'].groupby('indicator_code').size()
+        stalled = set(lengths[lengths == 7].index)
+        self.assertTrue(stalled)
+        result = forecast_all(self.df, model=slow_fit, n_jobs=2, timeout=1)
+        self.assertEqual(result.attrs['failed'], {code: 'timeout' for code in stalled})
+        self.assertFalse(stalled & set(result['indicator_code']))
+
+        failed = forecast_all(self.df, model=failing_fit)
+        self.assertTrue(failed.empty)
+        self.assertEqual(len(failed.attrs['failed']), lengths[lengths >= 2].size)
+        with self.assertRaises(ValueError):
+            forecast_all(self.df, model='arima')
+
+    @unittest.skipUnless(importlib.util.find_spec('statsmodels'), "statsmodels not installed")
+    def test_holt_model(self):
+        result = forecast_all(self.df, model='holt', n_jobs=2)
+        self.assertEqual(set(result['indicator_code']), set(self.expected['indicator_code']))
+        self.assertTrue((result['baseline_prediction'] >= 0).all())
+
+
+class TestApplyEventImpacts(unittest.TestCase):
+    def setUp(self):
+        self.baseline = pd.DataFrame({
+            'data_year': np.arange(2025, 2031),
+            'baseline_prediction': np.linspace(4.0, 9.0, 6),
+            'ci_lower': np.linspace(2.0, 7.0, 6),
+            'ci_upper': np.linspace(6.0, 11.0, 6),
+        })
+
+    def test_matches_legacy_loop(self):
+        for seed in range(5):
+            impacts = make_impacts(seed=seed)
+            for code in ['ACC_OWNERSHIP', 'USG_P2P_COUNT', 'USG_DIGITAL_RATE', None]:
+                for scenario in ['pessimistic', 'base', 'optimistic', 'unknown']:
+                    got = apply_event_impacts(self.baseline, impacts, scenario=scenario, indicator_code=code)
+                    expected = apply_event_impacts_legacy(self.baseline, impacts, scenario=scenario, indicator_code=code)
+                    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-12, atol=1e-12)
+
+    def test_no_impacts_only_clips(self):
+        baseline = self.baseline.assign(baseline_prediction=lambda f: f['baseline_prediction'] - 6)
+        got = apply_event_impacts(baseline, pd.DataFrame(), indicator_code='ACC_OWNERSHIP')
+        self.assertTrue((got['baseline_prediction'] >= 0).all())
+        np.testing.assert_array_equal(got['ci_lower'], baseline['ci_lower'])
+
+
+class TestEvaluateScenarios(unittest.TestCase):
+    def setUp(self):
+        self.baseline = pd.DataFrame({
+            'data_year': np.arange(2025, 2031),
+            'baseline_prediction': np.linspace(4.0, 9.0, 6),
+        })
+        self.impacts = make_impacts(seed=3)
+
+    def test_named_scenarios_match_single_calls(self):
+        scenarios = ['pessimistic', 'base', 'optimistic']
+        for code in ['ACC_OWNERSHIP', 'USG_P2P_COUNT']:
+            grid = evaluate_scenarios(self.baseline, self.impacts, scenarios=scenarios, indicator_code=code)
+            self.assertEqual(grid.shape, (3, 6))
+            for i, scn in enumerate(scenarios):
+                single = apply_event_impacts(self.baseline, self.impacts, scenario=scn, indicator_code=code)
+                np.testing.assert_allclose(grid[i], single['baseline_prediction'], rtol=1e-12)
+
+    def test_modifier_grid(self):
+        modifiers = np.round(np.arange(0.0, 2.01, 0.1), 1)
+        grid = evaluate_scenarios(self.baseline, self.impacts, modifiers=modifiers, indicator_code='USG_P2P_COUNT')
+        self.assertEqual(grid.shape, (len(modifiers), 6))
+        # A zero modifier leaves the baseline untouched
+        np.testing.assert_allclose(grid[0], self.baseline['baseline_prediction'])
+        np.testing.assert_allclose(
+            grid[10], apply_event_impacts(self.baseline, self.impacts, 'base', 'USG_P2P_COUNT')['baseline_prediction'])
+
+        both = evaluate_scenarios(self.baseline, self.impacts, scenarios=['base'], modifiers=[0.0])
+        self.assertEqual(both.shape, (2, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
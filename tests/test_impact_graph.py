@@ -0,0 +1,121 @@
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from impact_graph import ImpactGraph
+from indicator_store import IndicatorStore
+from forecaster import evaluate_scenarios, run_baseline_forecast
+from synthetic import generate_unified_dataset
+from test_indicator_store import make_unified
+
+
+class TestImpactGraph(unittest.TestCase):
+    def setUp(self):
+        self.df, self.df_impact = make_unified()
+        self.graph = ImpactGraph.from_data(self.df, self.df_impact)
+
+    def test_adjacency(self):
+        self.assertEqual(len(self.graph), 3)
+        self.assertEqual(self.graph.events_affecting('ACC_OWNERSHIP'), ['EVT_1', 'EVT_2'])
+        self.assertEqual(self.graph.indicators_touched('EVT_1'), ['ACC_OWNERSHIP', 'USG_P2P_COUNT'])
+        self.assertEqual(self.graph.events_affecting('MISSING'), [])
+        schedule = self.graph.schedule('ACC_OWNERSHIP')
+        # EVT_1 (2021) + 12 months, EVT_2 (2024) with no lag
+        np.testing.assert_array_equal(schedule.realized_year, [2022.0, 2024.0])
+        np.testing.assert_array_equal(schedule.magnitude, [0, 1])
+
+    def test_schedule_matches_joined_model(self):
+        df, df_impact = generate_unified_dataset(n_indicators=60, n_events=40, links_per_event=6, seed=3)
+        store = IndicatorStore(df, df_impact)
+        for code in store.impact_model['related_indicator'].dropna().unique():
+            baseline = run_baseline_forecast(store, code, 2025, 2035)
+            if baseline.empty:
+                continue
+            from_graph = evaluate_scenarios(baseline, store.schedule(code), indicator_code=code)
+            joined = store.impact_model[store.impact_model['related_indicator'] == code]
+            from_frame = evaluate_scenarios(baseline, joined, indicator_code=code)
+            np.testing.assert_allclose(from_graph, from_frame, rtol=1e-12, err_msg=code)
+        # the store answers its lookups from the graph
+        some_event = store.events['record_id'].iloc[0]
+        pd.testing.assert_frame_equal(
+            store.impacts_from(some_event).sort_index(),
+            store.impact_model[store.impact_model['parent_id'] == some_event])
+
+    def test_upsert_new_and_changed_link(self):
+        version = self.graph.version
+        before = self.graph.schedule('ACC_OWNERSHIP')
+        self.graph.upsert_link({'record_id': 'IMP_4', 'parent_id': 'EVT_2', 'related_indicator': 'ACC_OWNERSHIP',
+                                'impact_direction': 'decrease', 'impact_magnitude': 'Low', 'lag_months': 0})
+        after = self.graph.schedule('ACC_OWNERSHIP')
+        self.assertIsNot(before, after)
+        self.assertEqual(len(after.realized_year), 3)
+        np.testing.assert_array_equal(after.direction, [1.0, 1.0, -1.0])
+        self.assertEqual(self.graph.indicators_touched('EVT_2'), ['ACC_OWNERSHIP'])
+        # moving an existing link to another indicator detaches it from the old one
+        self.graph.upsert_link({'record_id': 'IMP_1', 'parent_id': 'EVT_1', 'related_indicator': 'ACC_4G_COV',
+                                'impact_direction': 'increase', 'impact_magnitude': 'high', 'lag_months': 24})
+        self.assertEqual(self.graph.events_affecting('ACC_OWNERSHIP'), ['EVT_2'])
+        np.testing.assert_array_equal(self.graph.schedule('ACC_4G_COV').realized_year, [2023.0])
+        self.assertEqual(len(self.graph), 4)
+        self.assertEqual(self.graph.version, version + 2)
+
+    def test_upsert_matches_rebuild(self):
+        graph = ImpactGraph.from_data(self.df, self.df_impact.iloc[:0])
+        for link in self.df_impact.to_dict('records'):
+            graph.upsert_link(link)
+        for code in ['ACC_OWNERSHIP', 'USG_P2P_COUNT']:
+            for a, b in zip(graph.schedule(code), self.graph.schedule(code)):
+                np.testing.assert_array_equal(a, b)
+
+    def test_set_event_year(self):
+        self.graph.set_event_year('EVT_1', 2023)
+        np.testing.assert_array_equal(self.graph.schedule('ACC_OWNERSHIP').realized_year, [2024.0, 2024.0])
+        self.assertEqual(self.graph.link(self.graph.edges_from('EVT_1')[0])['lag_months'], 12.0)
+
+    def test_store_upsert_keeps_impact_model_aligned(self):
+        store = IndicatorStore(self.df, self.df_impact)
+        store.upsert_link({'record_id': 'IMP_4', 'parent_id': 'EVT_2', 'related_indicator': 'ACC_OWNERSHIP',
+                           'impact_direction': 'decrease', 'impact_magnitude': 'Low', 'lag_months': 0})
+        impacts = store.impacts_for('ACC_OWNERSHIP')
+        self.assertEqual(impacts['record_id_x'].tolist()[-1], 'IMP_4')
+        self.assertEqual(impacts['realized_year'].tolist(), [2022.0, 2024.0, 2024.0])
+        # a changed link replaces its row rather than leaving the old one behind
+        store.upsert_link({'record_id': 'IMP_1', 'parent_id': 'EVT_1', 'related_indicator': 'ACC_4G_COV',
+                           'impact_direction': 'increase', 'impact_magnitude': 'high', 'lag_months': 24})
+        self.assertEqual(len(store.impact_model), 4)
+        self.assertEqual(store.impacts_for('ACC_OWNERSHIP')['record_id_x'].tolist(), ['IMP_3', 'IMP_4'])
+        moved = store.impacts_for('ACC_4G_COV')
+        self.assertEqual(moved[['record_id_x', 'event_year', 'realized_year']].values.tolist(), [['IMP_1', 2021.0, 2023.0]])
+        store.set_event_year('EVT_1', 2022)
+        self.assertEqual(store.impacts_for('ACC_4G_COV')['realized_year'].tolist(), [2024.0])
+        self.assertEqual(store.impacts_from('EVT_1')['event_year'].tolist(), [2022.0, 2022.0])
+
+    def test_store_edits_keep_dtypes_and_change_fingerprint(self):
+        df_impact = self.df_impact.astype({'related_indicator': 'category', 'impact_magnitude': 'category'})
+        store = IndicatorStore(self.df, df_impact)
+        dtypes = store.impact_model.dtypes.astype(str)
+        fingerprint = store.fingerprint
+        for n in range(4, 14):
+            store.upsert_link({'record_id': f"IMP_{n}", 'parent_id': 'EVT_2', 'related_indicator': f"USG_NEW_{n}",
+                               'impact_direction': 'increase', 'impact_magnitude': 'low', 'lag_months': 6})
+        self.assertEqual(len(store.impact_model), 13)
+        pd.testing.assert_series_equal(store.impact_model.dtypes.astype(str), dtypes)
+        self.assertEqual(store.impacts_for('USG_NEW_13')['realized_year'].tolist(), [2024.5])
+        self.assertNotEqual(store.fingerprint, fingerprint)
+
+        fingerprint = store.fingerprint
+        store.set_event_year('EVT_1', 2022)
+        self.assertNotEqual(store.fingerprint, fingerprint)
+        # the event row itself moves too, not just its links
+        self.assertEqual(store.event('EVT_1')['data_year'], 2022.0)
+        self.assertEqual(store.event('EVT_1')['start_date'], pd.Timestamp('2022-05-11'))
+        self.assertEqual(store.df.loc[store.df['record_id'] == 'EVT_1', 'data_year'].tolist(), [2022.0])
+        self.assertEqual(store.impacts_from('EVT_1')['event_date'].tolist(), [pd.Timestamp('2022-05-11')] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
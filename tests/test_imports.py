@@ -0,0 +1,25 @@
+import sys
+import os
+import json
+import subprocess
+import unittest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_library_modules_skip_heavy_imports(self):
+        """Importing the library must not pull in the dashboard/Excel/process-pool stack."""
+        code = (
+            f"import sys, json; sys.path.insert(0, {SRC!r}); "
+            "import data_loader, forecaster, simulation, forecast_cache, analyze_data; "
+            "print(json.dumps(sorted(sys.modules)))"
+        )
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        loaded = set(json.loads(out.strip().splitlines()[-1]))
+        for heavy in ['streamlit', 'openpyxl', 'plotly', 'concurrent.futures.process']:
+            self.assertNotIn(heavy, loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
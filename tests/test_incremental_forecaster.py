@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from incremental_forecaster import IncrementalForecaster
+from forecaster import run_baseline_forecast
+from indicator_store import IndicatorStore
+from test_forecaster import make_observations
+
+
+class TestIncrementalForecaster(unittest.TestCase):
+    def setUp(self):
+        self.df = make_observations()
+        self.model = IncrementalForecaster(self.df)
+
+    def assert_matches_refit(self, df, codes):
+        for code in codes:
+            expected = run_baseline_forecast(df, code, 2025, 2030)
+            got = self.model.forecast(code, 2025, 2030)
+            if expected.empty:
+                self.assertTrue(got.empty, code)
+                continue
+            pd.testing.assert_frame_equal(got, expected, check_dtype=False, rtol=1e-8, atol=1e-6)
+
+    def test_matches_full_refit(self):
+        self.assert_matches_refit(self.df, self.df['indicator_code'].dropna().unique())
+        from_store = IncrementalForecaster(IndicatorStore(self.df))
+        self.assertEqual(from_store.indicator_codes(), self.model.indicator_codes())
+
+    def test_appended_observations_update_in_place(self):
+        codes = sorted(self.df['indicator_code'].dropna().unique())
+        for code in codes:
+            self.model.forecast(code, 2025, 2030)
+        untouched = self.model.forecast(codes[1], 2025, 2030)
+
+        new_rows = pd.DataFrame({
+            'record_id': ['NEW_1', 'NEW_2', 'NEW_3'],
+            'record_type': 'observation',
+            'indicator_code': [codes[0], codes[0], 'USG_NEW_COUNT'],
+            'gender': ['all', 'all', 'all'],
+            'data_year': [2025.0, 2026.0, 2025.0],
+            'value_numeric': [80.0, 95.0, 1.5e7],
+        })
+        changed = self.model.add_observations(new_rows)
+        self.assertEqual(changed, {codes[0], 'USG_NEW_COUNT'})
+        # only the updated indicator lost its memo
+        self.assertNotIn(codes[0], self.model.cached_indicators())
+        self.assertIs(self.model.forecast(codes[1], 2025, 2030), untouched)
+
+        self.assertTrue(self.model.add_observation('USG_NEW_COUNT', 2026, 2.4e7))
+        self.assertFalse(self.model.add_observation(codes[2], 2026, 10.0, gender='female'))
+        combined = pd.concat([self.df, new_rows, new_rows.iloc[[2]].assign(
+            record_id='NEW_4', data_year=2026.0, value_numeric=2.4e7)], ignore_index=True)
+        self.assert_matches_refit(combined, codes + ['USG_NEW_COUNT'])
+
+    def test_large_counts_stay_accurate(self):
+        years = np.arange(2011, 2025, dtype=float)
+        values = 3e8 + 2.5e7 * (years - 2011) + np.random.default_rng(0).normal(0, 1e5, len(years))
+        model = IncrementalForecaster()
+        for year, value in zip(years, values):
+            model.add_observation('USG_P2P_COUNT', year, value)
+        df = pd.DataFrame({'record_type': 'observation', 'indicator_code': 'USG_P2P_COUNT',
+                           'gender': 'all', 'data_year': years, 'value_numeric': values})
+        expected = run_baseline_forecast(df, 'USG_P2P_COUNT')
+        np.testing.assert_allclose(model.forecast('USG_P2P_COUNT')['ci_upper'], expected['ci_upper'], rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from indicator_store import IndicatorStore, build_impact_model
+from forecaster import run_baseline_forecast, run_baseline_forecasts
+
+
+def make_unified():
+    df = pd.DataFrame({
+        'record_id': ['REC_1', 'REC_2', 'REC_3', 'REC_4', 'REC_5', 'REC_6', 'EVT_1', 'EVT_2', 'TGT_1'],
+        'record_type': ['observation'] * 6 + ['event', 'event', 'target'],
+        'indicator': ['Account Ownership'] * 4 + ['4G Coverage', '4G Coverage',
+                                                  'Telebirr Launch', 'Fayda Rollout', 'NFIS-II Target'],
+        'indicator_code': ['ACC_OWNERSHIP'] * 4 + ['ACC_4G_COV', 'ACC_4G_COV', None, None, 'ACC_OWNERSHIP'],
+        'gender': ['all', 'female', 'all', 'all', None, None, None, None, 'all'],
+        'data_year': [2024.0, 2021.0, 2014.0, 2021.0, 2023.0, 2022.0, 2021.0, 2024.0, 2030.0],
+        'value_numeric': [49.0, 36.0, 22.0, 46.0, 70.0, 60.0, None, None, 70.0],
+        'start_date': pd.to_datetime([None] * 6 + ['2021-05-11', '2024-01-01', None]),
+    })
+    df_impact = pd.DataFrame({
+        'record_id': ['IMP_1', 'IMP_2', 'IMP_3'],
+        'parent_id': ['EVT_1', 'EVT_1', 'EVT_2'],
+        'related_indicator': ['ACC_OWNERSHIP', 'USG_P2P_COUNT', 'ACC_OWNERSHIP'],
+        'impact_direction': ['increase', 'increase', 'increase'],
+        'impact_magnitude': ['high', 'high', 'medium'],
+        'lag_months': [12, 6, None],
+    })
+    return df, df_impact
+
+
+class TestIndicatorStore(unittest.TestCase):
+    def setUp(self):
+        self.df, self.df_impact = make_unified()
+        self.store = IndicatorStore(self.df, self.df_impact)
+
+    def test_series_sorted_by_year(self):
+        years, values = self.store.series('ACC_OWNERSHIP')
+        np.testing.assert_array_equal(years, [2014, 2021, 2024])
+        np.testing.assert_array_equal(values, [22, 46, 49])
+        # targets are not observations
+        self.assertEqual(self.store.latest('ACC_OWNERSHIP'), 49.0)
+        self.assertEqual(self.store.latest('ACC_OWNERSHIP', gender='female'), 36.0)
+
+    def test_any_gender_and_missing(self):
+        years, values = self.store.series('ACC_4G_COV', gender=None)
+        np.testing.assert_array_equal(years, [2022, 2023])
+        self.assertEqual(self.store.latest('ACC_4G_COV', gender=None), 70.0)
+        self.assertTrue(np.isnan(self.store.latest('MISSING')))
+        self.assertEqual(len(self.store.series('MISSING')[0]), 0)
+        self.assertTrue(self.store.observations('MISSING').empty)
+
+    def test_latest_is_by_year_not_file_order(self):
+        # The dashboard headline numbers come from store.latest. In file order the
+        # last ACC_OWNERSHIP row is a 2021 female point, and the last 4G row is 2022;
+        # a sub-national row is not part of the national series.
+        df = pd.DataFrame({
+            'record_id': [f"REC_{i}" for i in range(6)],
+            'record_type': ['observation'] * 6,
+            'indicator_code': ['ACC_OWNERSHIP'] * 4 + ['ACC_4G_COV'] * 2,
+            'gender': ['all', 'all', 'all', 'female', None, None],
+            'region': ['national', 'national', 'oromia', 'national', None, None],
+            'data_year': [2024.0, 2021.0, 2025.0, 2021.0, 2023.0, 2022.0],
+            'value_numeric': [49.0, 46.0, 30.0, 36.0, 70.0, 60.0],
+        })
+        store = IndicatorStore(df)
+        self.assertEqual(store.latest('ACC_OWNERSHIP'), 49.0)
+        self.assertEqual(store.latest('ACC_4G_COV', gender=None), 70.0)
+
+    def test_observation_rows(self):
+        rows = self.store.observations('ACC_OWNERSHIP')
+        self.assertEqual(list(rows['record_id']), ['REC_3', 'REC_4', 'REC_1'])
+        self.assertEqual(self.store.genders('ACC_OWNERSHIP'), ['all', 'female'])
+        self.assertEqual(self.store.indicator_codes(), ['ACC_4G_COV', 'ACC_OWNERSHIP'])
+
+    def test_events_and_impacts(self):
+        self.assertEqual(self.store.count('event'), 2)
+        self.assertEqual(self.store.event('EVT_2')['indicator'], 'Fayda Rollout')
+        self.assertIsNone(self.store.event('EVT_X'))
+
+        acc = self.store.impacts_for('ACC_OWNERSHIP')
+        expected = build_impact_model(self.df, self.df_impact)
+        expected = expected[expected['related_indicator'] == 'ACC_OWNERSHIP']
+        pd.testing.assert_frame_equal(acc, expected)
+        self.assertEqual(list(acc['realized_year']), [2022.0, 2024.0])
+        self.assertEqual(list(self.store.impacts_from('EVT_1')['record_id_x']), ['IMP_1', 'IMP_2'])
+        self.assertTrue(self.store.impacts_for('MISSING').empty)
+
+    def test_forecasters_accept_store(self):
+        pd.testing.assert_frame_equal(run_baseline_forecast(self.store, 'ACC_OWNERSHIP'),
+                                      run_baseline_forecast(self.df, 'ACC_OWNERSHIP'))
+        pd.testing.assert_frame_equal(run_baseline_forecasts(self.store),
+                                      run_baseline_forecasts(self.df), check_dtype=False)
+
+    def test_without_impact_sheet(self):
+        store = IndicatorStore(self.df, pd.DataFrame())
+        self.assertTrue(store.impacts_for('ACC_OWNERSHIP').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import data_loader
+import ingest
+from data_cache import read_cache
+from enrichment_store import append_enrichment
+from test_data_cache import write_sample_workbook, _normalize
+
+
+class TestStreamingIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.enrichment_path = os.path.join(self.tmpdir, 'enrichment.jsonl')
+        open(self.enrichment_path, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_streamed_workbook_matches_full_read(self):
+        data_path = os.path.join(self.tmpdir, 'unified.xlsx')
+        write_sample_workbook(data_path)
+        df, df_impact = data_loader._load_data_logic(data_path, self.enrichment_path, use_cache=False)
+        # Two-row chunks so the data sheet spans several writes
+        with mock.patch.object(ingest, 'DEFAULT_CHUNKSIZE', 2), \
+                mock.patch.object(data_loader.pd, 'ExcelFile', side_effect=AssertionError("full sheet read")):
+            streamed, streamed_impact = data_loader._load_data_logic(
+                data_path, self.enrichment_path, use_cache=False, streaming=True)
+
+        pd.testing.assert_frame_equal(_normalize(df), _normalize(streamed), check_dtype=False)
+        self.assertEqual(list(df_impact.columns), list(streamed_impact.columns))
+        self.assertEqual(streamed_impact.loc[0, 'parent_id'], 'EVT_0001')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(streamed['observation_date']))
+        self.assertEqual(streamed.loc[0, 'data_year'], 2021)
+
+    def test_streamed_load_writes_typed_enriched_cache(self):
+        data_path = os.path.join(self.tmpdir, 'unified.xlsx')
+        write_sample_workbook(data_path)
+        append_enrichment([{'record_id': 'REC_0002', 'record_type': 'observation', 'indicator_code': 'ACC_OWNERSHIP',
+                            'gender': 'all', 'value_numeric': 49.0, 'observation_date': '2024-12-31'},
+                           {'record_id': 'REC_0100', 'record_type': 'observation', 'indicator_code': 'ACC_OWNERSHIP',
+                            'gender': 'female', 'value_numeric': 41.0, 'data_year': 2024}], self.enrichment_path)
+        full, full_impact = data_loader._load_data_logic(data_path, self.enrichment_path, use_cache=False)
+        # chunks are typed, merged and written to the cache as they stream: the
+        # full-frame passes and the one-shot cache write are never used
+        with mock.patch.object(ingest, 'DEFAULT_CHUNKSIZE', 2), \
+                mock.patch.object(data_loader, 'parse_dates', side_effect=AssertionError("full-frame parse")), \
+                mock.patch.object(data_loader, 'merge_enrichment', side_effect=AssertionError("full-frame merge")), \
+                mock.patch.object(data_loader, 'write_cache', side_effect=AssertionError("one-shot write")):
+            df, df_impact = data_loader._load_data_logic(data_path, self.enrichment_path, streaming=True)
+
+        pd.testing.assert_frame_equal(_normalize(full), _normalize(df), check_dtype=False)
+        self.assertEqual(df['record_id'].tolist(), ['REC_0001', 'EVT_0001', 'REC_0002', 'REC_0100'])
+        self.assertEqual(df.loc[2, 'value_numeric'], 49.0)
+        for col in ['record_type', 'indicator_code', 'gender']:
+            self.assertIsInstance(df[col].dtype, pd.CategoricalDtype, col)
+        self.assertEqual(str(df['data_year'].dtype), 'Int64')
+        self.assertIsInstance(df_impact['impact_direction'].dtype, pd.CategoricalDtype)
+        cached, cached_impact, _ = read_cache(data_path)
+        pd.testing.assert_frame_equal(cached, df)
+        pd.testing.assert_frame_equal(cached_impact, df_impact)
+
+    def test_csv_export_streams_and_splits_impact_links(self):
+        data_path = os.path.join(self.tmpdir, 'unified.csv')
+        pd.DataFrame({
+            'record_id': ['REC_0001', 'EVT_0001', 'IMP_0001', 'REC_0002'],
+            'parent_id': [None, None, 'EVT_0001', None],
+            'record_type': ['observation', 'event', 'impact_link', 'observation'],
+            'indicator_code': ['ACC_OWNERSHIP', None, None, 'ACC_OWNERSHIP'],
+            'related_indicator': [None, None, 'ACC_OWNERSHIP', None],
+            'gender': ['all', None, None, 'all'],
+            # a typo in a later chunk is coerced to NaN rather than changing the column type
+            'value_numeric': [35.0, None, None, 'n/a'],
+            'observation_date': ['2021-12-31', None, None, '2024-12-31'],
+            'data_year': [None, 2021, None, None],
+        }).to_csv(data_path, index=False)
+
+        with mock.patch.object(ingest, 'DEFAULT_CHUNKSIZE', 2):
+            df, df_impact = data_loader._load_data_logic(data_path, self.enrichment_path)
+
+        self.assertEqual(len(df), 4)
+        self.assertEqual(list(df_impact['record_id']), ['IMP_0001'])
+        self.assertTrue(pd.isna(df.loc[3, 'value_numeric']))
+        self.assertEqual(df['data_year'].tolist(), [2021, 2021, pd.NA, 2024])
+        # the columnar cache is written as for workbooks
+        cached, _ = data_loader._load_data_logic(data_path, self.enrichment_path)
+        pd.testing.assert_frame_equal(_normalize(df), _normalize(cached))
+
+    def test_column_widened_when_a_later_chunk_has_text(self):
+        data_path = os.path.join(self.tmpdir, 'unified.csv')
+        pd.DataFrame({
+            'record_id': ['REC_0001', 'REC_0002', 'REC_0003', 'REC_0004', 'REC_0005'],
+            'record_type': ['observation'] * 5,
+            'indicator_code': ['ACC_OWNERSHIP'] * 5,
+            # numeric in the first two-row chunk, text afterwards
+            'source_name': [1, 2, 'Findex', None, 'GSMA'],
+            'value_numeric': [35.0, 46.0, 49.0, 50.0, 51.0],
+        }).to_csv(data_path, index=False)
+        unified_dest = os.path.join(self.tmpdir, 'unified.parquet')
+        impact_dest = os.path.join(self.tmpdir, 'impact.parquet')
+        ingest.ingest_file(data_path, unified_dest, impact_dest, chunksize=2)
+
+        df = pd.read_parquet(unified_dest)
+        self.assertEqual(df['source_name'].fillna('').tolist(), ['1', '2', 'Findex', '', 'GSMA'])
+        self.assertEqual(df['value_numeric'].tolist(), [35.0, 46.0, 49.0, 50.0, 51.0])
+        # only the finished files are left behind
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['enrichment.jsonl', 'impact.parquet', 'unified.csv', 'unified.parquet'])
+
+    def test_sheet_probe_reads_headers_only(self):
+        data_path = os.path.join(self.tmpdir, 'unified.xlsx')
+        write_sample_workbook(data_path)
+        chunks = list(ingest.iter_xlsx_chunks(data_path, chunksize=2))
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(chunks[0].columns[0], 'record_id')
+        self.assertEqual(list(ingest.iter_xlsx_chunks(data_path, sheet='Missing')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import instrumentation
+import data_loader
+from forecaster import run_baseline_forecast
+from test_data_cache import write_sample_workbook
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = instrumentation.is_enabled()
+        instrumentation.disable()
+        instrumentation.clear()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.clear()
+        if self.was_enabled:
+            instrumentation.enable()
+
+    def test_disabled_records_nothing(self):
+        with instrumentation.stage('noop') as timer:
+            timer.rows = 5
+        self.assertIs(instrumentation.stage('other'), instrumentation.stage('noop'))
+        self.assertEqual(instrumentation.records(), [])
+        self.assertTrue(instrumentation.summary().empty)
+
+    def test_stage_and_decorator(self):
+        instrumentation.enable()
+
+        @instrumentation.timed('test.build')
+        def build(n):
+            return list(range(n))
+
+        with instrumentation.stage('test.block', page='overview') as timer:
+            build(3)
+            timer.rows = 7
+        records = instrumentation.records()
+        self.assertEqual([r['stage'] for r in records], ['test.build', 'test.block'])
+        self.assertEqual(records[0]['rows'], 3)
+        self.assertEqual(records[1]['rows'], 7)
+        self.assertEqual(records[1]['page'], 'overview')
+        self.assertNotIn('peak_kb', records[1])
+
+    def test_memory_peaks_nest(self):
+        instrumentation.enable(memory=True)
+        with instrumentation.stage('outer'):
+            with instrumentation.stage('inner'):
+                block = bytearray(4 * 1024 * 1024)
+                del block
+        inner, outer = instrumentation.records()
+        self.assertGreaterEqual(inner['peak_kb'], 4096)
+        self.assertGreaterEqual(outer['peak_kb'], inner['peak_kb'])
+
+    def test_recording_is_per_thread(self):
+        other = []
+
+        def elsewhere():
+            other.append(instrumentation.stage('other.thread'))
+
+        with instrumentation.recording(memory=True) as run:
+            with instrumentation.stage('session.block'):
+                block = bytearray(1024 * 1024)
+                del block
+            worker = threading.Thread(target=elsewhere)
+            worker.start()
+            worker.join()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertFalse(instrumentation.is_enabled())
+        # other threads and the process-wide buffer are untouched
+        self.assertIs(other[0], instrumentation.stage('noop'))
+        self.assertEqual(instrumentation.records(), [])
+        self.assertEqual([r['stage'] for r in run.records], ['session.block'])
+        self.assertGreaterEqual(run.records[0]['peak_kb'], 1024)
+        self.assertEqual(instrumentation.summary(run.records)['calls'].tolist(), [1])
+        self.assertIs(instrumentation.stage('after'), instrumentation.stage('noop'))
+
+    def test_loader_and_forecaster_stages(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        data_path = os.path.join(tmpdir, 'unified.xlsx')
+        write_sample_workbook(data_path)
+        enrichment_path = os.path.join(tmpdir, 'enrichment.jsonl')
+        open(enrichment_path, 'w').close()
+
+        instrumentation.enable()
+        df, _ = data_loader._load_data_logic(data_path, enrichment_path)
+        run_baseline_forecast(df, 'ACC_OWNERSHIP')
+        stages = {r['stage']: r for r in instrumentation.records()}
+        for name in ['load.cache_read', 'load.sheet_probe', 'load.read_sheet', 'load.read_impact',
+                     'load.parse_dates', 'load.enrich', 'load.schema', 'load.cache_write',
+                     'forecaster.run_baseline_forecast']:
+            self.assertIn(name, stages)
+        self.assertEqual(stages['load.read_sheet']['rows'], 3)
+        self.assertEqual(stages['load.read_impact']['rows'], 1)
+
+        dump = json.loads(instrumentation.to_json())
+        self.assertEqual(len(dump['records']), len(instrumentation.records()))
+        self.assertIn('load.read_sheet', {row['stage'] for row in dump['summary']})
+
+
+if __name__ == '__main__':
+    unittest.main()
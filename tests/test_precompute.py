@@ -0,0 +1,103 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import analyze_data
+from forecast_cache import ForecastCache
+from forecaster import SCENARIO_MODIFIERS
+from indicator_store import IndicatorStore
+from precompute import precompute_artifacts, read_table, read_manifest, PrecomputedForecasts
+from synthetic import generate_unified_dataset
+
+SIMULATION = {'n_paths': 500, 'seed': 7}
+
+
+class TestPrecompute(unittest.TestCase):
+    def setUp(self):
+        self.df, self.df_impact = generate_unified_dataset(n_indicators=30, n_events=20, seed=1)
+        self.store = IndicatorStore(self.df, self.df_impact)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_artifacts_match_live_forecasts(self):
+        manifest = precompute_artifacts(self.store, self.out, 2025, 2030, formats=('parquet', 'csv'),
+                                        simulation_params=SIMULATION)
+        self.assertEqual(manifest['fingerprint'], self.store.fingerprint)
+        self.assertTrue(os.path.exists(os.path.join(self.out, 'forecasts', 'scenario=base', 'part-0.csv')))
+
+        live = ForecastCache()
+        forecasts = read_table(self.out, 'forecasts')
+        self.assertEqual(len(forecasts), manifest['tables']['forecasts']['rows'])
+        for code in forecasts['indicator_code'].unique()[:10]:
+            sub = forecasts[forecasts['indicator_code'] == code]
+            baseline = sub[sub['scenario'] == 'baseline'].sort_values('data_year')
+            np.testing.assert_allclose(baseline['prediction'],
+                                       live.baseline(self.store, code, 2025, 2030)['baseline_prediction'])
+            grid = live.scenarios(self.store, code, 2025, 2030)
+            for pos, scenario in enumerate(SCENARIO_MODIFIERS):
+                preds = sub[sub['scenario'] == scenario].sort_values('data_year')['prediction']
+                np.testing.assert_allclose(preds, grid[pos], err_msg=f"{code} {scenario}")
+
+        targets = read_table(self.out, 'targets')
+        self.assertEqual(sorted(targets['scenario']), ['base', 'baseline', 'optimistic', 'pessimistic'])
+
+    def test_serves_precomputed_and_falls_back(self):
+        precompute_artifacts(self.store, self.out, 2025, 2030, simulation_params=SIMULATION)
+        fallback = ForecastCache()
+        served = PrecomputedForecasts(self.out, fallback=fallback)
+        self.assertTrue(served.is_current(self.store))
+
+        pd.testing.assert_frame_equal(served.baseline(self.store, 'ACC_OWNERSHIP'),
+                                      fallback.baseline(self.store, 'ACC_OWNERSHIP'), check_dtype=False)
+        np.testing.assert_allclose(served.scenarios(self.store, 'ACC_OWNERSHIP', 2025, 2030, scenarios=['base']),
+                                   fallback.scenarios(self.store, 'ACC_OWNERSHIP', 2025, 2030, scenarios=['base']))
+        sim = served.simulation(self.store, 'ACC_OWNERSHIP', start_year=2025, end_year=2030, target=60.0, **SIMULATION)
+        self.assertEqual(len(sim), 6)
+        self.assertEqual(served.stats()['hits'], 3)
+        self.assertEqual(fallback.stats()['misses'], 3)
+
+        # outside the precomputed range or with fan modifiers: computed live
+        served.baseline(self.store, 'ACC_OWNERSHIP', 2025, 2035)
+        served.scenarios(self.store, 'ACC_OWNERSHIP', modifiers=[0.5, 1.5])
+        served.simulation(self.store, 'ACC_OWNERSHIP', start_year=2025, end_year=2030, target=60.0, n_paths=100)
+        self.assertEqual(served.stats()['misses'], 3)
+
+    def test_missing_indicator_uses_fallback_for_other_data(self):
+        precompute_artifacts(self.store, self.out, 2025, 2030, simulation_params=SIMULATION)
+        fallback = ForecastCache()
+        served = PrecomputedForecasts(self.out, fallback=fallback)
+        # not in the artifacts but also not in the data they were built from
+        self.assertTrue(served.baseline(self.store, 'ACC_NEW').empty)
+        self.assertEqual(served.stats()['hits'], 1)
+
+        rows = self.df[self.df['indicator_code'] == 'ACC_OWNERSHIP'].copy()
+        rows['indicator_code'] = 'ACC_NEW'
+        grown = IndicatorStore(pd.concat([self.df, rows], ignore_index=True), self.df_impact)
+        self.assertFalse(served.is_current(grown))
+        result = served.baseline(grown, 'ACC_NEW')
+        self.assertFalse(result.empty)
+        pd.testing.assert_frame_equal(result, fallback.baseline(grown, 'ACC_NEW'))
+        self.assertEqual(served.stats()['misses'], 1)
+
+    def test_cli_writes_insights(self):
+        with mock.patch.object(analyze_data, 'load_store', return_value=self.store), \
+                mock.patch('precompute.SIMULATION_PARAMS', SIMULATION):
+            analyze_data.main(['--precompute', self.out, '--format', 'csv', '--end-year', '2028'])
+        manifest = read_manifest(self.out)
+        self.assertEqual(manifest['end_year'], 2028)
+        self.assertIn('access_trajectory', manifest['tables'])
+        gap = read_table(self.out, 'gender_gap')
+        self.assertIn('gap_pp', gap.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
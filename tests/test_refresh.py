@@ -0,0 +1,135 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import refresh
+from refresh import SnapshotRefresher, warm_forecasts
+from synthetic import generate_unified_dataset, write_workbook
+
+
+class TestSnapshotRefresher(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.data_path = os.path.join(self.tmpdir, 'unified.xlsx')
+        self.enrichment_path = os.path.join(self.tmpdir, 'enrichment.jsonl')
+        open(self.enrichment_path, 'w').close()
+        self.write(n_indicators=10)
+
+    def write(self, n_indicators):
+        df, df_impact = generate_unified_dataset(n_indicators=n_indicators, n_events=5, links_per_event=2, seed=2)
+        write_workbook(df, df_impact, self.data_path)
+        # make sure the change is visible even on coarse-grained file systems
+        stamp = time.time() + n_indicators
+        os.utime(self.data_path, (stamp, stamp))
+
+    def refresher(self, **kwargs):
+        refresher = SnapshotRefresher(self.data_path, self.enrichment_path, **kwargs)
+        self.addCleanup(refresher.stop)
+        return refresher
+
+    def test_current_builds_once_and_refresh_skips_unchanged(self):
+        refresher = self.refresher()
+        first = refresher.current()
+        self.assertEqual(first.version, 1)
+        self.assertIs(refresher.current(), first)
+        self.assertFalse(refresher.refresh())
+        # the warmed cache already holds the dashboard's first requests
+        self.assertGreater(first.forecasts.stats()['size'], 0)
+
+    def test_readers_keep_old_snapshot_during_rebuild(self):
+        building, release = threading.Event(), threading.Event()
+
+        def slow_warm(store, forecasts):
+            if refresher.version:
+                building.set()
+                release.wait(10)
+            warm_forecasts(store, forecasts)
+
+        refresher = self.refresher(warm=slow_warm)
+        old = refresher.current()
+        self.write(n_indicators=12)
+        worker = threading.Thread(target=refresher.refresh)
+        worker.start()
+        self.assertTrue(building.wait(10))
+
+        started = time.perf_counter()
+        self.assertIs(refresher.current(), old)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertTrue(refresher.status()['refreshing'])
+
+        release.set()
+        worker.join(10)
+        new = refresher.current()
+        self.assertEqual(new.version, 2)
+        self.assertEqual(len(new.store.indicator_codes()), 12)
+        # the old snapshot is untouched for readers still holding it
+        self.assertEqual(len(old.store.indicator_codes()), 10)
+
+    def test_watcher_swaps_in_changes(self):
+        refresher = self.refresher(interval=0.05)
+        refresher.current()
+        refresher.start()
+        self.write(n_indicators=11)
+        deadline = time.time() + 20
+        while refresher.version < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(refresher.version, 2)
+        self.assertEqual(len(refresher.current().store.indicator_codes()), 11)
+
+    def test_failed_rebuild_keeps_snapshot(self):
+        def failing_warm(store, forecasts):
+            if refresher.version:
+                raise ValueError("bad data")
+
+        refresher = self.refresher(warm=failing_warm)
+        old = refresher.current()
+        self.assertFalse(refresher.refresh(force=True))
+        self.assertIs(refresher.current(), old)
+        self.assertIn('bad data', refresher.status()['last_error'])
+
+    def test_added_observations_update_forecasts_without_reload(self):
+        refresher = self.refresher()
+        snapshot = refresher.current()
+        code = snapshot.store.indicator_codes()[0]
+        before = snapshot.forecasts.baseline(snapshot.store, code, 2025, 2027)
+        with mock.patch.object(refresh, '_load_data_logic', side_effect=AssertionError("reloaded")):
+            changed = refresher.add_observations(pd.DataFrame({
+                'record_type': ['observation'], 'indicator_code': [code], 'gender': ['all'],
+                'data_year': [2025.0], 'value_numeric': [before['baseline_prediction'].iloc[0] * 3 + 100]}))
+            after = refresher.current().forecasts.baseline(snapshot.store, code, 2025, 2027)
+        self.assertEqual(changed, {code})
+        self.assertIs(refresher.current(), snapshot)
+        self.assertGreater(after['baseline_prediction'].iloc[0], before['baseline_prediction'].iloc[0])
+
+    def test_broken_workbook_is_parsed_once(self):
+        refresher = self.refresher(warm=None)
+        old = refresher.current()
+        with open(self.data_path, 'wb') as fh:
+            fh.write(b'not a workbook')
+        stamp = time.time() + 100
+        os.utime(self.data_path, (stamp, stamp))
+
+        with mock.patch.object(refresh, '_load_data_logic', wraps=refresh._load_data_logic) as load:
+            for _ in range(3):
+                self.assertFalse(refresher.refresh())
+            self.assertEqual(load.call_count, 1)
+            self.assertIs(refresher.current(), old)
+            self.assertIsNotNone(refresher.status()['last_error'])
+            # a fixed file is picked up on the next poll
+            self.write(n_indicators=11)
+            self.assertTrue(refresher.refresh())
+            self.assertEqual(load.call_count, 2)
+        self.assertIsNone(refresher.status()['last_error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Add src to path
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(SRC)
+from shared_snapshot import write_snapshot, open_snapshot, current_snapshot
+from analyze_data import indicator_analytics
+from forecaster import run_baseline_forecasts, evaluate_scenarios, run_baseline_forecast
+from indicator_store import IndicatorStore
+from refresh import SnapshotRefresher
+from synthetic import generate_unified_dataset
+
+
+class TestSharedSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        df, df_impact = generate_unified_dataset(n_indicators=40, n_events=15, links_per_event=3, seed=5)
+        self.store = IndicatorStore(df, df_impact)
+        write_snapshot(self.store, self.tmpdir)
+
+    def test_round_trip_matches_store(self):
+        shared = open_snapshot(self.tmpdir)
+        self.assertEqual(shared.fingerprint, self.store.fingerprint)
+        self.assertEqual(shared.indicator_codes(), self.store.indicator_codes())
+        self.assertEqual(shared.count('event'), self.store.count('event'))
+        for code in self.store.indicator_codes()[:10]:
+            for gender in ['all', 'female', None]:
+                for a, b in zip(shared.series(code, gender), self.store.series(code, gender)):
+                    np.testing.assert_array_equal(a, b)
+            np.testing.assert_array_equal(shared.observations(code)['value_numeric'].to_numpy(dtype=float),
+                                          self.store.observations(code)['value_numeric'].to_numpy(dtype=float))
+            baseline = run_baseline_forecast(shared, code, 2025, 2030)
+            np.testing.assert_allclose(evaluate_scenarios(baseline, shared.schedule(code), indicator_code=code),
+                                       evaluate_scenarios(baseline, self.store.schedule(code), indicator_code=code))
+        pd.testing.assert_frame_equal(run_baseline_forecasts(shared), run_baseline_forecasts(self.store))
+        self.assertEqual(len(shared.impacts_for('ACC_OWNERSHIP')), len(self.store.impacts_for('ACC_OWNERSHIP')))
+        # the Arrow-backed frame goes through the analytics layer unchanged
+        np.testing.assert_allclose(indicator_analytics(shared.df)['growth_pp'].to_numpy(dtype=float),
+                                   indicator_analytics(self.store.df)['growth_pp'].to_numpy(dtype=float))
+
+    def test_opened_without_copying(self):
+        before = pa.total_allocated_bytes()
+        shared = open_snapshot(self.tmpdir)
+        for name in ['_years', '_values', '_rows']:
+            array = getattr(shared, name)
+            self.assertIsInstance(array, np.memmap)
+            self.assertFalse(array.flags.writeable)
+        self.assertIsInstance(shared.df['value_numeric'].dtype, pd.ArrowDtype)
+        size = os.path.getsize(os.path.join(current_snapshot(self.tmpdir), 'unified.arrow'))
+        # only the small impact tables are materialised
+        self.assertLess(pa.total_allocated_bytes() - before, size / 10)
+
+    def test_republish_and_refresh(self):
+        refresher = SnapshotRefresher(shared_dir=self.tmpdir, warm=None)
+        first = refresher.current()
+        self.assertFalse(refresher.refresh())
+
+        paths = [current_snapshot(self.tmpdir)]
+        for seed in (6, 7):
+            df, df_impact = generate_unified_dataset(n_indicators=41, n_events=15, seed=seed)
+            paths.append(write_snapshot(IndicatorStore(df, df_impact), self.tmpdir))
+        # the current snapshot and one previous are kept
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertEqual(current_snapshot(self.tmpdir), paths[2])
+
+        os.utime(os.path.join(self.tmpdir, 'CURRENT'), ns=(1, 1))
+        self.assertTrue(refresher.refresh())
+        self.assertEqual(len(refresher.current().store.indicator_codes()), 41)
+        self.assertEqual(len(first.store.indicator_codes()), 40)
+
+    def test_worker_process_opens_snapshot(self):
+        script = (f"import sys; sys.path.append({SRC!r}); from data_loader import load_shared_store; "
+                  f"print(load_shared_store({self.tmpdir!r}).latest('ACC_OWNERSHIP'))")
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        self.assertAlmostEqual(float(out.stdout.strip().splitlines()[-1]), self.store.latest('ACC_OWNERSHIP'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from forecaster import run_baseline_forecast, apply_event_impacts
+from simulation import simulate_forecast
+
+
+def make_history(values, years=(2011, 2014, 2017, 2021, 2024), code='ACC_OWNERSHIP'):
+    return pd.DataFrame({
+        'record_type': 'observation',
+        'indicator_code': code,
+        'gender': 'all',
+        'data_year': [float(y) for y in years],
+        'value_numeric': values,
+    })
+
+
+def make_impact_model():
+    return pd.DataFrame({
+        'related_indicator': 'ACC_OWNERSHIP',
+        'impact_direction': ['increase', 'increase', 'decrease'],
+        'impact_magnitude': ['high', 'medium', 'low'],
+        'event_year': [2024.0, 2025.0, 2026.0],
+        'lag_months': [12, 6, 18],
+    }).assign(realized_year=lambda f: f['event_year'] + f['lag_months'] / 12.0)
+
+
+class TestSimulateForecast(unittest.TestCase):
+    def test_degenerate_spread_matches_deterministic_forecast(self):
+        """With a perfect trend and no impact spread every path equals the base scenario."""
+        df = make_history([10.0, 16.0, 22.0, 30.0, 36.0])
+        impacts = make_impact_model()
+        for code in ['ACC_OWNERSHIP', 'USG_P2P_COUNT']:
+            data = df.assign(indicator_code=code)
+            sim = simulate_forecast(data, impacts, code, end_year=2030, n_paths=500,
+                                    magnitude_spread=0.0, lag_spread_months=0.0, seed=0)
+            base = apply_event_impacts(run_baseline_forecast(data, code, end_year=2030), impacts, 'base', code)
+            np.testing.assert_allclose(sim['p50'], base['baseline_prediction'], rtol=1e-9)
+            np.testing.assert_allclose(sim['p5'], sim['p95'], rtol=1e-9)
+
+    def test_bands_and_target_probability(self):
+        df = make_history([14.0, 22.0, 35.0, 46.0, 49.0])
+        sim = simulate_forecast(df, make_impact_model(), 'ACC_OWNERSHIP', end_year=2030,
+                                n_paths=4000, target=60.0, seed=7)
+        self.assertEqual(list(sim['data_year']), list(range(2025, 2031)))
+        self.assertTrue((sim['p5'] <= sim['p50']).all() and (sim['p50'] <= sim['p95']).all())
+        prob = sim['prob_target_reached'].to_numpy()
+        self.assertTrue(((prob >= 0) & (prob <= 1)).all())
+        # "Reached by year" can only grow over time
+        self.assertTrue((np.diff(prob) >= 0).all())
+
+    def test_seeded_and_independent_of_n_jobs(self):
+        df = make_history([14.0, 22.0, 35.0, 46.0, 49.0])
+        kwargs = dict(n_paths=3000, chunk_size=1000, target=60.0, seed=11)
+        serial = simulate_forecast(df, make_impact_model(), 'ACC_OWNERSHIP', **kwargs)
+        again = simulate_forecast(df, make_impact_model(), 'ACC_OWNERSHIP', **kwargs)
+        pooled = simulate_forecast(df, make_impact_model(), 'ACC_OWNERSHIP', n_jobs=2, **kwargs)
+        pd.testing.assert_frame_equal(serial, again)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+    def test_insufficient_history(self):
+        df = make_history([14.0], years=(2011,))
+        self.assertTrue(simulate_forecast(df, make_impact_model(), 'ACC_OWNERSHIP').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import data_loader
+from synthetic import generate_unified_dataset, write_workbook
+from forecaster import run_baseline_forecast, run_baseline_forecasts
+from indicator_store import IndicatorStore
+from analyze_data import analyze_access_slowdown, analyze_gender_gap, indicator_analytics
+
+
+class TestSyntheticDataset(unittest.TestCase):
+    def setUp(self):
+        self.df, self.df_impact = generate_unified_dataset(n_indicators=40, n_events=10, links_per_event=3, seed=1)
+
+    def test_shape_and_schema(self):
+        obs = self.df[self.df['record_type'] == 'observation']
+        self.assertEqual(obs['indicator_code'].nunique(), 40)
+        self.assertEqual((self.df['record_type'] == 'event').sum(), 10)
+        self.assertEqual(len(self.df_impact), 30)
+        self.assertTrue(set(self.df_impact['parent_id']) <= set(self.df['record_id']))
+        self.assertEqual(set(obs['gender']), {'all', 'male', 'female'})
+        for col in ['record_type', 'indicator_code', 'gender']:
+            self.assertIsInstance(self.df[col].dtype, pd.CategoricalDtype)
+        self.assertEqual(str(self.df['data_year'].dtype), 'Int64')
+
+    def test_deterministic(self):
+        again, again_impact = generate_unified_dataset(n_indicators=40, n_events=10, links_per_event=3, seed=1)
+        pd.testing.assert_frame_equal(self.df, again)
+        pd.testing.assert_frame_equal(self.df_impact, again_impact)
+
+    def test_pipeline_runs(self):
+        store = IndicatorStore(self.df, self.df_impact)
+        self.assertEqual(len(run_baseline_forecast(self.df, 'ACC_OWNERSHIP')), 3)
+        self.assertEqual(run_baseline_forecasts(store)['indicator_code'].nunique(), 40)
+        self.assertIsInstance(analyze_access_slowdown(self.df), pd.DataFrame)
+        self.assertIn('gap_pp', analyze_gender_gap(self.df).columns)
+
+    def test_forecast_series_are_national(self):
+        store = IndicatorStore(self.df, self.df_impact)
+        table = indicator_analytics(self.df)
+        for code in self.df['indicator_code'].dropna().unique()[2:6]:
+            years, values = store.series(code)
+            # one point per year: regional rows are not interleaved into the series
+            self.assertTrue((np.diff(years) > 0).all())
+            national = table[(table['indicator_code'] == code) & (table['region'] == 'national') &
+                             (table['gender'] == 'all')]
+            np.testing.assert_array_equal(years, national['data_year'].to_numpy(dtype=float))
+            np.testing.assert_array_equal(values, national['value_numeric'])
+            pd.testing.assert_frame_equal(run_baseline_forecast(self.df, code), run_baseline_forecast(store, code))
+
+    def test_workbook_round_trip(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        data_path = write_workbook(self.df, self.df_impact, os.path.join(tmpdir, 'synthetic.xlsx'))
+        enrichment_path = os.path.join(tmpdir, 'enrichment.jsonl')
+        open(enrichment_path, 'w').close()
+        df, df_impact = data_loader._load_data_logic(data_path, enrichment_path)
+        self.assertEqual(len(df), len(self.df))
+        self.assertEqual(len(df_impact), len(self.df_impact))
+        self.assertEqual(set(df['indicator_code'].dropna()), set(self.df['indicator_code'].dropna()))
+
+
+if __name__ == '__main__':
+    unittest.main()